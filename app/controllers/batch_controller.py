@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from math import ceil
+from typing import Tuple
+from urllib.parse import unquote, urlsplit
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import Message
+from app.schemas.batch import BatchRequest, BatchSubRequest
+from config.batch import load_batch_settings
+
+logger = logging.getLogger(__name__)
+
+# BATCH_MAX_REQUESTS, BATCH_CONCURRENCY and BATCH_MAX_RESPONSE_BYTES; the application refuses to start when they are invalid
+_settings = load_batch_settings()
+
+# Copied from the batch request: the connection, the app and its exception handlers
+_INHERITED_SCOPE_KEYS = (
+    "type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app", "starlette.exception_handlers"
+)
+# Describe the batch body, not the body-less sub-requests
+_DROPPED_HEADERS = frozenset((b"content-length", b"content-type", b"transfer-encoding"))
+
+
+class _ResponseTooLarge(Exception):
+    """Raised from `send` to stop a sub-request whose body exceeds BATCH_MAX_RESPONSE_BYTES."""
+
+
+def _sub_scope(request: Request, url: str) -> dict:
+    """ASGI scope of a GET to `url`, authenticated as the batch request was."""
+    outer = request.scope
+    parts = urlsplit(url)
+    scope = {key: outer[key] for key in _INHERITED_SCOPE_KEYS if key in outer}
+    scope.update(
+        method="GET",
+        path=unquote(parts.path),
+        raw_path=parts.path.encode(),
+        query_string=parts.query.encode(),
+        headers=[(name, value) for name, value in outer["headers"] if name not in _DROPPED_HEADERS],
+        # The verified JWT claims; copied so sub-requests cannot see each other's state
+        state=dict(outer.get("state", {})),
+    )
+    return scope
+
+
+async def _dispatch(request: Request, url: str, semaphore: asyncio.Semaphore) -> Tuple[int, bytes, bytes]:
+    """
+    Runs one sub-request through the app's router; returns (status, content type, body).
+
+    The sub-request first takes a token from its own route group's bucket,
+    as if it had been sent alone; when there is none its entry is a 429.
+    """
+    status = 500
+    content_type = b""
+    chunks = []
+    size = 0
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Nothing else ever arrives; streaming responses cancel this wait when done
+        await asyncio.Event().wait()
+
+    async def send(message: Message) -> None:
+        nonlocal status, content_type, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", ()):
+                if name.lower() == b"content-type":
+                    content_type = value
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            size += len(body)
+            if size > _settings.max_response_bytes:
+                raise _ResponseTooLarge()
+            chunks.append(body)
+
+    scope = _sub_scope(request, url)
+    limiter = request.scope.get("rate_limiter")
+    async with semaphore:
+        wait = limiter.wait_for(scope) if limiter is not None else 0.0
+        if wait:
+            body = {"Title": "Too Many Requests", "StatusCode": 429, "RetryAfter": ceil(wait)}
+            return 429, b"application/json", orjson.dumps(body)
+        try:
+            await request.app.router(scope, receive, send)
+        except StarletteHTTPException as e:
+            # Raised by the router itself (unknown path or method), outside the route's handlers
+            return e.status_code, b"application/json", orjson.dumps({"detail": e.detail})
+        except _ResponseTooLarge:
+            detail = "The response is larger than %d bytes; request it on its own" % _settings.max_response_bytes
+            return 413, b"application/json", orjson.dumps({"detail": detail})
+        except Exception as e:
+            logger.exception("Error in batch sub-request %s: %s", url, e)
+            return 500, b"application/json", b'{"detail":"Internal Server Error"}'
+    return status, content_type, b"".join(chunks)
+
+
+def _result(sub: BatchSubRequest, status: int, content_type: bytes, body: bytes) -> bytes:
+    """One entry of `responses`; JSON bodies are spliced in as they are, others become strings."""
+    if not body:
+        body = b"null"
+    elif not content_type.startswith(b"application/json"):
+        body = orjson.dumps(body.decode("utf-8", "replace"))
+    return b"".join((b'{"id":', orjson.dumps(sub.id), b',"status":', str(status).encode(), b',"body":', body, b"}"))
+
+
+async def run_batch_controller(request: Request, batch: BatchRequest) -> Response:
+    """
+    Runs the GET sub-requests of a batch concurrently and returns their results in order.
+
+    The batch request went through the JWT check once; the sub-requests are
+    dispatched straight to the router with its verified claims, so each one
+    only pays for its own route and one token of its route group's rate
+    limit. Up to BATCH_CONCURRENCY
+    of them run at a time, each taking its own pool connection under its
+    route's bulkhead. A failing sub-request only fails its own entry.
+
+    Raises:
+        HTTPException: If the batch is empty, too large, or has a non-GET or malformed sub-request
+    """
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="Provide at least one request")
+    if len(batch.requests) > _settings.max_requests:
+        raise HTTPException(status_code=400, detail=f"At most {_settings.max_requests} requests per batch")
+    for i, sub in enumerate(batch.requests):
+        if sub.method.upper() != "GET":
+            raise HTTPException(status_code=400, detail=f"requests[{i}]: only GET sub-requests are allowed")
+        if not sub.url.startswith("/") or sub.url.startswith("//"):
+            raise HTTPException(status_code=400, detail=f"requests[{i}]: url must be a path such as /issues/?limit=5")
+
+    semaphore = asyncio.Semaphore(_settings.concurrency)
+    results = await asyncio.gather(*(_dispatch(request, sub.url, semaphore) for sub in batch.requests))
+    body = b"".join((
+        b'{"responses":[',
+        b",".join(_result(sub, *result) for sub, result in zip(batch.requests, results)),
+        b"]}",
+    ))
+    return Response(content=body, media_type="application/json")
@@ -1,12 +1,44 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterable, List, Tuple, Union
+import orjson
 from fastapi import HTTPException
+from fastapi.responses import Response
 from asyncpg import Pool
-from app.repository.issue_repository import IssueRepository
+from asyncpg.exceptions import DataError
+from app.repository.issue_repository import IssueRepository, ISSUE_RELATIONS, ISSUE_SPEC
+from app.database.query_builder import parse_sort
+from app.helpers.pagination import decode_cursor, page_total
+from app.helpers.responses import keyed_json_response, ClosingStreamingResponse, cursor_json_response, raw_json_response
+from app.helpers.utilities import parse_fields
 from app.schemas.issue import IssueCreate, IssuePatchRequest, IssuePutRequest
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Largest list accepted by the bulk endpoints
+BULK_MAX_ISSUES = 1000
+
+
+def _parse_expand(expand: Optional[str]) -> List[str]:
+    """Splits ?expand=issue_type,sprint into relation names; unknown names are a 400."""
+    if not expand:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+    unknown = [name for name in names if name not in ISSUE_RELATIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail="expand must be a comma-separated list of: %s" % ", ".join(ISSUE_RELATIONS)
+        )
+    return names
+
+
+def _select_fields(fields: Optional[str], relations: List[str]) -> Optional[Tuple[str, ...]]:
+    """Parses ?fields=, adding the field each expanded relation is found through."""
+    selected = parse_fields(ISSUE_SPEC, fields)
+    if selected is None or not relations:
+        return selected
+    return tuple(dict.fromkeys(selected + tuple(ISSUE_RELATIONS[name].field for name in relations)))
+
 
 async def post_issue_controller(db_pool: Pool, issue: IssueCreate) -> Dict[str, Any]:
     if db_pool is None:
@@ -15,6 +47,8 @@ async def post_issue_controller(db_pool: Pool, issue: IssueCreate) -> Dict[str,
     repo = IssueRepository(db_pool)
     try:
         return await repo.post_issue(issue)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in post_issue_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -22,50 +56,188 @@ async def post_issue_controller(db_pool: Pool, issue: IssueCreate) -> Dict[str,
 
 async def get_issue_controller(
     db_pool: Pool,
-    issue_id: Optional[int] = None,
-    summary: Optional[str] = None,
-    description: Optional[str] = None,
-    audit_id: Optional[int] = None,
-    resolve_at: Optional[str] = None,
-    due_date: Optional[str] = None,
-    votes: Optional[int] = None,
-    original_estimation: Optional[int] = None,
-    custom_start_date: Optional[str] = None,
-    story_point_estimate: Optional[int] = None,
-    parent_summary: Optional[int] = None,
-    issue_type: Optional[int] = None,
-    project_id_fk: Optional[int] = None,
-    user_assigned_fk: Optional[int] = None,
-    user_creator_issue_fk: Optional[int] = None,
-    user_informator_fk: Optional[int] = None,
-    sprint_id_fk: Optional[int] = None,
-    status_issue: Optional[int] = None,
+    filters: Dict[str, Any],
     page: int = 1,
-    limit: int = 10
-) -> Dict[str, Any]:
+    limit: int = 10,
+    raw: bool = False,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Union[Dict[str, Any], Response]:
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool not available")
+    relations = _parse_expand(expand)
+    selected = _select_fields(fields, relations)
     
     repo = IssueRepository(db_pool)
     try:
-        data = await repo.get_issues(
-            issue_id, summary, description, audit_id, resolve_at,
-            due_date, votes, original_estimation, custom_start_date,
-            story_point_estimate, parent_summary, issue_type, project_id_fk,
-            user_assigned_fk, user_creator_issue_fk, user_informator_fk,
-            sprint_id_fk, status_issue, page, limit
-        )
-        return {
+        if selected is not None:
+            data = await repo.get_issues_fields(filters, selected, page, limit)
+            if not raw:
+                data = orjson.loads(data)
+        else:
+            data = await repo.get_issues(**filters, page=page, limit=limit, raw=raw)
+        total, exact = await repo.count_issues(filters, page_total(page, limit, data))
+        included = None
+        if relations:
+            issues = orjson.loads(data) if raw and data else data or []
+            included = await repo.get_included(relations, issues, raw)
+        if raw:
+            return raw_json_response("Issues", data, page, limit, total, exact, included)
+        result = {
             "Issues": data,
             "page": page,
             "currentLimit": limit,
-            "totalData": len(data)
+            "totalData": total,
+            "totalExact": exact
         }
+        if relations:
+            result["included"] = included
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in get_issue_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def get_issues_by_ids_controller(db_pool: Pool, ids: List[int]) -> Response:
+    """Batch lookup: returns `Issues` keyed by ID plus the `missing` IDs."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    try:
+        found = await IssueRepository(db_pool).get_issues_by_ids(ids)
+        return keyed_json_response(
+            "Issues",
+            [(i, found[i]) for i in ids if i in found],
+            [i for i in ids if i not in found]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in get_issues_by_ids_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def get_issue_page_controller(
+    db_pool: Pool,
+    filters: dict,
+    cursor: str,
+    sort: str,
+    limit: int,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Response:
+    """Keyset-paginated listing: returns `Issues` plus `next_cursor` instead of page numbers."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    try:
+        parse_sort(ISSUE_SPEC, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    relations = _parse_expand(expand)
+    selected = _select_fields(fields, relations)
+    try:
+        repo = IssueRepository(db_pool)
+        rows, next_cursor = await repo.get_issues_after(filters, decode_cursor(cursor, sort), sort, limit, selected)
+        included = None
+        if relations:
+            included = await repo.get_included(relations, [orjson.loads(row) for row in rows], raw=True)
+        return cursor_json_response("Issues", rows, limit, next_cursor, included)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in get_issue_page_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def export_issues_controller(db_pool: Pool, filters: dict) -> ClosingStreamingResponse:
+    """Streams every matching issue as NDJSON (one JSON object per line)."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    chunks = IssueRepository(db_pool).export_issues(filters)
+    try:
+        # Run the query before the status line is sent, so that admission and
+        # SQL errors still produce a proper error response
+        first = await anext(chunks, None)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in export_issues_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body():
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return ClosingStreamingResponse(body(), media_type="application/x-ndjson")
+
+
+async def post_issues_controller(db_pool: Pool, issues: List[IssueCreate], atomic: bool = False) -> Dict[str, Any]:
+    """Creates a batch of issues in one transaction; rejected ones are listed in `errors`."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    if not issues:
+        raise HTTPException(status_code=400, detail="No issues to create")
+    if len(issues) > BULK_MAX_ISSUES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ISSUES} issues per request")
+    try:
+        result = await IssueRepository(db_pool).post_issues(issues, atomic)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in post_issues_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    result["success"] = not result["errors"]
+    return result
+
+
+async def patch_issues_controller(db_pool: Pool, filters: dict, changes: IssuePatchRequest) -> Dict[str, Any]:
+    """Applies `changes` to every issue matching `filters` ("ids" or GET /issues filters)."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    if not changes.dict(exclude_none=True):
+        raise HTTPException(status_code=400, detail="Provide at least one field to update")
+    if all(value is None for value in filters.values()):
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    if filters.get("ids") is not None and len(filters["ids"]) > BULK_MAX_ISSUES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ISSUES} ids per request")
+    try:
+        result = await IssueRepository(db_pool).patch_issues(filters, changes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in patch_issues_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    result["success"] = not (result["errors"] or result["refused"])
+    return result
+
+
+async def import_issues_controller(db_pool: Pool, chunks: AsyncIterable[bytes], atomic: bool = False) -> Dict[str, Any]:
+    """Imports a CSV of issues; malformed CSV or header is a 400, invalid rows are listed in `errors`."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool not available")
+    try:
+        result = await IssueRepository(db_pool).import_issues(chunks, atomic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DataError as e:
+        # COPY rejects CSV it cannot parse (wrong number of fields, bad encoding)
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in import_issues_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    result["success"] = not result["errors"]
+    return result
+
+
 async def patch_issue_controller(
     db_pool: Pool,
     issue_id: int,
@@ -77,6 +249,8 @@ async def patch_issue_controller(
     repo = IssueRepository(db_pool)
     try:
         return await repo.patch_issue(issue_id, issue)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in patch_issue_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -93,6 +267,8 @@ async def put_issue_controller(
     repo = IssueRepository(db_pool)
     try:
         return await repo.put_issue(issue_id, issue)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in put_issue_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -105,6 +281,8 @@ async def delete_issue_controller(db_pool: Pool, issue_id: int) -> Dict[str, Any
     repo = IssueRepository(db_pool)
     try:
         return await repo.delete_issue(issue_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in delete_issue_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
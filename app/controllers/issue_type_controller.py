@@ -1,7 +1,10 @@
 from typing import Optional
 from fastapi import HTTPException
+from fastapi.responses import Response
 from asyncpg import Pool
-from app.repository.issue_type import IssueTypeRepository
+from app.repository.issue_type import IssueTypeRepository, ISSUE_TYPE_SPEC
+from app.helpers.responses import raw_json_response
+from app.helpers.utilities import parse_fields, procedure_error
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +14,13 @@ async def post_issue_type_controller(db_pool: Pool, status: int, priority: int)
         raise HTTPException(status_code=500, detail="DB pool no disponible")
     repo = IssueTypeRepository(db_pool)
     try:
-        return await repo.post_issue_type(status, priority)
+        result = await repo.post_issue_type(status, priority)
+        # A write the procedure refused changed nothing
+        if procedure_error(result) is None:
+            await repo.reload_issue_types()
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en post_issue_type_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -22,14 +31,20 @@ async def get_issue_type_controller(
     status: Optional[int] = None,
     priority: Optional[int] = None,
     page: int = 1,
-    limit: int = 10
-) -> dict:
+    limit: int = 10,
+    fields: Optional[str] = None
+) -> Response:
+    """Lists issue types from the in-memory snapshot; the total is always exact."""
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool no disponible")
+    selected = parse_fields(ISSUE_TYPE_SPEC, fields)
     repo = IssueTypeRepository(db_pool)
     try:
-        data = await repo.get_issue_type(issue_type_id, status, priority, page, limit)
-        return {"Issue_type": data, "page": page, "currentLimit": limit, "totalData": len(data)}
+        filters = {"issue_type_id": issue_type_id, "status": status, "priority": priority}
+        data, total = await repo.get_issue_types_page(filters, selected, page, limit)
+        return raw_json_response("Issue_type", data, page, limit, total, True)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en get_issue_type_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -44,7 +59,13 @@ async def patch_issue_type_controller(
         raise HTTPException(status_code=500, detail="DB pool no disponible")
     repo = IssueTypeRepository(db_pool)
     try:
-        return await repo.patch_issue_type(issue_type_id, status, priority)
+        result = await repo.patch_issue_type(issue_type_id, status, priority)
+        # A write the procedure refused changed nothing
+        if procedure_error(result) is None:
+            await repo.reload_issue_types()
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en patch_issue_type_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -54,7 +75,13 @@ async def put_issue_type_controller(db_pool: Pool, issue_type_id: int, status: i
         raise HTTPException(status_code=500, detail="DB pool no disponible")
     repo = IssueTypeRepository(db_pool)
     try:
-        return await repo.put_issue_type(issue_type_id, status, priority)
+        result = await repo.put_issue_type(issue_type_id, status, priority)
+        # A write the procedure refused changed nothing
+        if procedure_error(result) is None:
+            await repo.reload_issue_types()
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en put_issue_type_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -64,7 +91,13 @@ async def delete_issue_type_controller(db_pool: Pool, issue_type_id: int) -> dic
         raise HTTPException(status_code=500, detail="DB pool no disponible")
     repo = IssueTypeRepository(db_pool)
     try:
-        return await repo.delete_issue_type(issue_type_id)
+        result = await repo.delete_issue_type(issue_type_id)
+        # A write the procedure refused changed nothing
+        if procedure_error(result) is None:
+            await repo.reload_issue_types()
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en delete_issue_type_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,16 @@
 from datetime import date
 from decimal import Decimal
+import orjson
 from fastapi import HTTPException
 from asyncpg import Pool
-from app.repository.project_repository import ProjectRepository
+from fastapi.responses import Response
+from app.repository.project_repository import ProjectRepository, PROJECT_SPEC
+from app.database.query_builder import parse_sort
+from app.helpers.pagination import decode_cursor, page_total
+from app.helpers.responses import keyed_json_response, cursor_json_response, raw_json_response
+from app.helpers.utilities import parse_fields
 import logging
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -23,21 +29,88 @@ async def post_project_controller(
     repo = ProjectRepository(db_pool)
     try:
         return await repo.post_project(name, description, user_project_id_fk, date_init, date_end, status, progress)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en post_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def get_project_controller(db_pool: Pool, filters: dict, page: int, limit: int):
+async def get_project_controller(
+    db_pool: Pool,
+    filters: dict,
+    page: int,
+    limit: int,
+    raw: bool = False,
+    fields: Optional[str] = None
+):
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool no disponible")
+    selected = parse_fields(PROJECT_SPEC, fields)
     try:
-        data = await ProjectRepository(db_pool).get_project(**filters, page=page, limit=limit)
-        return {"data": data["data"], "page": page, "currentLimit": limit, "totalData": len(data["data"])}
+        repo = ProjectRepository(db_pool)
+        if selected is not None:
+            projects = await repo.get_projects_fields(filters, selected, page, limit)
+            data = {"data": projects if raw else orjson.loads(projects)}
+        else:
+            data = await repo.get_project(**filters, page=page, limit=limit, raw=raw)
+        total, exact = await repo.count_projects(filters, page_total(page, limit, data["data"]))
+        if raw:
+            return raw_json_response("data", data["data"], page, limit, total, exact)
+        return {"data": data["data"], "page": page, "currentLimit": limit, "totalData": total, "totalExact": exact}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en get_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+
+async def get_projects_by_ids_controller(db_pool: Pool, ids: List[int]) -> Response:
+    """Batch lookup: returns `data` keyed by ID plus the `missing` IDs."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool no disponible")
+    try:
+        found = await ProjectRepository(db_pool).get_projects_by_ids(ids)
+        return keyed_json_response(
+            "data",
+            [(i, found[i]) for i in ids if i in found],
+            [i for i in ids if i not in found]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error en get_projects_by_ids_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def get_project_page_controller(
+    db_pool: Pool,
+    filters: dict,
+    cursor: str,
+    sort: str,
+    limit: int,
+    fields: Optional[str] = None
+) -> Response:
+    """Keyset-paginated listing: returns `data` plus `next_cursor` instead of page numbers."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool no disponible")
+    try:
+        parse_sort(PROJECT_SPEC, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = parse_fields(PROJECT_SPEC, fields)
+    try:
+        rows, next_cursor = await ProjectRepository(db_pool).get_projects_after(
+            filters, decode_cursor(cursor, sort), sort, limit, selected
+        )
+        return cursor_json_response("data", rows, limit, next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error en get_project_page_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 async def patch_project_controller(
     db_pool: Pool,
     project_id: int,
@@ -54,6 +127,8 @@ async def patch_project_controller(
     repo = ProjectRepository(db_pool)
     try:
         return await repo.patch_project(project_id, name, description, user_project_id_fk, date_init, date_end, status, progress)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en patch_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -74,6 +149,8 @@ async def put_project_controller(
     repo = ProjectRepository(db_pool)
     try:
         return await repo.put_project(project_id, name, description, user_project_id_fk, date_init, date_end, status, progress)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en put_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -84,6 +161,8 @@ async def delete_project_controller(db_pool: Pool, project_id: int):
         raise HTTPException(status_code=500, detail="DB pool no disponible")
     try:
         return await ProjectRepository(db_pool).delete_project(project_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en delete_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
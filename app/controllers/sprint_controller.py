@@ -1,8 +1,14 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
+import orjson
 from asyncpg import Pool
 from fastapi import HTTPException
-from app.repository.sprint_repository import SprintRepository
+from fastapi.responses import Response
+from app.repository.sprint_repository import SprintRepository, SPRINT_SPEC
+from app.database.query_builder import parse_sort
+from app.helpers.pagination import decode_cursor, page_total
+from app.helpers.responses import keyed_json_response, cursor_json_response, raw_json_response
+from app.helpers.utilities import parse_fields
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,36 +16,81 @@ logger = logging.getLogger(__name__)
 
 async def get_sprint_controller(
     db_pool: Pool,
-    sprint_id: Optional[int] = None,
-    name: Optional[str] = None,
-    description: Optional[str] = None,
-    date_init_start: Optional[str] = None,
-    date_init_end: Optional[str] = None,
-    date_end_start: Optional[str] = None,
-    date_end_end: Optional[str] = None,
+    filters: dict,
     page: int = 1,
     limit: int = 10,
+    raw: bool = False,
+    fields: Optional[str] = None,
 ):
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool no disponible")
+    selected = parse_fields(SPRINT_SPEC, fields)
     repo = SprintRepository(db_pool)
     try:
-        return await repo.get_sprint(
-            sprint_id,
-            name,
-            description,
-            date_init_start,
-            date_init_end,
-            date_end_start,
-            date_end_end,
-            page,
-            limit,
-        )
+        if selected is not None:
+            data = await repo.get_sprints_fields(filters, selected, page, limit)
+            result = {"data": data if raw else orjson.loads(data), "page": page, "currentLimit": limit}
+        else:
+            result = await repo.get_sprint(**filters, page=page, limit=limit, raw=raw)
+        total, exact = await repo.count_sprints(filters, page_total(page, limit, result["data"]))
+        if raw:
+            return raw_json_response("data", result["data"], page, limit, total, exact)
+        result["totalData"] = total
+        result["totalExact"] = exact
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en get_sprint_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def get_sprints_by_ids_controller(db_pool: Pool, ids: List[int]) -> Response:
+    """Batch lookup: returns `data` keyed by ID plus the `missing` IDs."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool no disponible")
+    try:
+        found = await SprintRepository(db_pool).get_sprints_by_ids(ids)
+        return keyed_json_response(
+            "data",
+            [(i, found[i]) for i in ids if i in found],
+            [i for i in ids if i not in found]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error en get_sprints_by_ids_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def get_sprint_page_controller(
+    db_pool: Pool,
+    filters: dict,
+    cursor: str,
+    sort: str,
+    limit: int,
+    fields: Optional[str] = None
+) -> Response:
+    """Keyset-paginated listing: returns `data` plus `next_cursor` instead of page numbers."""
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="DB pool no disponible")
+    try:
+        parse_sort(SPRINT_SPEC, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = parse_fields(SPRINT_SPEC, fields)
+    try:
+        rows, next_cursor = await SprintRepository(db_pool).get_sprints_after(
+            filters, decode_cursor(cursor, sort), sort, limit, selected
+        )
+        return cursor_json_response("data", rows, limit, next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error en get_sprint_page_controller: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 async def post_sprint_controller(db_pool: Pool, sprint_data: dict):
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool no disponible")
@@ -52,6 +103,8 @@ async def post_sprint_controller(db_pool: Pool, sprint_data: dict):
     )
     try:
         return await repo.post_sprint(params)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en post_sprint_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -70,6 +123,8 @@ async def patch_sprint_controller(
     repo = SprintRepository(db_pool)
     try:
         return await repo.patch_sprint(sprint_id, name, description, date_init, date_end)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en patch_sprint_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,6 +143,8 @@ async def put_sprint_controller(
     repo = SprintRepository(db_pool)
     try:
         return await repo.put_sprint(sprint_id, name, description, date_init, date_end)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en put_sprint_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,6 +156,8 @@ async def delete_sprint_controller(db_pool: Pool, sprint_id: int) -> dict:
     repo = SprintRepository(db_pool)
     try:
         return await repo.delete_sprint(sprint_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en delete_sprint_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
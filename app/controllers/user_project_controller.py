@@ -1,7 +1,11 @@
 from typing import Optional
+import orjson
 from fastapi import HTTPException
 from asyncpg import Pool
-from app.repository.user_project import UserProjectRepository
+from app.repository.user_project import UserProjectRepository, USER_PROJECT_SPEC
+from app.helpers.pagination import page_total
+from app.helpers.responses import raw_json_response
+from app.helpers.utilities import parse_fields
 import logging
 from decimal import Decimal
 
@@ -18,25 +22,37 @@ async def post_user_project_controller(
     repo = UserProjectRepository(db_pool)
     try:
         return await repo.post_user_project(user_id_fk, rol_proyect, productivity)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en post_user_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 async def get_user_project_controller(
     db_pool: Pool,
-    user_project_id: Optional[int] = None,
-    user_id_fk: Optional[int] = None,
-    rol_proyect: Optional[int] = None,
-    productivity: Optional[Decimal] = None,
+    filters: dict,
     page: int = 1,
-    limit: int = 10
+    limit: int = 10,
+    raw: bool = False,
+    fields: Optional[str] = None
 ) -> dict:
     if db_pool is None:
         raise HTTPException(status_code=500, detail="DB pool no disponible")
+    selected = parse_fields(USER_PROJECT_SPEC, fields)
     repo = UserProjectRepository(db_pool)
     try:
-        data = await repo.get_user_project(user_project_id, user_id_fk, rol_proyect, productivity, page, limit)
-        return {"data": data, "page": page, "currentLimit": limit, "totalData": len(data) if data else 0}
+        if selected is not None:
+            data = await repo.get_user_projects_fields(filters, selected, page, limit)
+            if not raw:
+                data = orjson.loads(data)
+        else:
+            data = await repo.get_user_project(**filters, page=page, limit=limit, raw=raw)
+        total, exact = await repo.count_user_projects(filters, page_total(page, limit, data))
+        if raw:
+            return raw_json_response("data", data, page, limit, total, exact)
+        return {"data": data, "page": page, "currentLimit": limit, "totalData": total, "totalExact": exact}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en get_user_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,6 +69,8 @@ async def patch_user_project_controller(
     repo = UserProjectRepository(db_pool)
     try:
         return await repo.patch_user_project(user_project_id, user_id_fk, rol_proyect, productivity)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en patch_user_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -69,6 +87,8 @@ async def put_user_project_controller(
     repo = UserProjectRepository(db_pool)
     try:
         return await repo.put_user_project(user_project_id, user_id_fk, rol_proyect, productivity)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en put_user_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -79,6 +99,8 @@ async def delete_user_project_controller(db_pool: Pool, user_project_id: int) ->
     repo = UserProjectRepository(db_pool)
     try:
         return await repo.delete_user_project(user_project_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error en delete_user_project_controller: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,114 @@
+import asyncio
+from collections import deque
+from fastapi import HTTPException
+
+
+class PoolOverloadedError(HTTPException):
+    """Raised instead of queuing when a pool cannot take more requests."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="Service overloaded, retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class AdmissionGate:
+    """Bounded FIFO wait queue in front of a connection pool.
+
+    At most `limit` callers hold a slot at once. Up to `queue_depth` more wait
+    for one, each for at most `deadline` seconds. Everybody else is rejected
+    immediately with PoolOverloadedError.
+    """
+
+    def __init__(self, name: str, limit: int, queue_depth: int, deadline: float, retry_after: int):
+        self.name = name
+        self.limit = limit
+        self.queue_depth = queue_depth
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self.in_use = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        # Callers that had to queue and their cumulative time in the queue
+        self.waited = 0
+        self.wait_time = 0.0
+        # Highest in_use since the autoscaler last looked
+        self.peak_in_use = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def enter(self) -> None:
+        """Takes a slot, waiting in line if needed. Raises PoolOverloadedError when rejected."""
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            self.admitted += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+            return
+        if len(self._waiters) >= self.queue_depth:
+            self.rejected_queue_full += 1
+            raise PoolOverloadedError(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        started = loop.time()
+        try:
+            await asyncio.wait_for(waiter, self.deadline)
+        except BaseException as e:
+            self.waited += 1
+            self.wait_time += loop.time() - started
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended, pass it on
+                self.leave()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                raise PoolOverloadedError(self.retry_after)
+            raise
+        self.waited += 1
+        self.wait_time += loop.time() - started
+        self.admitted += 1
+
+    def leave(self) -> None:
+        """Releases a slot, handing it directly to the oldest waiter if there is one."""
+        # After a shrink, slots above the new limit are retired instead of handed over
+        if self.in_use <= self.limit:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_use -= 1
+
+    def resize(self, limit: int) -> None:
+        """Changes the number of slots. Growing admits waiters at once; shrinking drains as slots are released."""
+        self.limit = limit
+        while self.in_use < self.limit and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "waited": self.waited,
+            "wait_time": round(self.wait_time, 6),
+        }
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import asyncpg
+from config.database import AutoscaleSettings
+from app.database.admission import AdmissionGate
+from app.database.conection import acquire, get_admission_gates
+
+logger = logging.getLogger(__name__)
+
+# Connections a non-superuser can open on the server
+BUDGET_QUERY = (
+    "SELECT current_setting('max_connections')::int"
+    " - current_setting('superuser_reserved_connections')::int"
+)
+
+
+class _PoolState:
+    """Counters seen at the previous sample and the hysteresis state of one pool."""
+    __slots__ = ("ceiling", "calm_windows", "admitted", "wait_time", "rejected")
+
+    def __init__(self, gate: AdmissionGate):
+        self.ceiling: int | None = None
+        self.calm_windows = 0
+        self.admitted = gate.admitted
+        self.wait_time = gate.wait_time
+        self.rejected = gate.rejected_queue_full + gate.rejected_timeout
+
+
+async def _server_budget(pool: asyncpg.Pool, settings: AutoscaleSettings) -> int:
+    """Connections all the workers together may open on the server behind `pool`."""
+    if settings.max_connections is not None:
+        return settings.max_connections
+    async with acquire(pool) as conn:
+        return await conn.fetchval(BUDGET_QUERY)
+
+
+async def check_connection_budget(settings: AutoscaleSettings, max_size: int) -> None:
+    """Refuses to start when the workers could open more connections than a server allows.
+
+    Raises:
+        ValueError: If DB_POOL_WORKERS * DB_POOL_MAX_SIZE exceeds the budget of any open pool
+    """
+    for pool, gate in get_admission_gates():
+        try:
+            budget = await _server_budget(pool, settings)
+        except Exception as e:
+            logger.warning("Could not read the connection budget of pool %s: %s", gate.name, e)
+            continue
+        if settings.workers * max_size > budget:
+            raise ValueError(
+                f"DB_POOL_WORKERS ({settings.workers}) * DB_POOL_MAX_SIZE ({max_size}) exceeds the"
+                f" {budget} connections available on pool {gate.name}"
+            )
+
+
+async def _connection_ceiling(pool: asyncpg.Pool, gate: AdmissionGate, settings: AutoscaleSettings) -> int:
+    """Largest pool size a single worker may use without the workers exceeding the server budget."""
+    ceiling = max(1, await _server_budget(pool, settings) // settings.workers)
+    if pool.get_min_size() > ceiling:
+        logger.warning(
+            "Pool %s keeps %d idle connections but the budget allows %d per worker; lower DB_POOL_MIN_SIZE",
+            gate.name, pool.get_min_size(), ceiling,
+        )
+    return ceiling
+
+
+def _next_limit(gate: AdmissionGate, state: _PoolState, settings: AutoscaleSettings) -> int:
+    """Decides the gate limit for the next window from what happened in the last one.
+
+    Grows by `step` as soon as callers queued for longer than `grow_wait` on
+    average or were rejected. Shrinks by `step` only after `shrink_windows`
+    consecutive windows in which nobody queued and the peak usage stayed under
+    `shrink_utilization` of the limit, so a pool does not flap around the
+    threshold.
+    """
+    admitted = gate.admitted - state.admitted
+    wait_time = gate.wait_time - state.wait_time
+    rejected = gate.rejected_queue_full + gate.rejected_timeout - state.rejected
+    state.admitted = gate.admitted
+    state.wait_time = gate.wait_time
+    state.rejected += rejected
+    peak = gate.peak_in_use
+    gate.peak_in_use = gate.in_use
+
+    upper = min(settings.max_limit, state.ceiling)
+    limit = gate.limit
+    if rejected or (admitted and wait_time / admitted > settings.grow_wait):
+        state.calm_windows = 0
+        limit += settings.step
+    elif wait_time == 0 and peak < gate.limit * settings.shrink_utilization:
+        state.calm_windows += 1
+        if state.calm_windows >= settings.shrink_windows:
+            state.calm_windows = 0
+            limit = max(settings.min_limit, limit - settings.step, peak)
+    else:
+        state.calm_windows = 0
+    return max(1, min(limit, upper))
+
+
+async def autoscale_pools(settings: AutoscaleSettings) -> None:
+    """Resizes the admission gate of every pool from its acquire wait time until cancelled.
+
+    The asyncpg pools are created with DB_POOL_MAX_SIZE slots and open
+    connections lazily, so capping the gate caps the connections a pool
+    holds; connections above the cap are closed once they have been idle for
+    DB_POOL_MAX_INACTIVE_LIFETIME.
+    """
+    if not settings.enabled:
+        return
+    states: dict[AdmissionGate, _PoolState] = {}
+    while True:
+        await asyncio.sleep(settings.interval)
+        for pool, gate in get_admission_gates():
+            state = states.get(gate)
+            if state is None:
+                state = states[gate] = _PoolState(gate)
+            if state.ceiling is None:
+                try:
+                    state.ceiling = await _connection_ceiling(pool, gate, settings)
+                except Exception as e:
+                    logger.warning("Could not read the connection budget of pool %s: %s", gate.name, e)
+                    continue
+            limit = _next_limit(gate, state, settings)
+            if limit != gate.limit:
+                logger.info("Resizing pool %s from %d to %d connections", gate.name, gate.limit, limit)
+                gate.resize(limit)
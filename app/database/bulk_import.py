@@ -0,0 +1,194 @@
+import csv
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from asyncpg import Connection
+
+INT_PATTERN = "^[+-]?[0-9]{1,9}$"
+DATE_PATTERN = "^[0-9]{4}-[0-9]{2}-[0-9]{2}$"
+
+
+@dataclass(frozen=True)
+class ImportColumn:
+    """A field accepted by a bulk import and the column it is stored in.
+
+    `type` is "text", "int" or "date". `references` is the (table, key
+    column) an int field must point to.
+    """
+    name: str
+    column: str
+    type: str = "text"
+    required: bool = False
+    references: Optional[Tuple[str, str]] = None
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """Fields accepted by a bulk import, in the order the procedure creating the rows takes them."""
+    columns: Tuple[ImportColumn, ...]
+
+    def select_columns(self, names: Sequence[str]) -> List[ImportColumn]:
+        """Returns the columns for `names`. Raises ValueError on unknown, repeated or missing required fields."""
+        by_name = {c.name: c for c in self.columns}
+        unknown = [n for n in names if n not in by_name]
+        if unknown:
+            raise ValueError("Unknown columns: %s" % ", ".join(unknown))
+        if len(set(names)) != len(names):
+            raise ValueError("Repeated columns in header")
+        missing = [c.name for c in self.columns if c.required and c.name not in names]
+        if missing:
+            raise ValueError("Missing required columns: %s" % ", ".join(missing))
+        return [by_name[n] for n in names]
+
+
+def _value(c: ImportColumn) -> str:
+    # Blank numbers and dates count as missing; text is kept as sent
+    return "s.%s" % c.name if c.type == "text" else "NULLIF(btrim(s.%s), '')" % c.name
+
+
+def _checks(c: ImportColumn) -> List[str]:
+    """CASE expressions yielding an error message for an invalid value of `c`, else NULL."""
+    value = _value(c)
+    checks = []
+    if c.required:
+        checks.append("CASE WHEN %s IS NULL THEN '%s is required' END" % (value, c.name))
+    if c.type == "int":
+        checks.append("CASE WHEN %s !~ '%s' THEN '%s must be an integer' END" % (value, INT_PATTERN, c.name))
+    elif c.type == "date":
+        # CASE branches run in order, so each cast only sees input the previous ones accepted
+        message = "THEN '%s must be a YYYY-MM-DD date'" % c.name
+        year, month, day = ("substr(%s, %d, %d)::int" % (value, start, length) for start, length in ((1, 4), (6, 2), (9, 2)))
+        checks.append(" ".join((
+            "CASE WHEN %s IS NULL THEN NULL" % value,
+            "WHEN %s !~ '%s' %s" % (value, DATE_PATTERN, message),
+            "WHEN %s < 1 OR %s NOT BETWEEN 1 AND 12 %s" % (year, month, message),
+            "WHEN %s NOT BETWEEN 1 AND extract(day from make_date(%s, %s, 1) + interval '1 month - 1 day') %s END"
+            % (day, year, month, message),
+        )))
+    if c.references is not None:
+        checks.append(_reference_check(c, "%s::int" % value, "%s IS NULL OR %s !~ '%s'" % (value, value, INT_PATTERN)))
+    return checks
+
+
+def _reference_check(c: ImportColumn, value: str, skip: str) -> str:
+    """CASE expression yielding an error when `value` is not a key of `c.references`, unless `skip` holds."""
+    table, key = c.references
+    return "CASE WHEN %s THEN NULL WHEN NOT EXISTS (SELECT 1 FROM %s r WHERE r.%s = %s) THEN '%s does not exist' END" % (
+        skip, table, key, value, c.name
+    )
+
+
+def _cast(c: ImportColumn) -> str:
+    return _value(c) if c.type == "text" else "%s::%s" % (_value(c), c.type)
+
+
+async def read_csv_header(chunks: AsyncIterable[bytes]) -> Tuple[List[str], AsyncIterator[bytes]]:
+    """
+    Reads the header line of a CSV byte stream.
+
+    Returns:
+        The header field names and an iterator over the rest of the stream
+
+    Raises:
+        ValueError: If the stream ends before a header line
+    """
+    iterator = chunks.__aiter__()
+    buffered = b""
+    while b"\n" not in buffered:
+        try:
+            buffered += await iterator.__anext__()
+        except StopAsyncIteration:
+            if not buffered.strip():
+                raise ValueError("The CSV is empty")
+            break
+    line, _, rest = buffered.partition(b"\n")
+    names = [name.strip() for name in next(csv.reader([line.decode("utf-8-sig").rstrip("\r")]))]
+
+    async def remainder() -> AsyncIterator[bytes]:
+        if rest:
+            yield rest
+        async for chunk in iterator:
+            yield chunk
+
+    return names, remainder()
+
+
+async def stage_rows(conn: Connection, columns: Sequence[ImportColumn], source: Any, **copy_options) -> None:
+    """
+    Creates the `import_staging` temporary table and fills it with COPY.
+
+    Every field is staged as text, plus a `row_no` in input order, so that
+    malformed values become per-row errors instead of failing the COPY.
+    Must run inside a transaction; the table is dropped on commit.
+
+    Args:
+        conn: Connection with an open transaction
+        columns: Fields present in `source`, in order
+        source: Anything copy_to_table accepts (async bytes iterable, file)
+        copy_options: Extra copy_to_table arguments such as format="csv"
+    """
+    await conn.execute(
+        "CREATE TEMPORARY TABLE import_staging (row_no bigserial, %s) ON COMMIT DROP"
+        % ", ".join("%s text" % c.name for c in columns)
+    )
+    await conn.copy_to_table("import_staging", source=source, columns=[c.name for c in columns], **copy_options)
+
+
+async def validate_staged(conn: Connection, columns: Sequence[ImportColumn]) -> List[Dict[str, Any]]:
+    """Returns [{"row": n, "errors": [...]}] for every staged row that cannot be inserted."""
+    checks = [check for c in columns for check in _checks(c)]
+    if not checks:
+        return []
+    rows = await conn.fetch(
+        "SELECT row_no, errors FROM (SELECT s.row_no, array_remove(ARRAY[%s]::text[], NULL) AS errors"
+        " FROM import_staging s) v WHERE cardinality(errors) > 0 ORDER BY row_no" % ", ".join(checks)
+    )
+    return [{"row": r["row_no"], "errors": list(r["errors"])} for r in rows]
+
+
+def staged_arrays_query(spec: ImportSpec, columns: Sequence[ImportColumn]) -> str:
+    """
+    Builds a SELECT of the next batch of staged rows as one array per column, for a set-based procedure.
+
+    Parameters are the last row_no already read, the row_nos to skip
+    (bigint[]) and the batch size. The single result row has `row_no`, the
+    bigint[] of the batch's row numbers (NULL when the batch is empty), then
+    one typed array per column of `spec`, in order, of NULLs for fields the
+    import lacks.
+    """
+    present = {c.name for c in columns}
+    arrays = ", ".join(
+        "array_agg(%s ORDER BY s.row_no)" % (_cast(c) if c.name in present else "NULL::%s" % c.type) for c in spec.columns
+    )
+    return (
+        "SELECT array_agg(s.row_no ORDER BY s.row_no) AS row_no, %s FROM (SELECT * FROM import_staging"
+        " WHERE row_no > $1 AND row_no <> ALL($2::bigint[]) ORDER BY row_no LIMIT $3) s" % arrays
+    )
+
+
+def bulk_reference_query(columns: Sequence[ImportColumn]) -> str:
+    """
+    Builds a SELECT checking the references of rows passed as arrays.
+
+    Parameters are one int array per column of `columns`, all of the same
+    length, one element per row. The result has a `row_no` (numbered from 1)
+    and its `errors` for each row pointing to a missing row.
+    """
+    names = ", ".join(c.name for c in columns)
+    checks = [_reference_check(c, "i.%s" % c.name, "i.%s IS NULL" % c.name) for c in columns]
+    return (
+        "SELECT row_no, errors FROM (SELECT i.row_no, array_remove(ARRAY[%s]::text[], NULL) AS errors"
+        " FROM unnest(%s) WITH ORDINALITY AS i(%s, row_no)) c WHERE cardinality(errors) > 0 ORDER BY row_no"
+    ) % (
+        ", ".join(checks) or "NULL",
+        ", ".join("$%d::int[]" % i for i in range(1, len(columns) + 1)),
+        names,
+    )
+
+
+def reference_query(columns: Sequence[ImportColumn]) -> str:
+    """Builds a SELECT returning the errors of parameters $1..$n, one per column, that reference missing rows."""
+    checks = [
+        _reference_check(c, "$%d::int" % i, "$%d::int IS NULL" % i)
+        for i, c in enumerate(columns, 1)
+    ]
+    return "SELECT array_remove(ARRAY[%s]::text[], NULL) AS errors" % (", ".join(checks) or "NULL")
@@ -0,0 +1,78 @@
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Depends, Request
+from app.database.admission import AdmissionGate
+from app.helpers.metrics import counter, gauge, register_collector
+from config.database import PoolSettings, load_bulkhead_settings
+
+# Priority classes for DB access, declared per route with `bulkhead()`
+WRITE = "write"
+LOOKUP = "lookup"
+BULK_READ = "bulk_read"
+
+_category: ContextVar[Optional[str]] = ContextVar("db_category", default=None)
+_bulkheads: dict[str, AdmissionGate] = {}
+
+BULKHEAD_IN_USE = gauge("db_bulkhead_in_use", "DB calls currently running in the priority class.", ("bulkhead",))
+BULKHEAD_WAITING = gauge("db_bulkhead_waiting", "DB calls queued on the priority class.", ("bulkhead",))
+BULKHEAD_REJECTED = counter(
+    "db_bulkhead_rejected_total", "DB calls answered 503 by the priority class.", ("bulkhead", "reason")
+)
+
+
+def configure_bulkheads(pool_settings: PoolSettings) -> None:
+    """Creates one admission gate per priority class if not already done."""
+    if _bulkheads:
+        return
+    settings = load_bulkhead_settings(pool_settings)
+    for category, limit in (
+        (WRITE, settings.write_limit),
+        (LOOKUP, settings.lookup_limit),
+        (BULK_READ, settings.bulk_read_limit),
+    ):
+        _bulkheads[category] = AdmissionGate(
+            category,
+            limit=limit,
+            queue_depth=settings.queue_depth,
+            deadline=pool_settings.acquire_timeout,
+            retry_after=pool_settings.retry_after,
+        )
+
+
+def current_bulkhead() -> Optional[AdmissionGate]:
+    """Returns the gate of the priority class declared by the current route, if any."""
+    category = _category.get()
+    if category is None:
+        return None
+    return _bulkheads.get(category)
+
+
+def bulkhead(category: str, lookup_param: Optional[str] = None):
+    """Route dependency that puts the DB calls of the request in `category`.
+
+    When `lookup_param` is present in the query string the request is a
+    point lookup and is classified as LOOKUP instead.
+    """
+    async def declare_category(request: Request) -> None:
+        if lookup_param is not None and request.query_params.get(lookup_param) is not None:
+            _category.set(LOOKUP)
+        else:
+            _category.set(category)
+
+    return Depends(declare_category)
+
+
+def get_bulkhead_stats() -> list[dict]:
+    """Returns the concurrency and rejection counters of every priority class."""
+    return [gate.stats() for gate in _bulkheads.values()]
+
+
+def _collect_bulkhead_metrics() -> None:
+    for category, gate in _bulkheads.items():
+        BULKHEAD_IN_USE.set(gate.in_use, category)
+        BULKHEAD_WAITING.set(gate.waiting, category)
+        BULKHEAD_REJECTED.set(gate.rejected_queue_full, category, "queue_full")
+        BULKHEAD_REJECTED.set(gate.rejected_timeout, category, "timeout")
+
+
+register_collector(_collect_bulkhead_metrics)
@@ -1,24 +1,174 @@
+from contextlib import asynccontextmanager, contextmanager
 from os import getenv
+from time import perf_counter
+import asyncio
+import logging
 import asyncpg
+import orjson
+from config.database import PoolSettings, ReplicaSettings, load_pool_settings, load_replica_settings
+from app.database.admission import AdmissionGate, PoolOverloadedError
+from app.database.bulkheads import configure_bulkheads, current_bulkhead
+from app.helpers.metrics import counter, gauge, register_collector
+
+logger = logging.getLogger(__name__)
 
 _pool: asyncpg.Pool | None = None
+_settings: PoolSettings | None = None
+_replica_settings: ReplicaSettings | None = None
+_replicas: list["_Replica"] = []
+_replica_cursor = 0
+_gates: dict[asyncpg.Pool, AdmissionGate] = {}
+
+POOL_CONNECTIONS = gauge("db_pool_connections", "Open connections in the pool.", ("pool",))
+POOL_IDLE = gauge("db_pool_idle_connections", "Open connections not currently in use.", ("pool",))
+POOL_LIMIT = gauge("db_pool_limit", "Connections the admission gate lets callers use at once.", ("pool",))
+POOL_IN_USE = gauge("db_pool_in_use", "Callers currently holding an admission slot.", ("pool",))
+POOL_WAITING = gauge("db_pool_waiting", "Callers queued for an admission slot.", ("pool",))
+POOL_REJECTED = counter("db_pool_rejected_total", "Callers answered 503 by the admission gate.", ("pool", "reason"))
 
 def get_db_config() -> dict:
     """Returns the DB connection configuration from environment variables."""
     return {
         "host": getenv("POSTGRES_HOST"),
-        "port": 5432,
+        "port": int(getenv("POSTGRES_PORT", "5432")),
         "database": getenv("POSTGRES_DB"),
         "user": getenv("POSTGRES_USER"),
         "password": getenv("POSTGRES_PASSWORD")
     }
 
+def get_pool_settings() -> PoolSettings:
+    """Returns the pool settings, loading and validating them on first use."""
+    global _settings
+    if _settings is None:
+        _settings = load_pool_settings()
+    return _settings
+
+class Connection(asyncpg.Connection):
+    """Pool connection whose json/jsonb decoding can be bypassed per call."""
+
+    _raw_json = False
+    # JSON decoded since the last take_decode_stats() call
+    _decode_time = 0.0
+    _decoded_bytes = 0
+
+    @contextmanager
+    def raw_json(self, enabled: bool = True):
+        """Within this block json/jsonb values are returned as undecoded UTF-8 bytes."""
+        previous = self._raw_json
+        self._raw_json = enabled
+        try:
+            yield self
+        finally:
+            self._raw_json = previous
+
+    async def prepare_cached(self, query: str) -> None:
+        """Parses `query` into the connection statement cache without executing it.
+
+        Later fetch()/fetchrow() calls with the same query text skip the
+        parse/plan round trip, on this connection, for as long as it lives.
+
+        The public prepare() bypasses that cache, so this goes through
+        asyncpg's internal _get_statement(); asyncpg is pinned in dep.txt
+        for that reason and the call must be re-checked when upgrading it.
+        """
+        await self._get_statement(query, None)
+
+    def take_decode_stats(self) -> tuple[float, int]:
+        """Returns the seconds spent decoding and the JSON bytes received since the last call, and resets them."""
+        stats = (self._decode_time, self._decoded_bytes)
+        self._decode_time = 0.0
+        self._decoded_bytes = 0
+        return stats
+
+    def _decode_json(self, data: bytes):
+        self._decoded_bytes += len(data)
+        if self._raw_json:
+            return data
+        started = perf_counter()
+        value = orjson.loads(data)
+        self._decode_time += perf_counter() - started
+        return value
+
+    def _decode_jsonb(self, data: bytes):
+        # jsonb binary format is a version byte followed by the JSON text
+        self._decoded_bytes += len(data) - 1
+        if self._raw_json:
+            return data[1:]
+        started = perf_counter()
+        value = orjson.loads(memoryview(data)[1:])
+        self._decode_time += perf_counter() - started
+        return value
+
+def _encode_jsonb(value) -> bytes:
+    return b"\x01" + orjson.dumps(value)
+
+async def _init_connection(conn: Connection) -> None:
+    """Runs once for every new physical connection opened by the pool."""
+    # Decode json/jsonb values with orjson straight from the wire bytes
+    await conn.set_type_codec(
+        "json", schema="pg_catalog", format="binary",
+        encoder=orjson.dumps, decoder=conn._decode_json,
+    )
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", format="binary",
+        encoder=_encode_jsonb, decoder=conn._decode_jsonb,
+    )
+
+class _Replica:
+    """A read replica pool and its last known health."""
+    __slots__ = ("address", "pool", "healthy")
+
+    def __init__(self, address: tuple[str, int]):
+        self.address = address
+        self.pool: asyncpg.Pool | None = None
+        self.healthy = False
+
+async def _create_pool(host: str, port: int, name: str) -> asyncpg.Pool:
+    config = get_db_config()
+    config.update(host=host, port=port)
+    settings = get_pool_settings()
+    pool = await asyncpg.create_pool(
+        **config,
+        min_size=settings.min_size,
+        max_size=settings.max_size,
+        max_inactive_connection_lifetime=settings.max_inactive_connection_lifetime,
+        statement_cache_size=settings.statement_cache_size,
+        command_timeout=settings.command_timeout,
+        # Sent in the startup packet so the pool's RESET ALL on release restores them
+        server_settings=settings.session_settings(),
+        init=_init_connection,
+        connection_class=Connection,
+    )
+    _gates[pool] = AdmissionGate(
+        name,
+        limit=settings.max_size,
+        queue_depth=settings.queue_depth,
+        deadline=settings.acquire_timeout,
+        retry_after=settings.retry_after,
+    )
+    return pool
+
+async def _open_replica(replica: _Replica) -> None:
+    try:
+        replica.pool = await _create_pool(*replica.address, "%s:%s" % replica.address)
+        replica.healthy = True
+    except Exception as e:
+        # An unreachable replica must not prevent startup; reads fall back to the primary
+        logger.warning("Replica %s:%s unavailable: %s", *replica.address, e)
+
 async def init_pool() -> asyncpg.Pool:
-    """Initializes the connection pool if it does not already exist."""
-    global _pool
+    """Initializes the primary pool and the optional replica pools if they do not already exist."""
+    global _pool, _replica_settings
     if _pool is None:
         config = get_db_config()
-        _pool = await asyncpg.create_pool(**config)
+        _pool = await _create_pool(config["host"], config["port"], "primary")
+        configure_bulkheads(get_pool_settings())
+    if _replica_settings is None:
+        _replica_settings = load_replica_settings()
+        for address in _replica_settings.addresses:
+            replica = _Replica(address)
+            await _open_replica(replica)
+            _replicas.append(replica)
     return _pool
 
 def get_pool() -> asyncpg.Pool:
@@ -27,9 +177,115 @@ def get_pool() -> asyncpg.Pool:
         raise RuntimeError("Connection pool is not initialized. Call init_pool() first.")
     return _pool
 
+def get_replica_pools() -> list[asyncpg.Pool]:
+    """Returns the pools of the replicas that are currently healthy."""
+    return [replica.pool for replica in _replicas if replica.healthy]
+
+def get_read_pool() -> asyncpg.Pool:
+    """Returns the pool for read-only calls.
+
+    Picks the healthy replica with the fewest connections in use, rotating the
+    starting point so ties are spread round-robin. Falls back to the primary
+    pool when no replica is configured or healthy.
+    """
+    global _replica_cursor
+    count = len(_replicas)
+    best: asyncpg.Pool | None = None
+    best_busy = 0
+    for i in range(count):
+        replica = _replicas[(_replica_cursor + i) % count]
+        if not replica.healthy:
+            continue
+        busy = replica.pool.get_size() - replica.pool.get_idle_size()
+        if best is None or busy < best_busy:
+            best, best_busy = replica.pool, busy
+    if count:
+        _replica_cursor = (_replica_cursor + 1) % count
+    return best if best is not None else get_pool()
+
+async def _check_replica(replica: _Replica, timeout: float) -> None:
+    if replica.pool is None:
+        await _open_replica(replica)
+        return
+    try:
+        async with asyncio.timeout(timeout):
+            async with acquire(replica.pool) as conn:
+                await conn.fetchval("SELECT 1")
+        healthy = True
+    except PoolOverloadedError:
+        # Every slot is busy serving reads: the replica is loaded, not down
+        return
+    except Exception as e:
+        healthy = False
+        if replica.healthy:
+            logger.warning("Replica %s:%s failed its health check: %s", *replica.address, e)
+    if healthy and not replica.healthy:
+        logger.info("Replica %s:%s is healthy again", *replica.address)
+    replica.healthy = healthy
+
+async def monitor_replicas() -> None:
+    """Health-checks every replica periodically until cancelled."""
+    if not _replicas:
+        return
+    settings = _replica_settings
+    while True:
+        await asyncio.sleep(settings.health_check_interval)
+        await asyncio.gather(*(_check_replica(r, settings.health_check_timeout) for r in _replicas))
+
+@asynccontextmanager
+async def acquire(pool: asyncpg.Pool):
+    """Acquires a connection from `pool` through its admission gate.
+
+    Use it as ``async with acquire(pool) as conn:``. The call first passes the
+    bulkhead of the priority class declared by the route, then the pool gate.
+    When either is saturated the caller waits in a bounded queue for at most
+    the configured acquire timeout; beyond the queue depth or the deadline it
+    gets PoolOverloadedError (a 503 with Retry-After) instead of waiting.
+    """
+    bulkhead = current_bulkhead()
+    if bulkhead is not None:
+        await bulkhead.enter()
+    try:
+        gate = _gates[pool]
+        await gate.enter()
+        try:
+            async with pool.acquire(timeout=gate.deadline) as conn:
+                yield conn
+        finally:
+            gate.leave()
+    finally:
+        if bulkhead is not None:
+            bulkhead.leave()
+
+def get_admission_gates() -> list[tuple[asyncpg.Pool, AdmissionGate]]:
+    """Returns every pool opened so far together with its admission gate."""
+    return list(_gates.items())
+
+def _collect_pool_metrics() -> None:
+    for pool, gate in _gates.items():
+        POOL_CONNECTIONS.set(pool.get_size(), gate.name)
+        POOL_IDLE.set(pool.get_idle_size(), gate.name)
+        POOL_LIMIT.set(gate.limit, gate.name)
+        POOL_IN_USE.set(gate.in_use, gate.name)
+        POOL_WAITING.set(gate.waiting, gate.name)
+        POOL_REJECTED.set(gate.rejected_queue_full, gate.name, "queue_full")
+        POOL_REJECTED.set(gate.rejected_timeout, gate.name, "timeout")
+
+register_collector(_collect_pool_metrics)
+
+def get_admission_stats() -> list[dict]:
+    """Returns the queue depth and rejection counters of every pool."""
+    return [gate.stats() for gate in _gates.values()]
+
 async def close_pool():
-    """Closes the connection pool if it exists."""
-    global _pool
+    """Closes the primary and replica pools if they exist."""
+    global _pool, _replica_settings
+    for replica in _replicas:
+        if replica.pool is not None:
+            await replica.pool.close()
+    _replicas.clear()
+    _gates.clear()
+    _replica_settings = None
     if _pool is not None:
         await _pool.close()
         _pool = None
@@ -0,0 +1,129 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Mapping, Optional, Tuple
+from asyncpg import Pool
+from app.database.executor import fetch_rows
+from app.database.query_builder import EntitySpec, count_query, estimate_query
+from app.helpers.metrics import counter
+from config.database import CountSettings, load_count_settings
+
+COUNTS = counter("db_count_total", "totalData computations by entity and source.", ("entity", "source"))
+
+
+class _CountAbandoned(Exception):
+    """Set on a shared count whose request was cancelled; its waiters count again instead."""
+
+
+class RowCounts:
+    """Totals of filtered lists, estimated when large and cached for a short time.
+
+    A count first asks the planner for its row estimate (an EXPLAIN, no rows
+    read). Up to `exact_threshold` rows the filter is selective enough for an
+    exact count(*) to be cheap, so one is run; above it the estimate is
+    returned. Either way the result is cached for `cache_ttl` seconds under
+    the entity and filter values, and concurrent misses for the same key
+    share a single query. Writes do not invalidate the cache, so totals may
+    lag by up to `cache_ttl`.
+    """
+
+    def __init__(self, settings: CountSettings):
+        self.settings = settings
+        self._cache: OrderedDict[tuple, Tuple[float, int, bool]] = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def count(self, pool: Pool, name: str, spec: EntitySpec, values: Mapping[str, Any]) -> Tuple[int, bool]:
+        """Returns (total, exact) for the rows of `spec` matching `values`; `name` labels the queries."""
+        key = (name, tuple(sorted((k, v) for k, v in values.items() if v is not None)))
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > monotonic():
+            self._cache.move_to_end(key)
+            COUNTS.inc(name, "cache")
+            return cached[1], cached[2]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            COUNTS.inc(name, "cache")
+            try:
+                return await asyncio.shield(inflight)
+            except _CountAbandoned:
+                # The first waiter back starts a new shared count, the others join it
+                return await self.count(pool, name, spec, values)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._compute(pool, name, spec, values)
+        except asyncio.CancelledError:
+            # Only this request was cancelled; the waiters must not see it as their own cancellation
+            future.set_exception(_CountAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Only waiters should see it; avoid "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._store(key, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _compute(self, pool: Pool, name: str, spec: EntitySpec, values: Mapping[str, Any]) -> Tuple[int, bool]:
+        query, args = estimate_query(spec, values)
+        rows = await fetch_rows(pool, name + "_ESTIMATE", query, *args)
+        estimate = int(rows[0][0][0]["Plan"]["Plan Rows"])
+        if estimate > self.settings.exact_threshold:
+            COUNTS.inc(name, "estimate")
+            return estimate, False
+
+        query, args = count_query(spec, values)
+        rows = await fetch_rows(pool, name, query, *args)
+        COUNTS.inc(name, "exact")
+        return rows[0][0], True
+
+    def _store(self, key: tuple, result: Tuple[int, bool]) -> None:
+        if self.settings.cache_ttl <= 0:
+            return
+        self._cache[key] = (monotonic() + self.settings.cache_ttl, *result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.settings.cache_size:
+            self._cache.popitem(last=False)
+
+
+_counts: Optional[RowCounts] = None
+
+
+def get_row_counts() -> RowCounts:
+    """Returns the process-wide RowCounts, loading its settings on first use."""
+    global _counts
+    if _counts is None:
+        _counts = RowCounts(load_count_settings())
+    return _counts
+
+
+async def count_rows(
+    pool: Pool,
+    name: str,
+    spec: EntitySpec,
+    values: Mapping[str, Any],
+    known: Optional[int] = None
+) -> Tuple[int, bool]:
+    """
+    Returns the totalData of a filtered list and whether it is exact.
+
+    Args:
+        pool: Pool to count on
+        name: Label of the count queries in metrics and cache, e.g. "ISSUE_COUNT"
+        spec: Entity being listed
+        values: Filter values by API parameter name; None means unfiltered
+        known: Total already implied by the fetched page (see page_total), if any
+
+    Returns:
+        (total, exact)
+    """
+    if known is not None:
+        return known, True
+    return await get_row_counts().count(pool, name, spec, values)
@@ -0,0 +1,203 @@
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, AsyncIterator, List
+from asyncpg import Pool, Record
+from app.database.conection import Connection, acquire
+from app.database.admission import PoolOverloadedError
+from app.helpers.metrics import SIZE_BUCKETS, counter, histogram
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT = histogram(
+    "db_procedure_pool_wait_seconds", "Time spent waiting for a pooled connection.", ("procedure",)
+)
+EXECUTION = histogram(
+    "db_procedure_execution_seconds", "Time spent running the call on the server, decoding excluded.", ("procedure",)
+)
+DECODE = histogram(
+    "db_procedure_decode_seconds", "Time spent decoding the JSON result.", ("procedure",)
+)
+RESULT_BYTES = histogram(
+    "db_procedure_result_bytes", "Size of the JSON result.", ("procedure",), buckets=SIZE_BUCKETS
+)
+ERRORS = counter(
+    "db_procedure_errors_total", "Calls that raised, by exception type.", ("procedure", "error")
+)
+
+
+@lru_cache(maxsize=None)
+def procedure_name(query: str) -> str:
+    """Extracts the procedure name from 'CALL PUBLIC."NAME"(...)', falling back to the query text."""
+    parts = query.split('"')
+    return parts[1] if len(parts) > 2 else query
+
+
+async def _execute(pool: Pool, name: str, method: str, query: str, args: tuple, raw: bool) -> Any:
+    """Runs `conn.<method>(query, *args)` through the admission gates, recording its metrics under `name`."""
+    started = perf_counter()
+    try:
+        async with acquire(pool) as conn:
+            acquired = perf_counter()
+            conn.take_decode_stats()
+            with conn.raw_json(raw):
+                result = await getattr(conn, method)(query, *args)
+            elapsed = perf_counter() - acquired
+            decode_time, size = conn.take_decode_stats()
+    except PoolOverloadedError:
+        ERRORS.inc(name, "PoolOverloadedError")
+        raise
+    except Exception as e:
+        ERRORS.inc(name, type(e).__name__)
+        logger.exception("Error in %s: %s", name, e)
+        raise
+
+    POOL_WAIT.observe(acquired - started, name)
+    EXECUTION.observe(elapsed - decode_time, name)
+    DECODE.observe(decode_time, name)
+    RESULT_BYTES.observe(size, name)
+    return result
+
+
+async def call_procedure(pool: Pool, query: str, *args, raw: bool = False, default: Any = None) -> Any:
+    """
+    Runs a stored procedure CALL and returns its `data` OUT parameter.
+
+    Every repository goes through here, so each call is admitted by the pool
+    gate and bulkhead and is measured: pool wait, execution and decode time
+    and result size per procedure, plus an error counter by exception type.
+
+    Args:
+        pool: Pool to run the call on
+        query: CALL statement, one of the repository *_QUERY constants
+        *args: Statement parameters
+        raw: Return json/jsonb values as undecoded bytes
+        default: Returned when the call produces no row
+
+    Returns:
+        The `data` column of the row (the first column if there is none)
+    """
+    row = await _execute(pool, procedure_name(query), "fetchrow", query, args, raw)
+    if not row:
+        return default
+    return row.get("data") if "data" in row else row[0]
+
+
+async def fetch_rows(pool: Pool, name: str, query: str, *args, raw: bool = False) -> List[Record]:
+    """
+    Runs a plain SELECT with the same admission and metrics as call_procedure.
+
+    Args:
+        pool: Pool to run the query on
+        name: Label the metrics are recorded under, e.g. "ISSUE_KEYSET"
+        query: SQL statement
+        *args: Statement parameters
+        raw: Return json/jsonb values as undecoded bytes
+
+    Returns:
+        Every row of the result
+    """
+    return await _execute(pool, name, "fetch", query, args, raw)
+
+
+async def stream_rows(
+    pool: Pool,
+    name: str,
+    query: str,
+    *args,
+    batch_size: int = 500,
+    raw: bool = False
+) -> AsyncIterator[List[Record]]:
+    """
+    Runs a SELECT through a server-side cursor and yields its rows in batches.
+
+    The connection is held, inside a read-only transaction, until the
+    iterator is exhausted or closed. Only one batch is in memory at a time
+    and the next one is fetched only when the consumer asks for it, so a
+    slow consumer slows the query down instead of buffering its result.
+
+    Args:
+        pool: Pool to run the query on
+        name: Label the metrics are recorded under, e.g. "ISSUE_EXPORT"
+        query: SQL statement
+        *args: Statement parameters
+        batch_size: Rows fetched per round trip
+        raw: Return json/jsonb values as undecoded bytes
+
+    Yields:
+        Non-empty lists of at most `batch_size` rows
+    """
+    started = perf_counter()
+    elapsed = decode_time = 0.0
+    size = 0
+    try:
+        async with acquire(pool) as conn:
+            POOL_WAIT.observe(perf_counter() - started, name)
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(query, *args)
+                while True:
+                    fetch_started = perf_counter()
+                    conn.take_decode_stats()
+                    with conn.raw_json(raw):
+                        rows = await cursor.fetch(batch_size)
+                    elapsed += perf_counter() - fetch_started
+                    batch_decode_time, batch_size_bytes = conn.take_decode_stats()
+                    decode_time += batch_decode_time
+                    size += batch_size_bytes
+                    if rows:
+                        yield rows
+                    if len(rows) < batch_size:
+                        break
+    except PoolOverloadedError:
+        ERRORS.inc(name, "PoolOverloadedError")
+        raise
+    except Exception as e:
+        ERRORS.inc(name, type(e).__name__)
+        logger.exception("Error in %s: %s", name, e)
+        raise
+
+    EXECUTION.observe(elapsed - decode_time, name)
+    DECODE.observe(decode_time, name)
+    RESULT_BYTES.observe(size, name)
+
+
+@asynccontextmanager
+async def transaction(pool: Pool, name: str) -> AsyncIterator[Connection]:
+    """
+    Holds one connection, inside a transaction, for work made of several statements.
+
+    Use it as ``async with transaction(pool, "ISSUE_IMPORT") as conn:``. The
+    connection is admitted like call_procedure's and the block is measured
+    as one call: pool wait, execution time of the whole block, decode time
+    and result size, and an error counter if it raises (which rolls the
+    transaction back).
+
+    Args:
+        pool: Pool to take the connection from
+        name: Label the metrics are recorded under, e.g. "ISSUE_IMPORT"
+
+    Yields:
+        The connection, with its transaction open
+    """
+    started = perf_counter()
+    try:
+        async with acquire(pool) as conn:
+            acquired = perf_counter()
+            POOL_WAIT.observe(acquired - started, name)
+            conn.take_decode_stats()
+            async with conn.transaction():
+                yield conn
+            elapsed = perf_counter() - acquired
+            decode_time, size = conn.take_decode_stats()
+    except PoolOverloadedError:
+        ERRORS.inc(name, "PoolOverloadedError")
+        raise
+    except Exception as e:
+        ERRORS.inc(name, type(e).__name__)
+        logger.exception("Error in %s: %s", name, e)
+        raise
+
+    EXECUTION.observe(elapsed - decode_time, name)
+    DECODE.observe(decode_time, name)
+    RESULT_BYTES.observe(size, name)
@@ -0,0 +1,270 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Filter:
+    """How one API filter parameter maps to a SQL condition.
+
+    `op` is a comparison operator, "contains" for a case-insensitive
+    substring match, or "any" for membership in an array value. `cast` is appended to the placeholder, e.g. "::text::date"
+    so that a "YYYY-MM-DD" string can be compared with a date column.
+    """
+    column: str
+    op: str = "="
+    cast: str = ""
+
+    def condition(self, placeholder: str) -> str:
+        value = placeholder + self.cast
+        if self.op == "contains":
+            return "%s ILIKE '%%' || %s || '%%'" % (self.column, value)
+        if self.op == "any":
+            return "%s = ANY(%s)" % (self.column, value)
+        return "%s %s %s" % (self.column, self.op, value)
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """A column rows can be ordered by; `cast` reads a cursor value (always text) back."""
+    column: str
+    cast: str = ""
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """Table, primary key, filters and sort keys of a listed entity, for SQL built outside the stored procedures.
+
+    Sort keys must be NOT NULL columns so that keyset comparisons never skip rows.
+    `columns` lists the fields a client may select with ?fields=, named as
+    in the JSON rows (the unquoted column names).
+    """
+    table: str
+    key: str
+    filters: Mapping[str, Filter]
+    sort_keys: Mapping[str, SortKey] = field(default_factory=dict)
+    columns: Tuple[str, ...] = ()
+    # Upper-cased field name -> field name, built once from `columns`
+    field_index: Mapping[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "field_index", {name.upper(): name for name in self.columns})
+
+    def parse_fields(self, fields: str) -> Tuple[str, ...]:
+        """Splits "ISSUE_ID,summary" into known field names, in order. Raises ValueError on unknown or no fields."""
+        names = []
+        for name in fields.split(","):
+            name = name.strip()
+            if not name:
+                continue
+            if name.upper() not in self.field_index:
+                raise ValueError("fields must be a comma-separated list of: %s" % ", ".join(self.columns))
+            names.append(self.field_index[name.upper()])
+        if not names:
+            raise ValueError("fields must name at least one field")
+        return tuple(dict.fromkeys(names))
+
+    def projection(self, fields: Optional[Sequence[str]], alias: str = "t") -> str:
+        """JSON object of the selected `fields` of the row `alias`, or of the whole row when `fields` is None."""
+        if fields is None:
+            return "row_to_json(%s)" % alias
+        return "json_build_object(%s)" % ", ".join("'%s', %s.\"%s\"" % (name, alias, name) for name in fields)
+
+    def where(self, values: Mapping[str, Any], args: List[Any]) -> List[str]:
+        """Returns one condition per non-None filter value, appending the values to `args`."""
+        conditions = []
+        for name, value in values.items():
+            if value is None:
+                continue
+            args.append(value)
+            conditions.append(self.filters[name].condition("$%d" % len(args)))
+        return conditions
+
+
+@dataclass(frozen=True)
+class Relation:
+    """An entity referenced by listed rows, side-loaded with ?expand=.
+
+    `field` is the referencing value's key in the row JSON, e.g. "SPRINT_ID_FK".
+    """
+    field: str
+    table: str
+    key: str
+
+
+def parse_sort(spec: EntitySpec, sort: str) -> Tuple[str, SortKey, bool]:
+    """Splits "-due_date" into ("due_date", its SortKey, descending). Raises ValueError on unknown keys."""
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in spec.sort_keys:
+        raise ValueError("sort must be one of: %s" % ", ".join(sorted(spec.sort_keys)))
+    return name, spec.sort_keys[name], descending
+
+
+def keyset_query(
+    spec: EntitySpec,
+    values: Mapping[str, Any],
+    sort: str,
+    after: Optional[Tuple[str, Any]],
+    limit: int,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Builds a keyset-paginated SELECT over `spec.table`.
+
+    Rows are ordered by (sort column, primary key) and the page starts right
+    after `after`, the (sort value, key) of the last row already seen. With an
+    index on those columns every page costs the same, however deep it is,
+    unlike the OFFSET the stored procedures use.
+
+    The query returns `sort_value` (text), `cursor_key` and the row as JSON
+    `data` (only `fields` when given), and asks for limit + 1 rows so the
+    caller can tell whether another page exists.
+
+    Returns:
+        The query text and its arguments
+    """
+    _, key, descending = parse_sort(spec, sort)
+    args: List[Any] = []
+    conditions = spec.where(values, args)
+    direction = " DESC" if descending else ""
+    comparison = "<" if descending else ">"
+    if key.column == spec.key:
+        order = "%s%s" % (spec.key, direction)
+        if after is not None:
+            args.append(after[1])
+            conditions.append("%s %s $%d" % (spec.key, comparison, len(args)))
+    else:
+        order = "%s%s, %s%s" % (key.column, direction, spec.key, direction)
+        if after is not None:
+            args.extend(after)
+            conditions.append("(%s, %s) %s ($%d::text%s, $%d)" % (
+                key.column, spec.key, comparison, len(args) - 1, key.cast, len(args)
+            ))
+    args.append(limit + 1)
+    query = "SELECT %s::text AS sort_value, %s AS cursor_key, %s AS data FROM %s t%s ORDER BY %s LIMIT $%d" % (
+        key.column,
+        spec.key,
+        spec.projection(fields),
+        spec.table,
+        " WHERE " + " AND ".join(conditions) if conditions else "",
+        order,
+        len(args),
+    )
+    return query, args
+
+
+def count_query(spec: EntitySpec, values: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+    """Builds SELECT count(*) over `spec.table` with the given filter values."""
+    args: List[Any] = []
+    conditions = spec.where(values, args)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return "SELECT count(*) FROM %s t%s" % (spec.table, where), args
+
+
+def estimate_query(spec: EntitySpec, values: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+    """Builds an EXPLAIN whose JSON plan carries the planner's row estimate for count_query."""
+    query, args = count_query(spec, values)
+    return "EXPLAIN (FORMAT JSON) " + query.replace("count(*)", "1", 1), args
+
+
+def export_query(spec: EntitySpec, values: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+    """Builds a SELECT of every matching row as JSON `data`, in primary key order."""
+    args: List[Any] = []
+    conditions = spec.where(values, args)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return "SELECT row_to_json(t) AS data FROM %s t%s ORDER BY %s" % (spec.table, where, spec.key), args
+
+
+def locked_chunk_query(
+    spec: EntitySpec,
+    values: Mapping[str, Any],
+    after: Optional[Any],
+    chunk: int,
+) -> Tuple[str, List[Any]]:
+    """
+    Builds a SELECT locking the keys of at most `chunk` matching rows that follow `after`.
+
+    Rows are taken in key order and locked with FOR UPDATE, so running the
+    query repeatedly, each time after the last key returned, walks the
+    whole set while each transaction only holds `chunk` row locks.
+
+    Args:
+        spec: Entity to walk
+        values: Filter values by API parameter name
+        after: Last key of the previous chunk, or None
+        chunk: Rows per chunk
+
+    Returns:
+        The query text and its arguments
+    """
+    args: List[Any] = []
+    conditions = spec.where(values, args)
+    if after is not None:
+        args.append(after)
+        conditions.append("%s > $%d" % (spec.key, len(args)))
+    args.append(chunk)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    query = "SELECT %s FROM %s t%s ORDER BY %s LIMIT $%d FOR UPDATE" % (spec.key, spec.table, where, spec.key, len(args))
+    return query, args
+
+
+def batch_query(spec: EntitySpec) -> str:
+    """Builds a SELECT of `key` and the row as JSON `data` for the keys in the $1 int array."""
+    return "SELECT %s AS key, row_to_json(t) AS data FROM %s t WHERE %s = ANY($1::int[])" % (spec.key, spec.table, spec.key)
+
+
+def included_query(relations: Mapping[str, Relation]) -> str:
+    """
+    Builds a SELECT of one JSON object `included`: for each relation name,
+    the referenced rows keyed by their key. The n-th parameter is the int
+    array of keys wanted for the n-th relation, so each row appears once
+    however many listed rows reference it.
+    """
+    parts = [
+        "'%s', (SELECT coalesce(json_object_agg(r.%s, row_to_json(r)), '{}'::json) FROM %s r WHERE r.%s = ANY($%d::int[]))"
+        % (name, relation.key, relation.table, relation.key, i)
+        for i, (name, relation) in enumerate(relations.items(), 1)
+    ]
+    return "SELECT json_build_object(%s) AS included" % ", ".join(parts)
+
+
+def page_query(
+    spec: EntitySpec,
+    values: Mapping[str, Any],
+    fields: Sequence[str],
+    page: int,
+    limit: int,
+) -> Tuple[str, List[Any]]:
+    """
+    Builds an offset-paginated SELECT of only `fields`, in primary key order.
+
+    The inner query names just those columns, so the others are neither
+    sent nor, for TOASTed text, even read. The query returns the page as a
+    single JSON array `data`, like the GET_* procedures.
+
+    Pages without `fields` come from those procedures instead, which are
+    not in this repository; they are expected to order by the key too, so
+    that a client adding `fields` sees the same pages.
+    tests/test_count_filters.py checks it against a database.
+
+    Returns:
+        The query text and its arguments
+    """
+    args: List[Any] = []
+    conditions = spec.where(values, args)
+    args.extend((limit, (page - 1) * limit))
+    columns = dict.fromkeys(['"%s"' % name for name in fields] + [spec.key])
+    query = (
+        "SELECT coalesce(json_agg(%s ORDER BY t.%s), '[]'::json) AS data"
+        " FROM (SELECT %s FROM %s t%s ORDER BY %s LIMIT $%d OFFSET $%d) t"
+    ) % (
+        spec.projection(fields),
+        spec.key,
+        ", ".join(columns),
+        spec.table,
+        " WHERE " + " AND ".join(conditions) if conditions else "",
+        spec.key,
+        len(args) - 1,
+        len(args),
+    )
+    return query, args
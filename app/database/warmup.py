@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from asyncpg import Pool
+from app.database.conection import acquire, get_admission_gates, get_pool, get_pool_settings, get_replica_pools
+from app.repository.issue_repository import IssueRepository
+from app.repository.issue_type import IssueTypeRepository, get_issue_type_snapshots
+from app.repository.project_repository import ProjectRepository
+from app.repository.sprint_repository import SprintRepository
+from app.repository.user_project import UserProjectRepository
+
+logger = logging.getLogger(__name__)
+
+REPOSITORIES = (
+    IssueRepository,
+    IssueTypeRepository,
+    ProjectRepository,
+    SprintRepository,
+    UserProjectRepository,
+)
+
+RETRY_DELAY = 5.0
+
+_ready = False
+
+
+def is_ready() -> bool:
+    """Returns True once every warm connection has its statements prepared."""
+    return _ready
+
+
+async def _warm_pool(pool: Pool, size: int, statements: tuple) -> None:
+    # Holding `size` connections at once forces the pool to open that many.
+    # They are taken through the admission gate, never more than it allows.
+    size = min(size, dict(get_admission_gates())[pool].limit)
+    async with AsyncExitStack() as stack:
+        connections = [await stack.enter_async_context(acquire(pool)) for _ in range(size)]
+        for statement in statements:
+            await asyncio.gather(*(conn.prepare_cached(statement) for conn in connections))
+
+
+async def warm_up() -> None:
+    """Opens the warm connections, prepares every repository CALL statement on them and loads the issue types.
+
+    The primary gets every statement and replicas only the read statements.
+    Failures are retried until warm-up succeeds, the service stays unready meanwhile.
+    """
+    global _ready
+    read_statements = tuple(s for repo in REPOSITORIES for s in repo.READ_STATEMENTS)
+    write_statements = tuple(s for repo in REPOSITORIES for s in repo.WRITE_STATEMENTS)
+    size = get_pool_settings().effective_warm_size()
+    while True:
+        try:
+            await _warm_pool(get_pool(), size, read_statements + write_statements)
+            for pool in get_replica_pools():
+                await _warm_pool(pool, size, read_statements)
+            await get_issue_type_snapshots().get(get_pool())
+            break
+        except Exception as e:
+            logger.exception("Error in warm_up, retrying in %ss: %s", RETRY_DELAY, e)
+            await asyncio.sleep(RETRY_DELAY)
+    _ready = True
+    logger.info("Warm-up finished: %s connections per pool", size)
@@ -0,0 +1,166 @@
+from bisect import bisect_left
+from typing import Callable, Iterator, Sequence
+
+# Upper bounds, in seconds, for latency histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds, in bytes, for payload size histograms
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Counter:
+    """Monotonic counter with one value per label combination."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """Sets the total directly, for counters mirrored from another object at scrape time."""
+        self.values[labels] = value
+
+
+class Gauge:
+    """Value that goes up and down, with one value per label combination."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Fixed-bucket histogram with one series per label combination.
+
+    Observing is a bisect and three additions, cheap enough for every call on
+    the hot path.
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # The last slot counts the observations above the highest bucket
+            series = self._series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def series(self) -> Iterator[tuple[tuple, list[int], float, int]]:
+        """Yields (labels, cumulative bucket counts, sum, count) for every series."""
+        for labels, series in self._series.items():
+            cumulative = []
+            total = 0
+            for count in series.counts:
+                total += count
+                cumulative.append(total)
+            yield labels, cumulative, series.sum, series.count
+
+
+REGISTRY: list = []
+# Called before every export to refresh values read from other objects (pool sizes, ...)
+COLLECTORS: list[Callable[[], None]] = []
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Creates a counter and registers it for export."""
+    metric = Counter(name, documentation, labelnames)
+    REGISTRY.append(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Creates a gauge and registers it for export."""
+    metric = Gauge(name, documentation, labelnames)
+    REGISTRY.append(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    """Creates a histogram and registers it for export."""
+    metric = Histogram(name, documentation, labelnames, buckets)
+    REGISTRY.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    """Registers a callback that updates some gauges or counters right before each export."""
+    COLLECTORS.append(collector)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = ['%s="%s"' % (name, _escape(str(value))) for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+def render_text() -> str:
+    """Renders every registered metric in the Prometheus text exposition format (0.0.4)."""
+    for collector in COLLECTORS:
+        collector()
+    lines = []
+    for metric in REGISTRY:
+        lines.append("# HELP %s %s" % (metric.name, metric.documentation))
+        lines.append("# TYPE %s %s" % (metric.name, metric.kind))
+        if metric.kind == "histogram":
+            bounds = [repr(bound) for bound in metric.buckets] + ["+Inf"]
+            for labels, cumulative, total, count in metric.series():
+                for bound, value in zip(bounds, cumulative):
+                    lines.append("%s_bucket%s %d" % (
+                        metric.name, _labels(metric.labelnames, labels, 'le="%s"' % bound), value
+                    ))
+                lines.append("%s_sum%s %r" % (metric.name, _labels(metric.labelnames, labels), total))
+                lines.append("%s_count%s %d" % (metric.name, _labels(metric.labelnames, labels), count))
+        else:
+            for labels, value in metric.values.items():
+                lines.append("%s%s %r" % (metric.name, _labels(metric.labelnames, labels), value))
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,50 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException
+
+
+def encode_cursor(sort: str, sort_value: Optional[str], key: Any) -> str:
+    """Packs the position after a row into an opaque, URL-safe cursor."""
+    return urlsafe_b64encode(orjson.dumps([sort, sort_value, key])).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Tuple[Optional[str], Any]]:
+    """
+    Unpacks a cursor made by encode_cursor for the same `sort`.
+
+    Returns:
+        (sort value, key) of the last row already returned, or None for an
+        empty cursor (first page)
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort
+    """
+    if not cursor:
+        return None
+    try:
+        issued_for, sort_value, key = orjson.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if issued_for != sort:
+        raise HTTPException(status_code=400, detail="The cursor was issued for a different sort")
+    return sort_value, key
+
+
+def keyset_page(rows: List[Any], sort: str, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trims the extra row fetched by keyset_query and returns (rows, next cursor or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, last["sort_value"], last["cursor_key"])
+
+
+def page_total(page: int, limit: int, rows: Any) -> Optional[int]:
+    """Total implied by an offset page: a non-empty page shorter than `limit` is the last one.
+
+    Returns None when it cannot tell (full or empty page, or undecoded rows).
+    """
+    if not isinstance(rows, list) or not 0 < len(rows) < limit:
+        return None
+    return (page - 1) * limit + len(rows)
@@ -0,0 +1,106 @@
+from typing import List, Optional, Tuple
+import orjson
+from fastapi.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+def raw_json_response(
+    key: str,
+    data: Optional[bytes],
+    page: int,
+    limit: int,
+    total: Optional[int] = None,
+    exact: bool = True,
+    included: Optional[bytes] = None
+) -> Response:
+    """
+    Builds a list envelope around JSON bytes produced by Postgres without decoding them.
+
+    Args:
+        key: Name of the envelope field holding the rows (e.g. "Issues")
+        data: JSON array bytes as returned by the stored procedure, or None
+        page: Current page number
+        limit: Results limit per page
+        total: Total number of rows, or None when it is unknown
+        exact: False when `total` is a planner estimate
+        included: JSON object of side-loaded related rows (?expand=), if any
+
+    Returns:
+        An application/json Response whose body is the spliced envelope
+    """
+    body = b"".join((
+        b'{"', key.encode(), b'":', data or b"[]",
+        b',"page":', str(page).encode(),
+        b',"currentLimit":', str(limit).encode(),
+        b',"totalData":', b"null" if total is None else str(total).encode(),
+        b',"totalExact":', b"true" if exact and total is not None else b"false",
+        b',"included":' + included if included is not None else b"",
+        b"}",
+    ))
+    return Response(content=body, media_type="application/json")
+
+
+def cursor_json_response(
+    key: str,
+    rows: List[bytes],
+    limit: int,
+    next_cursor: Optional[str],
+    included: Optional[bytes] = None
+) -> Response:
+    """
+    Builds a keyset-paginated list envelope around per-row JSON bytes.
+
+    Args:
+        key: Name of the envelope field holding the rows (e.g. "Issues")
+        rows: One JSON object per row, as produced by Postgres
+        limit: Results limit per page
+        next_cursor: Cursor of the next page, or None on the last page
+        included: JSON object of side-loaded related rows (?expand=), if any
+
+    Returns:
+        An application/json Response with `key`, `currentLimit` and `next_cursor`
+    """
+    body = b"".join((
+        b'{"', key.encode(), b'":[', b",".join(rows),
+        b'],"currentLimit":', str(limit).encode(),
+        b',"next_cursor":', orjson.dumps(next_cursor),
+        b',"included":' + included if included is not None else b"",
+        b"}",
+    ))
+    return Response(content=body, media_type="application/json")
+
+
+def keyed_json_response(key: str, rows: List[Tuple[int, bytes]], missing: List[int]) -> Response:
+    """
+    Builds a batch lookup envelope around per-row JSON bytes.
+
+    Args:
+        key: Name of the envelope field holding the rows (e.g. "Issues")
+        rows: (id, JSON object) pairs, in the order they should appear
+        missing: Requested IDs that were not found
+
+    Returns:
+        An application/json Response with `key` (an object keyed by ID) and `missing`
+    """
+    body = b"".join((
+        b'{"', key.encode(), b'":{',
+        b",".join(b'"%d":%s' % (row_id, data) for row_id, data in rows),
+        b'},"missing":', orjson.dumps(missing),
+        b"}",
+    ))
+    return Response(content=body, media_type="application/json")
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that always closes its async generator.
+
+    Starlette abandons the body iterator when the client disconnects, which
+    would keep whatever it holds (a pooled connection and its transaction)
+    until garbage collection. Closing it runs its cleanup right away.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
@@ -1,6 +1,7 @@
 from datetime import datetime, date
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 from fastapi import HTTPException
+from app.database.query_builder import EntitySpec
 
 def parse_date(value: Optional[str]) -> Optional[date]:
     if value is None:
@@ -22,6 +23,66 @@ def parse_int(value: Optional[str]) -> Optional[int]:
             detail=f"Invalid integer format: {value}"
         )
     
+# Largest number of IDs accepted by the batch lookup endpoints
+BATCH_MAX_IDS = 500
+
+def parse_ids(values: List[str], max_ids: int = BATCH_MAX_IDS) -> List[int]:
+    """
+    Parses `ids` given as repeated parameters and/or comma-separated lists.
+
+    Returns:
+        The distinct IDs in the order given
+
+    Raises:
+        HTTPException: If there are none, too many, or one is not an integer
+    """
+    ids = [parse_int(part.strip()) for value in values for part in value.split(",") if part.strip()]
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Provide at least one id")
+    if len(ids) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per request")
+    return ids
+
+
+def parse_fields(spec: EntitySpec, value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a ?fields= list against the fields `spec` allows.
+
+    Returns:
+        The field names, or None when `value` is absent or blank (every field)
+
+    Raises:
+        HTTPException: If a field is unknown
+    """
+    if value is None or not value.strip():
+        return None
+    try:
+        return spec.parse_fields(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def procedure_error(result: Any) -> Optional[str]:
+    """
+    Reads a write procedure's `data` the way the single-row routes do.
+
+    Returns:
+        A message when it reports a failure (success false, status
+        "error"/"fail", or a status_code/code of 400 or more), else None
+    """
+    if not isinstance(result, dict):
+        return None
+    code = result.get("status_code", result.get("code"))
+    if not (
+        (isinstance(code, int) and code >= 400)
+        or result.get("success") is False
+        or str(result.get("status")).lower() in ("error", "fail")
+    ):
+        return None
+    return str(result.get("message") or result.get("detail") or result.get("error") or "Rejected by the database")
+
+
 def _validate_pagination_parameters(page: int, limit: int) -> None:
     """
     Validates pagination parameters.
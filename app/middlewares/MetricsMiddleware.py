@@ -0,0 +1,51 @@
+from time import perf_counter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.helpers.metrics import counter, gauge, histogram
+
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "Time to answer a request, by route template.", ("method", "route")
+)
+REQUESTS = counter(
+    "http_requests_total", "Answered requests by route template and status code.", ("method", "route", "status")
+)
+IN_FLIGHT = gauge("http_requests_in_flight", "Requests currently being served.", ("method",))
+
+# Label for requests that matched no route, so unknown paths cannot grow the series count
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency, status and in-flight counts for every HTTP request.
+
+    Written as a plain ASGI middleware so it adds a couple of timer reads and
+    dict updates per request and nothing else. Requests are labelled with the
+    matched route template (e.g. /issues/{issue_id}), never with the raw path.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec(method)
+            route = scope.get("route")
+            template = getattr(route, "path", UNMATCHED)
+            REQUEST_LATENCY.observe(perf_counter() - started, method, template)
+            REQUESTS.inc(method, template, str(status))
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from math import ceil
+from time import monotonic
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.helpers.metrics import counter, gauge, register_collector
+from app.middlewares.RequestValidationMiddleware import PUBLIC_PATHS, PUBLIC_PREFIXES
+from config.rate_limit import RateLimitSettings, load_rate_limit_settings
+
+RATE_LIMITED = counter("http_rate_limited_total", "Requests answered 429 by route group.", ("group",))
+RATE_LIMIT_KEYS = gauge("http_rate_limit_buckets", "Client buckets currently tracked.")
+
+
+class TokenBuckets:
+    """Token buckets for (route group, client) pairs, in least recently used order.
+
+    Every operation is O(1). At most `max_keys` buckets are kept; beyond that
+    the least recently used one is dropped. A bucket idle long enough to have
+    refilled completely is equivalent to a new one, so each call also drops
+    up to two such buckets from the cold end.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, list] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: tuple, rate: float, burst: int) -> float:
+        """Takes one token. Returns 0 when allowed, else the seconds until a token is available."""
+        now = monotonic()
+        self._evict_idle(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # [tokens, last update, seconds to refill completely]
+            bucket = self._buckets[key] = [float(burst), now, burst / rate]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    def _evict_idle(self, now: float) -> None:
+        for _ in range(2):
+            if not self._buckets:
+                return
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket[1] < bucket[2]:
+                return
+            del self._buckets[key]
+
+
+class RateLimitMiddleware:
+    """Per-client token bucket rate limit for each route group.
+
+    Clients are identified by the `sub` claim verified by
+    RequestValidationMiddleware, or by their IP address when the token has
+    none, so it must be installed inside that middleware. Requests over the
+    limit get 429 with Retry-After before any DB work happens.
+    """
+
+    def __init__(self, app: ASGIApp, settings: RateLimitSettings | None = None):
+        self.app = app
+        self.settings = settings or load_rate_limit_settings()
+        self.buckets = TokenBuckets(self.settings.max_keys)
+        register_collector(lambda: RATE_LIMIT_KEYS.set(len(self.buckets)))
+
+    def wait_for(self, scope: Scope) -> float:
+        """
+        Takes a token for the request `scope` from its client's bucket in its route group.
+
+        The batch controller calls this for each of its sub-requests, which
+        reach the router without passing through this middleware.
+
+        Returns:
+            0 when the request may go on (always for public paths, OPTIONS and
+            unlimited groups), else the seconds until a token is available
+        """
+        path = scope["path"]
+        if path.startswith(PUBLIC_PREFIXES) or path in PUBLIC_PATHS or scope["method"] == "OPTIONS":
+            return 0.0
+
+        group = path.strip("/").split("/", 1)[0]
+        limit = self.settings.limit_for(group)
+        if limit is None:
+            return 0.0
+
+        claims = scope.get("state", {}).get("jwt_claims") or {}
+        client = claims.get("sub")
+        if client is None:
+            client = scope["client"][0] if scope.get("client") else ""
+            key = (group, "ip", client)
+        else:
+            key = (group, "sub", str(client))
+
+        wait = self.buckets.take(key, limit.rate, limit.burst)
+        if wait:
+            RATE_LIMITED.inc(group)
+        return wait
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.wait_for(scope)
+        if wait:
+            response = JSONResponse(
+                content={"Title": "Too Many Requests", "StatusCode": 429},
+                status_code=429,
+                headers={"Retry-After": str(ceil(wait))}
+            )
+            await response(scope, receive, send)
+            return
+
+        # Lets the batch controller charge its sub-requests to the same buckets
+        scope["rate_limiter"] = self
+        await self.app(scope, receive, send)
@@ -1,85 +1,236 @@
-from fastapi import Request
+from collections import OrderedDict
+from hashlib import sha256
+from types import MappingProxyType
+from typing import Optional
 from fastapi.responses import JSONResponse
-from jose import jwt, JWTError, ExpiredSignatureError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from jose import jwt
 import os
+import time
+from app.helpers.metrics import counter, gauge, register_collector
+from config.auth import load_auth_settings
 
 # Environment variables and default values
 CLIENT_URL = os.getenv("CLIENT_URL", "http://localhost:5173")
 API_URL_HTTP = "http://localhost:8000"
 API_URL_HTTPS = "https://localhost:8000"
 JWT_SECRET = os.getenv("AUTH_API_JWT_SECRET", "secret")
+# CORS_MAX_AGE, JWT_CACHE_SIZE and JWT_CACHE_MAX_TTL; the application refuses to start when they are invalid
+_settings = load_auth_settings()
 
-async def request_validation_middleware(request: Request, call_next):
-    path = request.url.path
+JWT_CACHE_REQUESTS = counter("auth_jwt_cache_requests_total", "JWT verifications by cache result.", ("result",))
+JWT_CACHE_ENTRIES = gauge("auth_jwt_cache_entries", "Verified tokens currently cached.")
 
-    # Allow public routes (Swagger, OpenAPI, or index.html)
-    if path.startswith("/docs") or path.startswith("/openapi") or path.startswith("/index.html"):
-        return await call_next(request)
 
-    # Prepare CORS headers to be returned in responses (as requested)
-    cors_headers = {
-        "Access-Control-Allow-Headers": "Origin,X-Requested-With,Content-Type,Accept,Authorization",
-        "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS,PATCH",
-        "Access-Control-Allow-Origin": CLIENT_URL,
+class VerifiedTokenCache:
+    """Bounded LRU of tokens whose signature and claims were already verified.
+
+    Keys are SHA-256 digests of the token so the cache never holds the
+    credentials themselves. An entry expires at the token's `exp`, or after
+    `max_ttl` seconds if that comes first. Lookups and inserts never await, so
+    coroutines on the event loop cannot interleave inside them.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: float):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                JWT_CACHE_REQUESTS.inc("hit")
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+        JWT_CACHE_REQUESTS.inc("miss")
+        return None
+
+    def put(self, key: bytes, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+_token_cache = VerifiedTokenCache(_settings.jwt_cache_size, _settings.jwt_cache_max_ttl)
+register_collector(lambda: JWT_CACHE_ENTRIES.set(len(_token_cache)))
+
+
+def verify_token(token: str) -> dict:
+    """Returns the claims of a valid token, verifying the signature only on a cache miss.
+
+    Raises:
+        JWTError: If the token is invalid, tampered or expired
+    """
+    key = sha256(token.encode()).digest()
+    claims = _token_cache.get(key)
+    if claims is None:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        _token_cache.put(key, claims)
+    return claims
+
+# Public routes (Swagger, OpenAPI, index.html, the load balancer probes and Prometheus scrapes).
+# /health/pool exposes internals, so it needs a token like any other route.
+PUBLIC_PREFIXES = ("/docs", "/openapi", "/index.html")
+PUBLIC_PATHS = frozenset({"/health/live", "/health/ready", "/metrics"})
+
+# CORS headers returned with every validated or rejected response
+CORS_HEADERS = {
+    "Access-Control-Allow-Headers": "Origin,X-Requested-With,Content-Type,Accept,Authorization",
+    "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS,PATCH",
+    "Access-Control-Allow-Origin": CLIENT_URL,
+}
+_RAW_CORS_HEADERS = [(name.lower().encode(), value.encode()) for name, value in CORS_HEADERS.items()]
+
+ALLOWED_ORIGINS = frozenset((CLIENT_URL, API_URL_HTTP, API_URL_HTTPS))
+ALLOWED_METHODS = frozenset(CORS_HEADERS["Access-Control-Allow-Methods"].split(","))
+ALLOWED_HEADERS = frozenset(name.lower() for name in CORS_HEADERS["Access-Control-Allow-Headers"].split(","))
+
+
+def _static_response(status: int, body: bytes, extra_headers: list) -> tuple[dict, dict]:
+    """Prebuilds the ASGI messages of a response that never changes."""
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *_RAW_CORS_HEADERS,
+            *extra_headers,
+        ],
     }
+    return start, {"type": "http.response.body", "body": body}
+
+
+# Preflight answers are built once; an accepted one may be cached by the browser for CORS_MAX_AGE
+_PREFLIGHT_OK = _static_response(200, b"{}", [(b"access-control-max-age", str(_settings.cors_max_age).encode())])
+_PREFLIGHT_FORBIDDEN = _static_response(403, b'{"Title":"Forbidden","StatusCode":403}', [])
+
+
+def _preflight_allowed(origin: str, method: str, headers: str) -> bool:
+    """True when the origin, the requested method and every requested header are allowed."""
+    if origin and origin not in ALLOWED_ORIGINS:
+        return False
+    if method and method not in ALLOWED_METHODS:
+        return False
+    if headers:
+        for name in headers.split(","):
+            name = name.strip().lower()
+            if name and name not in ALLOWED_HEADERS:
+                return False
+    return True
+
+
+def _unauthorized() -> JSONResponse:
+    return JSONResponse(
+        content={"Title": "Unauthorized", "StatusCode": 401},
+        status_code=401,
+        headers=CORS_HEADERS
+    )
+
+
+class RequestValidationMiddleware:
+    """Origin and JWT validation plus CORS headers for every non-public request.
+
+    Written as a plain ASGI middleware rather than with app.middleware("http"),
+    so requests are not copied through BaseHTTPMiddleware's task and memory
+    stream and streaming responses pass through untouched. The CORS headers
+    are added to the http.response.start message on its way out.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(PUBLIC_PREFIXES) or path in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            await self._preflight(scope, send)
+            return
+
+        origin = ""
+        auth_header = ""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"authorization":
+                auth_header = value.decode("latin-1")
+
+        # Check request origin (manual CORS validation)
+        if origin and origin not in ALLOWED_ORIGINS:
+            response = JSONResponse(
+                content={"Title": "Forbidden", "StatusCode": 403},
+                status_code=403,
+                headers=CORS_HEADERS
+            )
+            await response(scope, receive, send)
+            return
+
+        # Validate JWT token
+        if not auth_header:
+            await _unauthorized()(scope, receive, send)
+            return
+
+        # Extract the Bearer token
+        token = auth_header.replace("Bearer ", "").strip()
+
+        try:
+            # Decode and validate the JWT token (cached once verified)
+            claims = verify_token(token)
+        except Exception:
+            # Expired, invalid or tampered token, or any other validation error
+            await _unauthorized()(scope, receive, send)
+            return
+
+        # Available to inner middlewares and routes as request.state.jwt_claims; read-only, since
+        # the same dict is cached and handed to every later request with this token
+        scope.setdefault("state", {})["jwt_claims"] = MappingProxyType(claims)
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Merge CORS headers without overwriting the ones the route already set
+                headers = list(message.get("headers", ()))
+                present = {name.lower() for name, _ in headers}
+                headers.extend(item for item in _RAW_CORS_HEADERS if item[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
 
-    if request.method == "OPTIONS":
-        # Immediate response for preflight with the required CORS headers
-        return JSONResponse(content={}, status_code=200, headers=cors_headers)
-
-    # Check request origin (manual CORS validation)
-    origin = request.headers.get("origin", "")
-    if origin and origin not in [CLIENT_URL, API_URL_HTTP, API_URL_HTTPS]:
-        return JSONResponse(
-            content={"Title": "Forbidden", "StatusCode": 403},
-            status_code=403,
-            headers=cors_headers
-        )
-
-    # Validate JWT token
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return JSONResponse(
-            content={"Title": "Unauthorized", "StatusCode": 401},
-            status_code=401,
-            headers=cors_headers
-        )
-
-    # Extract the Bearer token
-    token = auth_header.replace("Bearer ", "").strip()
-
-    try:
-        # Decode and validate the JWT token
-        jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-    except ExpiredSignatureError:
-        # Token expired
-        return JSONResponse(
-            content={"Title": "Unauthorized", "StatusCode": 401},
-            status_code=401,
-            headers=cors_headers
-        )
-    except JWTError:
-        # Invalid or tampered token
-        return JSONResponse(
-            content={"Title": "Unauthorized", "StatusCode": 401},
-            status_code=401,
-            headers=cors_headers
-        )
-    except Exception:
-        # Any other unexpected validation error
-        return JSONResponse(
-            content={"Title": "Unauthorized", "StatusCode": 401},
-            status_code=401,
-            headers=cors_headers
-        )
-
-    # If everything is fine, continue to the next middleware or route
-    # Call next and attach the CORS headers to the response so clients receive them
-    response = await call_next(request)
-    # Merge CORS headers into response headers (don't overwrite existing headers unintentionally)
-    for k, v in cors_headers.items():
-        # only set if not already present
-        if k not in response.headers:
-            response.headers[k] = v
-
-    return response
+    @staticmethod
+    async def _preflight(scope: Scope, send: Send) -> None:
+        """Answers a preflight immediately with one of the prebuilt responses."""
+        origin = method = headers = ""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"access-control-request-method":
+                method = value.decode("latin-1")
+            elif name == b"access-control-request-headers":
+                headers = value.decode("latin-1")
+        start, body = _PREFLIGHT_OK if _preflight_allowed(origin, method, headers) else _PREFLIGHT_FORBIDDEN
+        # Copies (headers list included), so that outer middlewares may edit the messages without touching the prebuilt ones
+        await send({**start, "headers": list(start["headers"])})
+        await send(dict(body))
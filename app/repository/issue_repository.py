@@ -1,49 +1,187 @@
 from asyncpg import Pool
-from typing import Optional, List, Dict, Any,Union
+from typing import Optional, List, Dict, Any, AsyncIterable, AsyncIterator, Tuple, Union
 from datetime import date
 from app.schemas.issue import IssueCreate, IssuePatchRequest, IssuePutRequest
-import json
-import logging
+from app.database.bulk_import import (
+    ImportColumn, ImportSpec, bulk_reference_query, read_csv_header, reference_query, staged_arrays_query,
+    stage_rows, validate_staged
+)
+from app.database.counts import count_rows
+from app.database.executor import call_procedure, fetch_rows, stream_rows, transaction
+from app.database.query_builder import (
+    EntitySpec, Filter, Relation, SortKey, batch_query, export_query, included_query, keyset_query, locked_chunk_query,
+    page_query
+)
+from app.helpers.pagination import keyset_page
 
-logger = logging.getLogger(__name__)
+POST_ISSUE_QUERY = 'CALL PUBLIC."POST_ISSUE"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, NULL)'
+# Set-based POST_ISSUE over arrays, from sql/bulk_issues.sql
+POST_ISSUES_QUERY = (
+    'CALL PUBLIC."POST_ISSUES"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, NULL)'
+)
+GET_ISSUE_QUERY = 'CALL PUBLIC."GET_ISSUE"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20)'
+PATCH_ISSUE_QUERY = 'CALL PUBLIC."PATCH_ISSUE"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)'
+# PATCH_ISSUE over an array of issue IDs, from sql/bulk_issues.sql
+PATCH_ISSUES_QUERY = (
+    'CALL PUBLIC."PATCH_ISSUES"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, NULL)'
+)
+PUT_ISSUE_QUERY = 'CALL PUBLIC."PUT_ISSUE"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, NULL)'
+DELETE_ISSUE_QUERY = 'CALL PUBLIC."DELETE_ISSUE"($1, NULL)'
+
+# Rows per server-side cursor fetch in exports
+EXPORT_BATCH_SIZE = 500
+# Issues locked and patched per transaction by bulk PATCH
+BULK_PATCH_CHUNK_SIZE = 500
+# Staged rows passed to POST_ISSUES per call by CSV imports
+IMPORT_BATCH_SIZE = 5000
+
+# Direct table access for what the stored procedures cannot do (keyset pagination, ...)
+ISSUE_SPEC = EntitySpec(
+    table='PUBLIC."ISSUE"',
+    key='"ISSUE_ID"',
+    filters={
+        "issue_id": Filter('"ISSUE_ID"'),
+        "summary": Filter('"SUMMARY"', "contains"),
+        "description": Filter('"DESCRIPTION"', "contains"),
+        "audit_id": Filter('"AUDIT_ID"'),
+        "resolve_at": Filter('"RESOLVE_AT"', cast="::text::date"),
+        "due_date": Filter('"DUE_DATE"', cast="::text::date"),
+        "votes": Filter('"VOTES"'),
+        "original_estimation": Filter('"ORIGINAL_ESTIMATION"'),
+        "custom_start_date": Filter('"CUSTOM_START_DATE"', cast="::text::date"),
+        "story_point_estimate": Filter('"STORY_POINT_ESTIMATE"'),
+        "parent_summary": Filter('"PARENT_SUMMARY"'),
+        "issue_type": Filter('"ISSUE_TYPE"'),
+        "project_id_fk": Filter('"PROJECT_ID_FK"'),
+        "user_assigned_fk": Filter('"USER_ASSIGNED_FK"'),
+        "user_creator_issue_fk": Filter('"USER_CREATOR_ISSUE_FK"'),
+        "user_informator_fk": Filter('"USER_INFORMATOR_FK"'),
+        "sprint_id_fk": Filter('"SPRINT_ID_FK"'),
+        "status_issue": Filter('"STATUS_ISSUE"'),
+        "ids": Filter('"ISSUE_ID"', "any", "::int[]"),
+    },
+    sort_keys={
+        "id": SortKey('"ISSUE_ID"'),
+        "due_date": SortKey('"DUE_DATE"', "::date"),
+        "resolve_at": SortKey('"RESOLVE_AT"', "::date"),
+        "custom_start_date": SortKey('"CUSTOM_START_DATE"', "::date"),
+        "votes": SortKey('"VOTES"', "::int"),
+        "story_point_estimate": SortKey('"STORY_POINT_ESTIMATE"', "::int"),
+    },
+    columns=(
+        "ISSUE_ID",
+        "SUMMARY",
+        "DESCRIPTION",
+        "AUDIT_ID",
+        "RESOLVE_AT",
+        "DUE_DATE",
+        "VOTES",
+        "ORIGINAL_ESTIMATION",
+        "CUSTOM_START_DATE",
+        "STORY_POINT_ESTIMATE",
+        "PARENT_SUMMARY",
+        "ISSUE_TYPE",
+        "PROJECT_ID_FK",
+        "USER_ASSIGNED_FK",
+        "USER_CREATOR_ISSUE_FK",
+        "USER_INFORMATOR_FK",
+        "SPRINT_ID_FK",
+        "STATUS_ISSUE",
+    ),
+)
+
+
+# Fields of IssueCreate accepted by the bulk endpoints, and where they are stored. Keep
+# them in POST_ISSUE(S) parameter order: bulk creates pass them positionally.
+ISSUE_CREATE_SPEC = ImportSpec(
+    columns=(
+        ImportColumn("summary", '"SUMMARY"', required=True),
+        ImportColumn("description", '"DESCRIPTION"', required=True),
+        ImportColumn("resolve_at", '"RESOLVE_AT"', "date", required=True),
+        ImportColumn("due_date", '"DUE_DATE"', "date", required=True),
+        ImportColumn("votes", '"VOTES"', "int", required=True),
+        ImportColumn("original_estimation", '"ORIGINAL_ESTIMATION"', "int", required=True),
+        ImportColumn("custom_start_date", '"CUSTOM_START_DATE"', "date", required=True),
+        ImportColumn("story_point_estimate", '"STORY_POINT_ESTIMATE"', "int", required=True),
+        ImportColumn("parent_summary", '"PARENT_SUMMARY"', "int", references=('PUBLIC."ISSUE"', '"ISSUE_ID"')),
+        ImportColumn("issue_type", '"ISSUE_TYPE"', "int", required=True, references=('PUBLIC."ISSUE_TYPE"', '"ISSUE_TYPE_ID"')),
+        ImportColumn("project_id", '"PROJECT_ID_FK"', "int", references=('PUBLIC."PROJECT"', '"PROJECT_ID"')),
+        ImportColumn("user_assigned", '"USER_ASSIGNED_FK"', "int", references=('PUBLIC."USER"', '"USER_ID"')),
+        ImportColumn("user_creator", '"USER_CREATOR_ISSUE_FK"', "int", references=('PUBLIC."USER"', '"USER_ID"')),
+        ImportColumn("user_informator", '"USER_INFORMATOR_FK"', "int", references=('PUBLIC."USER"', '"USER_ID"')),
+        ImportColumn("sprint_id", '"SPRINT_ID_FK"', "int", references=('PUBLIC."SPRINT"', '"SPRINT_ID"')),
+        ImportColumn("status", '"STATUS_ISSUE"', "int", required=True),
+    ),
+)
+
+# Entities GET /issues can side-load with ?expand=, by name
+ISSUE_RELATIONS = {
+    "issue_type": Relation("ISSUE_TYPE", 'PUBLIC."ISSUE_TYPE"', '"ISSUE_TYPE_ID"'),
+    "project": Relation("PROJECT_ID_FK", 'PUBLIC."PROJECT"', '"PROJECT_ID"'),
+    "sprint": Relation("SPRINT_ID_FK", 'PUBLIC."SPRINT"', '"SPRINT_ID"'),
+}
+
+ISSUE_BATCH_QUERY = batch_query(ISSUE_SPEC)
+ISSUE_REFERENCE_COLUMNS = tuple(c for c in ISSUE_CREATE_SPEC.columns if c.references is not None)
+BULK_ISSUE_REFERENCE_QUERY = bulk_reference_query(ISSUE_REFERENCE_COLUMNS)
+# IssuePatchRequest fields in PATCH_ISSUE parameter order, after the issue ID
+ISSUE_PATCH_FIELDS = (
+    "summary",
+    "description",
+    "audit_id",
+    "resolve_at",
+    "due_date",
+    "votes",
+    "original_estimation",
+    "custom_start_date",
+    "story_point_estimate",
+    "parent_summary",
+    "issue_type",
+    "project_id",
+    "user_assigned",
+    "user_creator",
+    "user_informator",
+    "sprint_id",
+    "status",
+)
+
+
+class _Rejected(Exception):
+    """Rolls the import savepoint back when an atomic batch has errors."""
 
 
 class IssueRepository:
     """Repository to handle data access logic for Issues"""
+    READ_STATEMENTS = (GET_ISSUE_QUERY, ISSUE_BATCH_QUERY)
+    WRITE_STATEMENTS = (
+        POST_ISSUE_QUERY, POST_ISSUES_QUERY, PATCH_ISSUE_QUERY, PATCH_ISSUES_QUERY, PUT_ISSUE_QUERY, DELETE_ISSUE_QUERY
+    )
 
     def __init__(self, db_pool: Pool):
         self.db_pool = db_pool
 
     async def post_issue(self, issue: IssueCreate) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."POST_ISSUE"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    issue.summary,
-                    issue.description,
-                    issue.resolve_at,
-                    issue.due_date,
-                    issue.votes,
-                    issue.original_estimation,
-                    issue.custom_start_date,
-                    issue.story_point_estimate,
-                    issue.parent_summary,
-                    issue.issue_type,
-                    issue.project_id,
-                    issue.user_assigned,
-                    issue.user_creator,
-                    issue.user_informator,
-                    issue.sprint_id,
-                    issue.status
-                )
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error in post_issue: %s", e)
-            raise
+        return await call_procedure(
+            self.db_pool,
+            POST_ISSUE_QUERY,
+            issue.summary,
+            issue.description,
+            issue.resolve_at,
+            issue.due_date,
+            issue.votes,
+            issue.original_estimation,
+            issue.custom_start_date,
+            issue.story_point_estimate,
+            issue.parent_summary,
+            issue.issue_type,
+            issue.project_id,
+            issue.user_assigned,
+            issue.user_creator,
+            issue.user_informator,
+            issue.sprint_id,
+            issue.status,
+            default={}
+        )
 
     async def get_issues(
         self,
@@ -66,120 +204,265 @@ class IssueRepository:
         sprint_id_fk: Optional[int] = None,
         status_issue: Optional[int] = None,
         page: int = 1,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
-        query = 'CALL PUBLIC."GET_ISSUE"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    issue_id,
-                    summary,
-                    description,
-                    audit_id,
-                    resolve_at,
-                    due_date,
-                    votes,
-                    original_estimation,
-                    custom_start_date,
-                    story_point_estimate,
-                    parent_summary,
-                    issue_type,
-                    project_id_fk,
-                    user_assigned_fk,
-                    user_creator_issue_fk,
-                    user_informator_fk,
-                    sprint_id_fk,
-                    status_issue,
-                    page,
-                    limit
+        limit: int = 10,
+        raw: bool = False
+    ) -> Union[List[Dict[str, Any]], Optional[bytes]]:
+        data_list = await call_procedure(
+            self.db_pool,
+            GET_ISSUE_QUERY,
+            issue_id,
+            summary,
+            description,
+            audit_id,
+            resolve_at,
+            due_date,
+            votes,
+            original_estimation,
+            custom_start_date,
+            story_point_estimate,
+            parent_summary,
+            issue_type,
+            project_id_fk,
+            user_assigned_fk,
+            user_creator_issue_fk,
+            user_informator_fk,
+            sprint_id_fk,
+            status_issue,
+            page,
+            limit,
+            raw=raw
+        )
+        if raw:
+            return data_list
+        return data_list if data_list else []
+
+    async def get_included(
+        self,
+        expand: List[str],
+        issues: List[Dict[str, Any]],
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """Returns {relation: {id: row}} with the rows the issues reference, for each ISSUE_RELATIONS name in `expand`."""
+        relations = {name: ISSUE_RELATIONS[name] for name in expand}
+        ids = [sorted({i[r.field] for i in issues if i.get(r.field) is not None}) for r in relations.values()]
+        rows = await fetch_rows(self.db_pool, "ISSUE_EXPAND", included_query(relations), *ids, raw=raw)
+        return rows[0]["included"]
+
+    async def get_issues_by_ids(self, ids: List[int]) -> Dict[int, bytes]:
+        """Returns the issues with the given IDs as JSON bytes, keyed by ID; absent IDs are left out."""
+        rows = await fetch_rows(self.db_pool, "ISSUE_BATCH", ISSUE_BATCH_QUERY, ids, raw=True)
+        return {row["key"]: row["data"] for row in rows}
+
+    async def get_issues_after(
+        self,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Optional[str], Any]],
+        sort: str = "id",
+        limit: int = 10,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[bytes], Optional[str]]:
+        """Returns up to `limit` issues (as JSON bytes) following `after`, and the cursor of the next page."""
+        query, args = keyset_query(ISSUE_SPEC, filters, sort, after, limit, fields)
+        rows = await fetch_rows(self.db_pool, "ISSUE_KEYSET", query, *args, raw=True)
+        rows, next_cursor = keyset_page(rows, sort, limit)
+        return [row["data"] for row in rows], next_cursor
+
+    async def count_issues(self, filters: Dict[str, Any], known: Optional[int] = None) -> Tuple[int, bool]:
+        """Returns (totalData, exact) for the issues matching `filters`."""
+        return await count_rows(self.db_pool, "ISSUE_COUNT", ISSUE_SPEC, filters, known)
+
+    async def get_issues_fields(self, filters: Dict[str, Any], fields: Tuple[str, ...], page: int = 1, limit: int = 10) -> bytes:
+        """Returns a page of issues reduced to `fields`, as one JSON array in bytes."""
+        query, args = page_query(ISSUE_SPEC, filters, fields, page, limit)
+        rows = await fetch_rows(self.db_pool, "ISSUE_FIELDS", query, *args, raw=True)
+        return rows[0]["data"]
+
+    async def export_issues(self, filters: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """Yields every issue matching `filters` as NDJSON, one chunk per cursor batch."""
+        query, args = export_query(ISSUE_SPEC, filters)
+        async for rows in stream_rows(self.db_pool, "ISSUE_EXPORT", query, *args, batch_size=EXPORT_BATCH_SIZE, raw=True):
+            yield b"\n".join(row["data"] for row in rows) + b"\n"
+
+    async def post_issues(self, issues: List[IssueCreate], atomic: bool = False) -> Dict[str, Any]:
+        """
+        Creates several issues through POST_ISSUES in a single transaction.
+
+        References are checked for every issue with one statement first;
+        the others are then created with one POST_ISSUES call, which runs
+        POST_ISSUE for each of them server side, so an issue the procedure
+        refuses is reported without undoing the rest.
+
+        Args:
+            issues: Issues to create
+            atomic: Create nothing when any issue is rejected
+
+        Returns:
+            {"results": [...], "errors": [{"row": n, "errors": [...]}]}:
+            `results` holds the POST_ISSUE result of each issue, in the order
+            of `issues`, with None for rejected ones; rows are numbered from 1
+        """
+        async with transaction(self.db_pool, "ISSUE_BULK_POST") as conn:
+            missing = await conn.fetch(
+                BULK_ISSUE_REFERENCE_QUERY, *([getattr(issue, c.name) for issue in issues] for c in ISSUE_REFERENCE_COLUMNS)
+            )
+            errors = [{"row": r["row_no"], "errors": list(r["errors"])} for r in missing]
+            created: Dict[int, Any] = {}
+            rejected = {e["row"] for e in errors}
+            accepted = [(row_no, issue) for row_no, issue in enumerate(issues, 1) if row_no not in rejected]
+            if accepted and not (atomic and errors):
+                result = await conn.fetchval(
+                    POST_ISSUES_QUERY,
+                    [row_no for row_no, _ in accepted],
+                    *([getattr(issue, c.name) for _, issue in accepted] for c in ISSUE_CREATE_SPEC.columns),
+                    atomic
                 )
-                if not row:
-                    return []
+                created = {c["row"]: c["data"] for c in result["created"]}
+                errors = sorted(errors + result["errors"], key=lambda e: e["row"])
+        return {"results": [created.get(row_no) for row_no in range(1, len(issues) + 1)], "errors": errors}
+
+    async def patch_issues(self, filters: Dict[str, Any], changes: IssuePatchRequest) -> Dict[str, Any]:
+        """
+        Applies the non-null fields of `changes` to every issue matching `filters`.
+
+        Each issue is changed through PATCH_ISSUE, like PATCH /issues/{id}.
+        The issues are locked and patched in key order, BULK_PATCH_CHUNK_SIZE
+        per transaction, so row locks are held briefly; each chunk is patched
+        with one PATCH_ISSUES call, which reports an issue the procedure
+        refuses without undoing the others. References are checked once up
+        front; nothing is changed if one is missing.
+
+        Args:
+            filters: GET /issues filter values, plus "ids" for a list of issue IDs
+            changes: Fields to set, as for PATCH /issues/{id}
 
-                data_json = row.get("data")
-                data_list = json.loads(data_json) if isinstance(data_json, str) else data_json
+        Returns:
+            {"updated": count, "errors": [...], "refused": [{"id": n, "errors": [...]}]},
+            errors naming missing references
+        """
+        fields = changes.dict(exclude_none=True)
+        referenced = [c for c in ISSUE_REFERENCE_COLUMNS if c.name in fields]
+        if referenced:
+            rows = await fetch_rows(
+                self.db_pool, "ISSUE_BULK_PATCH_CHECK", reference_query(referenced), *(fields[c.name] for c in referenced)
+            )
+            if rows[0]["errors"]:
+                return {"updated": 0, "errors": list(rows[0]["errors"]), "refused": []}
 
-                return data_list if data_list else []
-        except Exception as e:
-            logger.exception("Error in get_issues: %s", e)
-            raise
+        values = [getattr(changes, name) for name in ISSUE_PATCH_FIELDS]
+        updated, refused, after = 0, [], None
+        while True:
+            query, args = locked_chunk_query(ISSUE_SPEC, filters, after, BULK_PATCH_CHUNK_SIZE)
+            async with transaction(self.db_pool, "ISSUE_BULK_PATCH") as conn:
+                keys = [row[0] for row in await conn.fetch(query, *args)]
+                if keys:
+                    result = await conn.fetchval(PATCH_ISSUES_QUERY, keys, *values)
+                    updated += result["updated"]
+                    refused.extend(result["refused"])
+            if len(keys) < BULK_PATCH_CHUNK_SIZE:
+                return {"updated": updated, "errors": [], "refused": refused}
+            after = keys[-1]
+
+    async def import_issues(self, chunks: AsyncIterable[bytes], atomic: bool = False) -> Dict[str, Any]:
+        """
+        Imports issues from a CSV byte stream whose header names IssueCreate fields.
+
+        The rows are COPYed into a staging table as they arrive and validated
+        with one statement. The valid ones are then created through
+        POST_ISSUES, IMPORT_BATCH_SIZE rows per call, so each issue gets
+        POST_ISSUE's audit row and defaults. Everything runs in a single
+        transaction.
+
+        Args:
+            chunks: The CSV, header line first
+            atomic: Insert nothing when any row is invalid or refused
+
+        Returns:
+            {"inserted": count, "errors": [{"row": n, "errors": [...]}]}, rows
+            numbered from 1 after the header
+
+        Raises:
+            ValueError: If the header is empty or names unknown or repeated
+                fields, or lacks a required one
+        """
+        names, rows = await read_csv_header(chunks)
+        columns = ISSUE_CREATE_SPEC.select_columns(names)
+        async with transaction(self.db_pool, "ISSUE_IMPORT") as conn:
+            await stage_rows(conn, columns, rows, format="csv")
+            errors = await validate_staged(conn, columns)
+            inserted = 0
+            if not (atomic and errors):
+                query = staged_arrays_query(ISSUE_CREATE_SPEC, columns)
+                skip = [e["row"] for e in errors]
+                try:
+                    # A savepoint, so an atomic import can undo the batches already created
+                    async with conn.transaction():
+                        after = 0
+                        while True:
+                            batch = await conn.fetchrow(query, after, skip, IMPORT_BATCH_SIZE)
+                            if batch["row_no"] is None:
+                                break
+                            result = await conn.fetchval(POST_ISSUES_QUERY, *batch.values(), atomic)
+                            inserted += len(result["created"])
+                            errors.extend(result["errors"])
+                            if atomic and result["errors"]:
+                                raise _Rejected()
+                            if len(batch["row_no"]) < IMPORT_BATCH_SIZE:
+                                break
+                            after = batch["row_no"][-1]
+                except _Rejected:
+                    inserted = 0
+                errors.sort(key=lambda e: e["row"])
+        return {"inserted": inserted, "errors": errors}
 
     async def patch_issue(self, issue_id: int, issue: IssuePatchRequest) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PATCH_ISSUE"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    issue_id,
-                    issue.summary,
-                    issue.description,
-                    issue.audit_id,
-                    issue.resolve_at,
-                    issue.due_date,
-                    issue.votes,
-                    issue.original_estimation,
-                    issue.custom_start_date,
-                    issue.story_point_estimate,
-                    issue.parent_summary,
-                    issue.issue_type,
-                    issue.project_id,
-                    issue.user_assigned,
-                    issue.user_creator,
-                    issue.user_informator,
-                    issue.sprint_id,
-                    issue.status
-                )
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error in patch_issue: %s", e)
-            raise
+        return await call_procedure(
+            self.db_pool,
+            PATCH_ISSUE_QUERY,
+            issue_id,
+            issue.summary,
+            issue.description,
+            issue.audit_id,
+            issue.resolve_at,
+            issue.due_date,
+            issue.votes,
+            issue.original_estimation,
+            issue.custom_start_date,
+            issue.story_point_estimate,
+            issue.parent_summary,
+            issue.issue_type,
+            issue.project_id,
+            issue.user_assigned,
+            issue.user_creator,
+            issue.user_informator,
+            issue.sprint_id,
+            issue.status,
+            default={}
+        )
 
     async def put_issue(self, issue_id: int, issue: IssuePutRequest) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PUT_ISSUE"($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    issue_id,
-                    issue.summary,
-                    issue.description,
-                    issue.audit_id,
-                    issue.resolve_at,
-                    issue.due_date,
-                    issue.votes,
-                    issue.original_estimation,
-                    issue.custom_start_date,
-                    issue.story_point_estimate,
-                    issue.parent_summary,
-                    issue.issue_type,
-                    issue.project_id,
-                    issue.user_assigned,
-                    issue.user_creator,
-                    issue.user_informator,
-                    issue.sprint_id,
-                    issue.status
-                )
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error in put_issue: %s", e)
-            raise
+        return await call_procedure(
+            self.db_pool,
+            PUT_ISSUE_QUERY,
+            issue_id,
+            issue.summary,
+            issue.description,
+            issue.audit_id,
+            issue.resolve_at,
+            issue.due_date,
+            issue.votes,
+            issue.original_estimation,
+            issue.custom_start_date,
+            issue.story_point_estimate,
+            issue.parent_summary,
+            issue.issue_type,
+            issue.project_id,
+            issue.user_assigned,
+            issue.user_creator,
+            issue.user_informator,
+            issue.sprint_id,
+            issue.status,
+            default={}
+        )
 
     async def delete_issue(self, issue_id: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."DELETE_ISSUE"($1, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, issue_id)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error in delete_issue: %s", e)
-            raise
\ No newline at end of file
+        return await call_procedure(self.db_pool, DELETE_ISSUE_QUERY, issue_id, default={})
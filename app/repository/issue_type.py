@@ -1,86 +1,177 @@
-from asyncpg import Pool
-from typing import List, Dict, Any, Optional
-import json
+import asyncio
 import logging
+from dataclasses import dataclass
+from time import monotonic
+from types import MappingProxyType
+from asyncpg import Pool
+from typing import List, Dict, Any, Mapping, Optional, Tuple
+import orjson
+from app.database.executor import call_procedure, fetch_rows
+from app.database.query_builder import EntitySpec, Filter
+from config.database import load_snapshot_settings
+
+POST_ISSUE_TYPE_QUERY = 'CALL PUBLIC."POST_ISSUE_TYPE"($1, $2, NULL)'
+PATCH_ISSUE_TYPE_QUERY = 'CALL PUBLIC."PATCH_ISSUE_TYPE"(NULL, $1, $2, $3)'
+PUT_ISSUE_TYPE_QUERY = 'CALL PUBLIC."PUT_ISSUE_TYPE"($1, $2, $3, NULL)'
+DELETE_ISSUE_TYPE_QUERY = 'CALL PUBLIC."DELETE_ISSUE_TYPE"($1, NULL)'
+SNAPSHOT_ISSUE_TYPE_QUERY = 'SELECT row_to_json(t) AS data FROM PUBLIC."ISSUE_TYPE" t ORDER BY "ISSUE_TYPE_ID"'
 
 logger = logging.getLogger(__name__)
 
+# Filters and fields of the issue type list, served from IssueTypeSnapshot
+ISSUE_TYPE_SPEC = EntitySpec(
+    table='PUBLIC."ISSUE_TYPE"',
+    key='"ISSUE_TYPE_ID"',
+    filters={
+        "issue_type_id": Filter('"ISSUE_TYPE_ID"'),
+        "status": Filter('"STATUS"'),
+        "priority": Filter('"PRIORITY"'),
+    },
+    columns=(
+        "ISSUE_TYPE_ID",
+        "STATUS",
+        "PRIORITY",
+    ),
+)
+
+
+@dataclass(frozen=True)
+class IssueTypeSnapshot:
+    """Every issue type as of `loaded_at`, never modified once built.
+
+    `rows` are in ISSUE_TYPE_ID order and `encoded` holds the same rows as
+    JSON. `index` maps each filter of ISSUE_TYPE_SPEC to the positions of the
+    rows having each value, so filtered pages need no scan and no query.
+    """
+    rows: Tuple[Mapping[str, Any], ...]
+    encoded: Tuple[bytes, ...]
+    index: Mapping[str, Mapping[Any, Tuple[int, ...]]]
+    loaded_at: float
+
+    @classmethod
+    def build(cls, rows: List[Dict[str, Any]]) -> "IssueTypeSnapshot":
+        index = {}
+        for name, f in ISSUE_TYPE_SPEC.filters.items():
+            positions: Dict[Any, List[int]] = {}
+            for i, row in enumerate(rows):
+                positions.setdefault(row[f.column.strip('"')], []).append(i)
+            index[name] = MappingProxyType({value: tuple(p) for value, p in positions.items()})
+        return cls(
+            rows=tuple(MappingProxyType(row) for row in rows),
+            encoded=tuple(orjson.dumps(row) for row in rows),
+            index=MappingProxyType(index),
+            loaded_at=monotonic(),
+        )
+
+    def select(self, filters: Mapping[str, Any]) -> Tuple[int, ...]:
+        """Positions of the rows matching every non-None filter value, in ID order."""
+        selected = None
+        for name, value in filters.items():
+            if value is None:
+                continue
+            matches = self.index[name].get(value, ())
+            if selected is None:
+                selected = matches
+            else:
+                keep = set(matches)
+                selected = tuple(p for p in selected if p in keep)
+        return tuple(range(len(self.rows))) if selected is None else selected
+
+    def page(self, filters: Mapping[str, Any], fields: Optional[Tuple[str, ...]], page: int, limit: int) -> Tuple[bytes, int]:
+        """Returns one page of the matching rows as a JSON array (only `fields` when given) and the match count."""
+        selected = self.select(filters)
+        positions = selected[(page - 1) * limit:page * limit]
+        if fields is None:
+            data = b"[" + b",".join(self.encoded[p] for p in positions) + b"]"
+        else:
+            data = orjson.dumps([{name: self.rows[p][name] for name in fields} for p in positions])
+        return data, len(selected)
+
+
+class IssueTypeSnapshots:
+    """Holds the current IssueTypeSnapshot and replaces it as a whole.
+
+    Reloads are serialized, so a reload that started after a write always
+    wins over one that started before it. Readers keep the snapshot they
+    got, which a reload never changes. Load from the primary pool: a
+    replica may not have the write that triggered the reload yet.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: Optional[IssueTypeSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, pool: Pool) -> IssueTypeSnapshot:
+        """Returns the current snapshot, loading it first if there is none or it is older than `ttl`."""
+        snapshot = self._snapshot
+        if snapshot is not None and (self.ttl <= 0 or monotonic() - snapshot.loaded_at < self.ttl):
+            return snapshot
+        async with self._lock:
+            # Someone else reloaded while we waited
+            if self._snapshot is not snapshot and self._snapshot is not None:
+                return self._snapshot
+            return await self._load(pool)
+
+    async def reload(self, pool: Pool) -> None:
+        """Rebuilds the snapshot now, after a write. If that fails, the next read loads it instead."""
+        try:
+            async with self._lock:
+                await self._load(pool)
+        except Exception as e:
+            self._snapshot = None
+            logger.exception("Error reloading the issue types, the next read retries: %s", e)
+
+    async def _load(self, pool: Pool) -> IssueTypeSnapshot:
+        rows = await fetch_rows(pool, "ISSUE_TYPE_SNAPSHOT", SNAPSHOT_ISSUE_TYPE_QUERY)
+        self._snapshot = IssueTypeSnapshot.build([row["data"] for row in rows])
+        return self._snapshot
+
+
+_snapshots: Optional[IssueTypeSnapshots] = None
+
+
+def get_issue_type_snapshots() -> IssueTypeSnapshots:
+    """Returns the process-wide IssueTypeSnapshots, loading its settings on first use."""
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = IssueTypeSnapshots(load_snapshot_settings().issue_type_ttl)
+    return _snapshots
+
+
 class IssueTypeRepository:
+    READ_STATEMENTS = (SNAPSHOT_ISSUE_TYPE_QUERY,)
+    WRITE_STATEMENTS = (POST_ISSUE_TYPE_QUERY, PATCH_ISSUE_TYPE_QUERY, PUT_ISSUE_TYPE_QUERY, DELETE_ISSUE_TYPE_QUERY)
+
     def __init__(self, db_pool: Pool):
         self.db_pool = db_pool
 
     async def post_issue_type(self, status: int, priority: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."POST_ISSUE_TYPE"($1, $2, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, status, priority)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en post_issue_type: %s", e)
-            raise
+        return await call_procedure(self.db_pool, POST_ISSUE_TYPE_QUERY, status, priority, default={})
 
-    async def get_issue_type(
+    async def get_issue_types_page(
         self,
-        issue_type_id: Optional[int] = None,
-        status: Optional[int] = None,
-        priority: Optional[int] = None,
+        filters: Dict[str, Any],
+        fields: Optional[Tuple[str, ...]] = None,
         page: int = 1,
         limit: int = 10
-    ) -> Dict[str, Any]:  # <- returns dict with data, page, etc.
-        query = 'CALL PUBLIC."GET_ISSUE_TYPE"(NULL, $1, $2, $3, $4, $5)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, issue_type_id, status, priority, page, limit)
-                if not row:
-                    return {}
+    ) -> Tuple[bytes, int]:
+        """Returns a page of issue types as JSON bytes, and the total, from the in-memory snapshot.
 
-                # Extract OUT parameter DATA JSON
-                data_json = row.get("data")
-                data_list = json.loads(data_json) if isinstance(data_json, str) else data_json
+        `db_pool` must be the primary pool, since an expired snapshot is reloaded through it.
+        """
+        snapshot = await get_issue_type_snapshots().get(self.db_pool)
+        return snapshot.page(filters, fields, page, limit)
 
-                return data_list
-        except Exception as e:
-            logger.exception("Error en get_issue_type: %s", e)
-            raise
+    async def reload_issue_types(self) -> None:
+        """Rebuilds the in-memory snapshot; called after every successful write."""
+        await get_issue_type_snapshots().reload(self.db_pool)
 
     async def patch_issue_type(self, issue_type_id: int, status: Optional[int] = None, priority: Optional[int] = None) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PATCH_ISSUE_TYPE"(NULL, $1, $2, $3)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, issue_type_id, status, priority)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en patch_issue_type: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PATCH_ISSUE_TYPE_QUERY, issue_type_id, status, priority, default={})
 
     async def put_issue_type(self, issue_type_id: int, status: int, priority: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PUT_ISSUE_TYPE"($1, $2, $3, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, issue_type_id, status, priority)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en put_issue_type: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PUT_ISSUE_TYPE_QUERY, issue_type_id, status, priority, default={})
 
     async def delete_issue_type(self, issue_type_id: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."DELETE_ISSUE_TYPE"($1, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, issue_type_id)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en delete_issue_type: %s", e)
-            raise
+        return await call_procedure(self.db_pool, DELETE_ISSUE_TYPE_QUERY, issue_type_id, default={})
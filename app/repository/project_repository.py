@@ -1,13 +1,59 @@
 from datetime import date
 from decimal import Decimal
 from asyncpg import Pool
-from typing import Dict, Any, Optional
-import json
-import logging
+from typing import Dict, Any, List, Optional, Tuple
+from app.database.counts import count_rows
+from app.database.executor import call_procedure, fetch_rows
+from app.database.query_builder import EntitySpec, Filter, SortKey, batch_query, keyset_query, page_query
+from app.helpers.pagination import keyset_page
 
-logger = logging.getLogger(__name__)
+POST_PROJECT_QUERY = 'CALL PUBLIC."POST_PROJECT"($1, $2, $3, $4, $5, $6, $7, NULL)'
+GET_PROJECT_QUERY = 'CALL PUBLIC."GET_PROJECT"(NULL,$1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13)'
+PATCH_PROJECT_QUERY = 'CALL PUBLIC."PATCH_PROJECT"(NULL, $1, $2, $3, $4, $5, $6, $7, $8)'
+PUT_PROJECT_QUERY = 'CALL PUBLIC."PUT_PROJECT"($1, $2, $3, $4, $5, $6, $7, $8, NULL)'
+DELETE_PROJECT_QUERY = 'CALL PUBLIC."DELETE_PROJECT"($1,NULL)'
+
+# Direct table access for what the stored procedures cannot do (keyset pagination, ...)
+PROJECT_SPEC = EntitySpec(
+    table='PUBLIC."PROJECT"',
+    key='"PROJECT_ID"',
+    filters={
+        "project_id": Filter('"PROJECT_ID"'),
+        "name": Filter('"NAME"', "contains"),
+        "description": Filter('"DESCRIPTION"', "contains"),
+        "user_project_id_fk": Filter('"USER_PROJECT_ID_FK"'),
+        "date_init_start": Filter('"DATE_INIT"', ">=", "::text::date"),
+        "date_init_end": Filter('"DATE_INIT"', "<=", "::text::date"),
+        "date_end_start": Filter('"DATE_END"', ">=", "::text::date"),
+        "date_end_end": Filter('"DATE_END"', "<=", "::text::date"),
+        "status": Filter('"STATUS"'),
+        "progress_min": Filter('"PROGRESS"', ">=", "::float8::numeric"),
+        "progress_max": Filter('"PROGRESS"', "<=", "::float8::numeric"),
+    },
+    sort_keys={
+        "id": SortKey('"PROJECT_ID"'),
+        "name": SortKey('"NAME"'),
+        "date_init": SortKey('"DATE_INIT"', "::date"),
+        "date_end": SortKey('"DATE_END"', "::date"),
+    },
+    columns=(
+        "PROJECT_ID",
+        "NAME",
+        "DESCRIPTION",
+        "USER_PROJECT_ID_FK",
+        "DATE_INIT",
+        "DATE_END",
+        "STATUS",
+        "PROGRESS",
+    ),
+)
+
+PROJECT_BATCH_QUERY = batch_query(PROJECT_SPEC)
 
 class ProjectRepository:
+    READ_STATEMENTS = (GET_PROJECT_QUERY, PROJECT_BATCH_QUERY)
+    WRITE_STATEMENTS = (POST_PROJECT_QUERY, PATCH_PROJECT_QUERY, PUT_PROJECT_QUERY, DELETE_PROJECT_QUERY)
+
     def __init__(self, db_pool: Pool):
         self.db_pool = db_pool
 
@@ -21,17 +67,7 @@ class ProjectRepository:
         progress: Decimal,
         user_project_id_fk: Optional[int] = None
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."POST_PROJECT"($1, $2, $3, $4, $5, $6, $7, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, name, description, date_init, date_end, status, progress, user_project_id_fk)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en post_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, POST_PROJECT_QUERY, name, description, date_init, date_end, status, progress, user_project_id_fk, default={})
 
         
     async def get_project(
@@ -48,23 +84,49 @@ class ProjectRepository:
         progress_min: Optional[float] = None,
         progress_max: Optional[float] = None,
         page: int = 1,
-        limit: int = 10
+        limit: int = 10,
+        raw: bool = False
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."GET_PROJECT"(NULL,$1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    project_id, name, description, user_project_id_fk,
-                    date_init_start, date_init_end, date_end_start, date_end_end,
-                    status, progress_min, progress_max, page, limit
-                )
-                if not row:
-                    return {"data": []}
-                return {"data": json.loads(row["data"])}
-        except Exception as e:
-            logger.exception("Error en get_project: %s", e)
-            raise
+        data_list = await call_procedure(
+            self.db_pool,
+            GET_PROJECT_QUERY,
+            project_id, name, description, user_project_id_fk,
+            date_init_start, date_init_end, date_end_start, date_end_end,
+            status, progress_min, progress_max, page, limit,
+            raw=raw
+        )
+        if raw:
+            return {"data": data_list}
+        return {"data": data_list or []}
+
+    async def count_projects(self, filters: Dict[str, Any], known: Optional[int] = None) -> Tuple[int, bool]:
+        """Returns (totalData, exact) for the projects matching `filters`."""
+        return await count_rows(self.db_pool, "PROJECT_COUNT", PROJECT_SPEC, filters, known)
+
+    async def get_projects_fields(self, filters: Dict[str, Any], fields: Tuple[str, ...], page: int = 1, limit: int = 10) -> bytes:
+        """Returns a page of projects reduced to `fields`, as one JSON array in bytes."""
+        query, args = page_query(PROJECT_SPEC, filters, fields, page, limit)
+        rows = await fetch_rows(self.db_pool, "PROJECT_FIELDS", query, *args, raw=True)
+        return rows[0]["data"]
+
+    async def get_projects_by_ids(self, ids: List[int]) -> Dict[int, bytes]:
+        """Returns the projects with the given IDs as JSON bytes, keyed by ID; absent IDs are left out."""
+        rows = await fetch_rows(self.db_pool, "PROJECT_BATCH", PROJECT_BATCH_QUERY, ids, raw=True)
+        return {row["key"]: row["data"] for row in rows}
+
+    async def get_projects_after(
+        self,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Optional[str], Any]],
+        sort: str = "id",
+        limit: int = 10,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[bytes], Optional[str]]:
+        """Returns up to `limit` projects (as JSON bytes) following `after`, and the cursor of the next page."""
+        query, args = keyset_query(PROJECT_SPEC, filters, sort, after, limit, fields)
+        rows = await fetch_rows(self.db_pool, "PROJECT_KEYSET", query, *args, raw=True)
+        rows, next_cursor = keyset_page(rows, sort, limit)
+        return [row["data"] for row in rows], next_cursor
 
     async def patch_project(
         self,
@@ -77,17 +139,7 @@ class ProjectRepository:
         status: Optional[int] = None,
         progress: Optional[Decimal] = None
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PATCH_PROJECT"(NULL, $1, $2, $3, $4, $5, $6, $7, $8)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, project_id, name, description, user_project_id_fk, date_init, date_end, status, progress)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en patch_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PATCH_PROJECT_QUERY, project_id, name, description, user_project_id_fk, date_init, date_end, status, progress, default={})
 
     async def put_project(
         self,
@@ -100,26 +152,7 @@ class ProjectRepository:
         status: Optional[int] = None,
         progress: Optional[Decimal] = None
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PUT_PROJECT"($1, $2, $3, $4, $5, $6, $7, $8, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, project_id, name, description, user_project_id_fk, date_init, date_end, status, progress)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en put_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PUT_PROJECT_QUERY, project_id, name, description, user_project_id_fk, date_init, date_end, status, progress, default={})
 
     async def delete_project(self, project_id: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."DELETE_PROJECT"($1,NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, project_id)
-                if not row:
-                    return {}
-                return json.loads(row["data"]) if "data" in row else row
-        except Exception as e:
-            logger.exception("Error en delete_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, DELETE_PROJECT_QUERY, project_id, default={})
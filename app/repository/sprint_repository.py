@@ -1,12 +1,51 @@
 from datetime import date
-import json
-import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from asyncpg import Pool
+from app.database.counts import count_rows
+from app.database.executor import call_procedure, fetch_rows
+from app.database.query_builder import EntitySpec, Filter, SortKey, batch_query, keyset_query, page_query
+from app.helpers.pagination import keyset_page
 
-logger = logging.getLogger(__name__)
+GET_SPRINT_QUERY = 'CALL PUBLIC."GET_SPRINT"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9)'
+POST_SPRINT_QUERY = 'CALL PUBLIC."POST_SPRINT"($1, $2, $3, $4, NULL)'
+PATCH_SPRINT_QUERY = 'CALL PUBLIC."PATCH_SPRINT"(NULL, $1, $2, $3, $4, $5)'
+PUT_SPRINT_QUERY = 'CALL PUBLIC."PUT_SPRINT"($1, $2, $3, $4, $5, NULL)'
+DELETE_SPRINT_QUERY = 'CALL PUBLIC."DELETE_SPRINT"($1, NULL)'
+
+# Direct table access for what the stored procedures cannot do (keyset pagination, ...)
+SPRINT_SPEC = EntitySpec(
+    table='PUBLIC."SPRINT"',
+    key='"SPRINT_ID"',
+    filters={
+        "sprint_id": Filter('"SPRINT_ID"'),
+        "name": Filter('"NAME"', "contains"),
+        "description": Filter('"DESCRIPTION"', "contains"),
+        "date_init_start": Filter('"DATE_INIT"', ">=", "::text::date"),
+        "date_init_end": Filter('"DATE_INIT"', "<=", "::text::date"),
+        "date_end_start": Filter('"DATE_END"', ">=", "::text::date"),
+        "date_end_end": Filter('"DATE_END"', "<=", "::text::date"),
+    },
+    sort_keys={
+        "id": SortKey('"SPRINT_ID"'),
+        "name": SortKey('"NAME"'),
+        "date_init": SortKey('"DATE_INIT"', "::date"),
+        "date_end": SortKey('"DATE_END"', "::date"),
+    },
+    columns=(
+        "SPRINT_ID",
+        "NAME",
+        "DESCRIPTION",
+        "DATE_INIT",
+        "DATE_END",
+    ),
+)
+
+SPRINT_BATCH_QUERY = batch_query(SPRINT_SPEC)
 
 class SprintRepository:
+    READ_STATEMENTS = (GET_SPRINT_QUERY, SPRINT_BATCH_QUERY)
+    WRITE_STATEMENTS = (POST_SPRINT_QUERY, PATCH_SPRINT_QUERY, PUT_SPRINT_QUERY, DELETE_SPRINT_QUERY)
+
     def __init__(self, db_pool: Pool):
         self.db_pool = db_pool
 
@@ -21,50 +60,63 @@ class SprintRepository:
         date_end_end: Optional[str] = None,
         page: int = 1,
         limit: int = 10,
+        raw: bool = False,
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."GET_SPRINT"(NULL, $1, $2, $3, $4, $5, $6, $7, $8, $9)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    query,
-                    sprint_id,
-                    name,
-                    description,
-                    date_init_start,
-                    date_init_end,
-                    date_end_start,
-                    date_end_end,
-                    page,
-                    limit
-                )
-                if not row or row.get("data") is None:
-                    return {"data": [], "page": page, "currentLimit": limit, "totalData": 0}
+        data_list = await call_procedure(
+            self.db_pool,
+            GET_SPRINT_QUERY,
+            sprint_id,
+            name,
+            description,
+            date_init_start,
+            date_init_end,
+            date_end_start,
+            date_end_end,
+            page,
+            limit,
+            raw=raw
+        )
+        if data_list is None:
+            return {"data": [], "page": page, "currentLimit": limit, "totalData": 0}
+
+        return {
+            "data": data_list,
+            "page": page,
+            "currentLimit": limit,
+            "totalData": None if raw else len(data_list)
+        }
 
-                data_json = row["data"]
-                data_list = json.loads(data_json) if isinstance(data_json, str) else data_json
+    async def count_sprints(self, filters: Dict[str, Any], known: Optional[int] = None) -> Tuple[int, bool]:
+        """Returns (totalData, exact) for the sprints matching `filters`."""
+        return await count_rows(self.db_pool, "SPRINT_COUNT", SPRINT_SPEC, filters, known)
 
-                return {
-                    "data": data_list,
-                    "page": page,
-                    "currentLimit": limit,
-                    "totalData": len(data_list)
-                }
-        except Exception as e:
-            logger.exception("Error en get_sprint: %s", e)
-            raise
+    async def get_sprints_fields(self, filters: Dict[str, Any], fields: Tuple[str, ...], page: int = 1, limit: int = 10) -> bytes:
+        """Returns a page of sprints reduced to `fields`, as one JSON array in bytes."""
+        query, args = page_query(SPRINT_SPEC, filters, fields, page, limit)
+        rows = await fetch_rows(self.db_pool, "SPRINT_FIELDS", query, *args, raw=True)
+        return rows[0]["data"]
+
+    async def get_sprints_by_ids(self, ids: List[int]) -> Dict[int, bytes]:
+        """Returns the sprints with the given IDs as JSON bytes, keyed by ID; absent IDs are left out."""
+        rows = await fetch_rows(self.db_pool, "SPRINT_BATCH", SPRINT_BATCH_QUERY, ids, raw=True)
+        return {row["key"]: row["data"] for row in rows}
+
+    async def get_sprints_after(
+        self,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Optional[str], Any]],
+        sort: str = "id",
+        limit: int = 10,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[bytes], Optional[str]]:
+        """Returns up to `limit` sprints (as JSON bytes) following `after`, and the cursor of the next page."""
+        query, args = keyset_query(SPRINT_SPEC, filters, sort, after, limit, fields)
+        rows = await fetch_rows(self.db_pool, "SPRINT_KEYSET", query, *args, raw=True)
+        rows, next_cursor = keyset_page(rows, sort, limit)
+        return [row["data"] for row in rows], next_cursor
 
     async def post_sprint(self, params: tuple) -> Dict[str, Any]:
-        query = f'CALL PUBLIC."POST_SPRINT"({",".join([f"${i+1}" for i in range(len(params))])}, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, *params)
-                if not row:
-                    return {}
-                data_json = row.get("data")
-                return json.loads(data_json) if isinstance(data_json, str) else data_json
-        except Exception as e:
-            logger.exception("Error en post_sprint: %s", e)
-            raise
+        return await call_procedure(self.db_pool, POST_SPRINT_QUERY, *params, default={})
 
     async def patch_sprint(
         self,
@@ -74,17 +126,7 @@ class SprintRepository:
         date_init: Optional[date] = None,
         date_end: Optional[date] = None
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PATCH_SPRINT"(NULL, $1, $2, $3, $4, $5)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, sprint_id, name, description, date_init, date_end)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en patch_sprint: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PATCH_SPRINT_QUERY, sprint_id, name, description, date_init, date_end, default={})
 
     async def put_sprint(
         self,
@@ -94,27 +136,7 @@ class SprintRepository:
         date_init: date,
         date_end: date
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PUT_SPRINT"($1, $2, $3, $4, $5, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, sprint_id, name, description, date_init, date_end)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en put_sprint: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PUT_SPRINT_QUERY, sprint_id, name, description, date_init, date_end, default={})
 
     async def delete_sprint(self, sprint_id: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."DELETE_SPRINT"($1, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, sprint_id)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en delete_sprint: %s", e)
-            raise
\ No newline at end of file
+        return await call_procedure(self.db_pool, DELETE_SPRINT_QUERY, sprint_id, default={})
\ No newline at end of file
@@ -1,12 +1,38 @@
 from asyncpg import Pool
-from typing import List, Dict, Any, Optional
-import json
-import logging
+from typing import List, Dict, Any, Optional, Tuple, Union
 from decimal import Decimal
+from app.database.counts import count_rows
+from app.database.executor import call_procedure, fetch_rows
+from app.database.query_builder import EntitySpec, Filter, page_query
 
-logger = logging.getLogger(__name__)
+POST_USER_PROJECT_QUERY = 'CALL PUBLIC."POST_USER_PROJECT"($1, $2, $3, NULL)'
+GET_USER_PROJECT_QUERY = 'CALL PUBLIC."GET_USER_PROJECT"(NULL, $1, $2, $3, $4, $5, $6)'
+PATCH_USER_PROJECT_QUERY = 'CALL PUBLIC."PATCH_USER_PROJECT"(NULL, $1, $2, $3, $4)'
+PUT_USER_PROJECT_QUERY = 'CALL PUBLIC."PUT_USER_PROJECT"($1, $2, $3, $4, NULL)'
+DELETE_USER_PROJECT_QUERY = 'CALL PUBLIC."DELETE_USER_PROJECT"($1, NULL)'
+
+# Direct table access for what the stored procedures cannot do (totalData counts, sparse fieldsets)
+USER_PROJECT_SPEC = EntitySpec(
+    table='PUBLIC."USER_PROJECT"',
+    key='"USER_PROJECT_ID"',
+    filters={
+        "user_project_id": Filter('"USER_PROJECT_ID"'),
+        "user_id_fk": Filter('"USER_ID_FK"'),
+        "rol_proyect": Filter('"ROL_PROYECT"'),
+        "productivity": Filter('"PRODUCTIVITY"'),
+    },
+    columns=(
+        "USER_PROJECT_ID",
+        "USER_ID_FK",
+        "ROL_PROYECT",
+        "PRODUCTIVITY",
+    ),
+)
 
 class UserProjectRepository:
+    READ_STATEMENTS = (GET_USER_PROJECT_QUERY,)
+    WRITE_STATEMENTS = (POST_USER_PROJECT_QUERY, PATCH_USER_PROJECT_QUERY, PUT_USER_PROJECT_QUERY, DELETE_USER_PROJECT_QUERY)
+
     def __init__(self, db_pool: Pool):
         self.db_pool = db_pool
 
@@ -16,17 +42,7 @@ class UserProjectRepository:
         rol_proyect: int,
         productivity: Decimal
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."POST_USER_PROJECT"($1, $2, $3, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, user_id_fk, rol_proyect, productivity)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en post_user_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, POST_USER_PROJECT_QUERY, user_id_fk, rol_proyect, productivity, default={})
 
     async def get_user_project(
         self,
@@ -35,23 +51,23 @@ class UserProjectRepository:
         rol_proyect: Optional[int] = None,
         productivity: Optional[Decimal] = None,
         page: int = 1,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
-        query = 'CALL PUBLIC."GET_USER_PROJECT"(NULL, $1, $2, $3, $4, $5, $6)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, user_project_id, user_id_fk, rol_proyect, productivity, page, limit)
-                if not row:
-                    return []
+        limit: int = 10,
+        raw: bool = False
+    ) -> Union[List[Dict[str, Any]], Optional[bytes]]:
+        data_list = await call_procedure(
+            self.db_pool, GET_USER_PROJECT_QUERY, user_project_id, user_id_fk, rol_proyect, productivity, page, limit, raw=raw
+        )
+        return data_list if data_list is not None else []
+
+    async def count_user_projects(self, filters: Dict[str, Any], known: Optional[int] = None) -> Tuple[int, bool]:
+        """Returns (totalData, exact) for the user projects matching `filters`."""
+        return await count_rows(self.db_pool, "USER_PROJECT_COUNT", USER_PROJECT_SPEC, filters, known)
 
-                # Extract OUT parameter DATA JSON
-                data_json = row.get("data")
-                data_list = json.loads(data_json) if isinstance(data_json, str) else data_json
-                
-                return data_list if data_list is not None else []
-        except Exception as e:
-            logger.exception("Error en get_user_project: %s", e)
-            raise
+    async def get_user_projects_fields(self, filters: Dict[str, Any], fields: Tuple[str, ...], page: int = 1, limit: int = 10) -> bytes:
+        """Returns a page of user projects reduced to `fields`, as one JSON array in bytes."""
+        query, args = page_query(USER_PROJECT_SPEC, filters, fields, page, limit)
+        rows = await fetch_rows(self.db_pool, "USER_PROJECT_FIELDS", query, *args, raw=True)
+        return rows[0]["data"]
 
     async def patch_user_project(
         self,
@@ -60,17 +76,7 @@ class UserProjectRepository:
         rol_proyect: Optional[int] = None,
         productivity: Optional[Decimal] = None
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PATCH_USER_PROJECT"(NULL, $1, $2, $3, $4)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, user_project_id, user_id_fk, rol_proyect, productivity)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en patch_user_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PATCH_USER_PROJECT_QUERY, user_project_id, user_id_fk, rol_proyect, productivity, default={})
 
     async def put_user_project(
         self,
@@ -79,27 +85,7 @@ class UserProjectRepository:
         rol_proyect: int,
         productivity: Decimal
     ) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."PUT_USER_PROJECT"($1, $2, $3, $4, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, user_project_id, user_id_fk, rol_proyect, productivity)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en put_user_project: %s", e)
-            raise
+        return await call_procedure(self.db_pool, PUT_USER_PROJECT_QUERY, user_project_id, user_id_fk, rol_proyect, productivity, default={})
 
     async def delete_user_project(self, user_project_id: int) -> Dict[str, Any]:
-        query = 'CALL PUBLIC."DELETE_USER_PROJECT"($1, NULL)'
-        try:
-            async with self.db_pool.acquire() as conn:
-                row = await conn.fetchrow(query, user_project_id)
-                if not row:
-                    return {}
-                result_data = row.get("data") if "data" in row else row[0]
-                return json.loads(result_data) if isinstance(result_data, str) else result_data
-        except Exception as e:
-            logger.exception("Error en delete_user_project: %s", e)
-            raise
\ No newline at end of file
+        return await call_procedure(self.db_pool, DELETE_USER_PROJECT_QUERY, user_project_id, default={})
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from app.controllers.batch_controller import run_batch_controller
+from app.schemas.batch import BatchRequest
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+
+@router.post("/", responses={
+    200: {
+        "description": "One entry per sub-request, in order, with its own status and body",
+        "content": {"application/json": {"example": {"responses": [
+            {"id": "sprints", "status": 200, "body": {"data": [{"SPRINT_ID": 1}], "page": 1, "currentLimit": 10, "totalData": 1, "totalExact": True}},
+            {"id": "types", "status": 400, "body": {"detail": "fields must be a comma-separated list of: ISSUE_TYPE_ID, STATUS, PRIORITY"}},
+        ]}}}
+    },
+    400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "requests[0]: only GET sub-requests are allowed"}}}},
+})
+async def run_batch(batch: BatchRequest, request: Request):
+    """Runs several GET requests to the other endpoints concurrently, authenticated once."""
+    return await run_batch_controller(request, batch)
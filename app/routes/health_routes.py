@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.database.conection import get_admission_stats
+from app.database.bulkheads import get_bulkhead_stats
+from app.database.warmup import is_ready
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/ready", responses={
+    200: {"description": "Ready", "content": {"application/json": {"example": {"status": "ready"}}}},
+    503: {"description": "Warming up", "content": {"application/json": {"example": {"status": "warming up"}}}},
+})
+async def readiness():
+    """Reports 503 until the connection pool is warm, so load balancers hold traffic back."""
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
+
+
+@router.get("/pool")
+async def pool_stats():
+    """Admission queue depth and rejection counters of every connection pool and bulkhead."""
+    return {"pools": get_admission_stats(), "bulkheads": get_bulkhead_stats()}
@@ -10,6 +10,7 @@ from app.controllers.issue_type_controller import (
     delete_issue_type_controller
 )
 from app.database.conection import get_pool
+from app.database.bulkheads import bulkhead, WRITE, LOOKUP
 from app.schemas.issue_type import IssueTypeCreate
 
 router = APIRouter(
@@ -17,7 +18,7 @@ router = APIRouter(
     tags=["issue-types"]
 )
 
-@router.post("/", responses={
+@router.post("/", dependencies=[bulkhead(WRITE)], responses={
     201: {
         "description": "Created",
         "content": {
@@ -70,18 +71,20 @@ async def create_issue_type(
         logging.exception("Unexpected error in create_issue_type: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
-@router.get("/")
+@router.get("/", dependencies=[bulkhead(LOOKUP)])
 async def get_issue_types(
     issue_type_id: int = Query(None),
     status: int = Query(None),
     priority: int = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
+    fields: str = Query(None, description="Comma-separated columns to return, e.g. ISSUE_TYPE_ID,PRIORITY; the others are not read"),
+    # Primary, not replica: an expired snapshot is reloaded from this pool
     db_pool: Pool = Depends(get_pool)
 ):
-    return await get_issue_type_controller(db_pool, issue_type_id, status, priority, page, limit)
+    return await get_issue_type_controller(db_pool, issue_type_id, status, priority, page, limit, fields)
 
-@router.patch("/{issue_type_id}", responses={
+@router.patch("/{issue_type_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {
         "description": "Patched",
         "content": {"application/json": {"example": {"success": True, "data": {"id": 1, "status": 1, "priority": 2}}}}
@@ -134,7 +137,7 @@ async def patch_issue_type(
         logging.exception("Unexpected error in patch_issue_type: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
-@router.put("/{issue_type_id}", responses={
+@router.put("/{issue_type_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {
         "description": "Updated",
         "content": {"application/json": {"example": {"success": True, "data": {"id": 1, "status": 1, "priority": 2}}}}
@@ -184,7 +187,7 @@ async def put_issue_type(
         logging.exception("Unexpected error in put_issue_type: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
-@router.delete("/{issue_type_id}", responses={
+@router.delete("/{issue_type_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Deleted", "content": {"application/json": {"example": {"success": True}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Issue type not found"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}}
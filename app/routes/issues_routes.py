@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Query, HTTPException, Depends, Path
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Query, HTTPException, Depends, Path, Request
 from fastapi.responses import JSONResponse
 import logging
 from asyncpg import Pool
 from app.controllers.issue_controller import (
     post_issue_controller,
     get_issue_controller,
+    get_issue_page_controller,
+    get_issues_by_ids_controller,
+    export_issues_controller,
+    import_issues_controller,
+    post_issues_controller,
+    patch_issues_controller,
     patch_issue_controller,
     put_issue_controller,
     delete_issue_controller
 )
-from app.database.conection import get_pool
-from app.schemas.issue import IssueCreate, IssuePatchRequest, IssuePutRequest
+from app.database.conection import get_pool, get_read_pool
+from app.database.bulkheads import bulkhead, WRITE, LOOKUP, BULK_READ
+from app.helpers.utilities import parse_ids
+from app.schemas.issue import IssueBulkPatchRequest, IssueCreate, IssuePatchRequest, IssuePutRequest
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +28,49 @@ router = APIRouter(
     tags=["issues"]
 )
 
-@router.post("/", responses={
+def issue_filters(
+    issue_id: int = Query(None),
+    summary: str = Query(None),
+    description: str = Query(None),
+    audit_id: int = Query(None),
+    resolve_at: str = Query(None),
+    due_date: str = Query(None),
+    votes: int = Query(None),
+    original_estimation: int = Query(None),
+    custom_start_date: str = Query(None),
+    story_point_estimate: int = Query(None),
+    parent_summary: int = Query(None),
+    issue_type: int = Query(None),
+    project_id_fk: int = Query(None),
+    user_assigned_fk: int = Query(None),
+    user_creator_issue_fk: int = Query(None),
+    user_informator_fk: int = Query(None),
+    sprint_id_fk: int = Query(None),
+    status_issue: int = Query(None)
+) -> Dict[str, Any]:
+    """The GET /issues filter query parameters, shared by the list, export and bulk PATCH endpoints."""
+    return {
+        "issue_id": issue_id,
+        "summary": summary,
+        "description": description,
+        "audit_id": audit_id,
+        "resolve_at": resolve_at,
+        "due_date": due_date,
+        "votes": votes,
+        "original_estimation": original_estimation,
+        "custom_start_date": custom_start_date,
+        "story_point_estimate": story_point_estimate,
+        "parent_summary": parent_summary,
+        "issue_type": issue_type,
+        "project_id_fk": project_id_fk,
+        "user_assigned_fk": user_assigned_fk,
+        "user_creator_issue_fk": user_creator_issue_fk,
+        "user_informator_fk": user_informator_fk,
+        "sprint_id_fk": sprint_id_fk,
+        "status_issue": status_issue,
+    }
+
+@router.post("/", dependencies=[bulkhead(WRITE)], responses={
     201: {
         "description": "Created",
         "content": {
@@ -64,39 +115,157 @@ async def create_issue(
         logger.exception("Unexpected error in create_issue: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error siiiiiii"})
 
-@router.get("/")
+@router.get("/", dependencies=[bulkhead(BULK_READ, lookup_param="issue_id")])
 async def get_issues(
-    issue_id: int = Query(None),
-    summary: str = Query(None),
-    description: str = Query(None),
-    audit_id: int = Query(None),
-    resolve_at: str = Query(None),
-    due_date: str = Query(None),
-    votes: int = Query(None),
-    original_estimation: int = Query(None),
-    custom_start_date: str = Query(None),
-    story_point_estimate: int = Query(None),
-    parent_summary: int = Query(None),
-    issue_type: int = Query(None),
-    project_id_fk: int = Query(None),
-    user_assigned_fk: int = Query(None),
-    user_creator_issue_fk: int = Query(None),
-    user_informator_fk: int = Query(None),
-    sprint_id_fk: int = Query(None),
-    status_issue: int = Query(None),
+    filters: Dict[str, Any] = Depends(issue_filters),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
+    raw: bool = Query(False, description="Return the stored procedure JSON as-is, without decoding and re-encoding it"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass an empty cursor for the first page, then the returned next_cursor. Ignores page"),
+    sort: str = Query("id", description="Keyset pagination order: id, due_date, resolve_at, custom_start_date, votes, story_point_estimate; prefix with - for descending"),
+    expand: Optional[str] = Query(None, description="Comma-separated related entities to side-load into `included`, keyed by ID: issue_type, project, sprint"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. ISSUE_ID,SUMMARY,STATUS_ISSUE; the others are not read"),
+    db_pool: Pool = Depends(get_read_pool)
+):
+    if cursor is not None:
+        return await get_issue_page_controller(db_pool, filters, cursor, sort, limit, expand, fields)
+    return await get_issue_controller(db_pool, filters, page, limit, raw, expand, fields)
+
+@router.get("/batch", dependencies=[bulkhead(LOOKUP)], responses={
+    200: {
+        "description": "Found issues keyed by ID, and the IDs that do not exist",
+        "content": {"application/json": {"example": {"Issues": {"1": {"ISSUE_ID": 1}}, "missing": [2]}}}
+    },
+    400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "At most 500 ids per request"}}}}
+})
+async def get_issues_batch(
+    ids: List[str] = Query(..., description="IDs to fetch, repeated (ids=1&ids=2) or comma-separated (ids=1,2); at most 500"),
+    db_pool: Pool = Depends(get_read_pool)
+):
+    """Fetch several issues by ID with a single query."""
+    return await get_issues_by_ids_controller(db_pool, parse_ids(ids))
+
+
+@router.get("/export", dependencies=[bulkhead(BULK_READ)], responses={
+    200: {
+        "description": "Every matching issue, one JSON object per line",
+        "content": {"application/x-ndjson": {}}
+    }
+})
+async def export_issues(
+    filters: Dict[str, Any] = Depends(issue_filters),
+    db_pool: Pool = Depends(get_read_pool)
+):
+    """Stream every issue matching the filters as NDJSON, without paging."""
+    return await export_issues_controller(db_pool, filters)
+
+@router.post("/bulk", dependencies=[bulkhead(WRITE)], responses={
+    201: {
+        "description": "Every issue was created; results hold each POST_ISSUE result, in the order of the request",
+        "content": {
+            "application/json": {
+                "example": {"success": True, "results": [{"success": True}, {"success": True}], "errors": []}
+            }
+        }
+    },
+    207: {
+        "description": "Some issues were rejected (their results are null) and the others created",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "results": [{"success": True}, None],
+                    "errors": [{"row": 2, "errors": ["sprint_id does not exist"]}]
+                }
+            }
+        }
+    },
+    422: {"description": "Invalid body, or atomic=true and some issues were rejected; nothing was created"}
+})
+async def create_issues(
+    issues: List[IssueCreate],
+    atomic: bool = Query(False, description="Create nothing if any issue is rejected"),
+    db_pool: Pool = Depends(get_pool)
+):
+    """Create up to 1000 issues in a single transaction."""
+    result = await post_issues_controller(db_pool, issues, atomic)
+    if not result["errors"]:
+        status_code = 201
+    elif atomic:
+        status_code = 422
+    else:
+        status_code = 207
+    return JSONResponse(status_code=status_code, content=result)
+
+@router.post("/import", dependencies=[bulkhead(WRITE)], responses={
+    200: {
+        "description": "Rows inserted, and the errors of the rows that were not",
+        "content": {
+            "application/json": {
+                "example": {"success": False, "inserted": 2, "errors": [{"row": 3, "errors": ["due_date must be a YYYY-MM-DD date"]}]}
+            }
+        }
+    },
+    400: {
+        "description": "Bad Request",
+        "content": {"application/json": {"example": {"detail": "Missing required columns: status"}}}
+    },
+    422: {"description": "atomic=true and some rows are invalid; nothing was inserted"}
+}, openapi_extra={"requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}})
+async def import_issues(
+    request: Request,
+    atomic: bool = Query(False, description="Insert nothing if any row is invalid"),
+    db_pool: Pool = Depends(get_pool)
+):
+    """Create issues from a CSV body whose header names IssueCreate fields (e.g. summary,description,...,status)."""
+    result = await import_issues_controller(db_pool, request.stream(), atomic)
+    if atomic and result["errors"]:
+        return JSONResponse(content=result, status_code=422)
+    return result
+
+@router.patch("/bulk", dependencies=[bulkhead(WRITE)], responses={
+    200: {
+        "description": "Number of issues changed",
+        "content": {"application/json": {"example": {"success": True, "updated": 150, "errors": [], "refused": []}}}
+    },
+    207: {
+        "description": "PATCH_ISSUE refused some issues (listed in refused); the others were changed",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "updated": 149,
+                    "errors": [],
+                    "refused": [{"id": 42, "errors": ["Issue is closed"]}]
+                }
+            }
+        }
+    },
+    400: {
+        "description": "Bad Request",
+        "content": {"application/json": {"example": {"detail": "Provide ids or at least one filter"}}}
+    },
+    422: {
+        "description": "A referenced row does not exist; nothing was changed",
+        "content": {"application/json": {"example": {"success": False, "updated": 0, "errors": ["sprint_id does not exist"], "refused": []}}}
+    }
+})
+async def patch_issues(
+    body: IssueBulkPatchRequest,
+    filters: Dict[str, Any] = Depends(issue_filters),
     db_pool: Pool = Depends(get_pool)
 ):
-    return await get_issue_controller(
-        db_pool, issue_id, summary, description, audit_id, resolve_at,
-        due_date, votes, original_estimation, custom_start_date,
-        story_point_estimate, parent_summary, issue_type, project_id_fk,
-        user_assigned_fk, user_creator_issue_fk, user_informator_fk,
-        sprint_id_fk, status_issue, page, limit
-    )
-
-@router.patch("/{issue_id}", responses={
+    """Apply `changes` to the issues listed in `ids`, or to every issue matching the GET /issues filters."""
+    result = await patch_issues_controller(db_pool, {"ids": body.ids, **filters}, body.changes)
+    if result["errors"]:
+        status_code = 422
+    elif result["refused"]:
+        status_code = 207
+    else:
+        status_code = 200
+    return JSONResponse(status_code=status_code, content=result)
+
+@router.patch("/{issue_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {
         "description": "Patched",
         "content": {"application/json": {"example": {"success": True, "data": {"issue_id": 1}}}}
@@ -143,7 +312,7 @@ async def patch_issue(
         logger.exception("Unexpected error in patch_issue: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
-@router.put("/{issue_id}", responses={
+@router.put("/{issue_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {
         "description": "Updated",
         "content": {"application/json": {"example": {"success": True, "data": {"issue_id": 1}}}}
@@ -186,7 +355,7 @@ async def put_issue(
         logger.exception("Unexpected error in put_issue: %s", e)
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
-@router.delete("/{issue_id}", responses={
+@router.delete("/{issue_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Deleted", "content": {"application/json": {"example": {"success": True}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Issue not found"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}}
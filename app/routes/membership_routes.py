@@ -1,7 +1,8 @@
 from typing import Any
 from fastapi import APIRouter, Body, HTTPException, Depends, Path
 from asyncpg import Pool
-from app.database.conection import get_pool
+from app.database.conection import get_pool, acquire
+from app.database.bulkheads import bulkhead, WRITE
 from app.schemas.membership import membership
 
 router = APIRouter(
@@ -9,7 +10,7 @@ router = APIRouter(
     tags=["membership"]
 )
 
-@router.patch("/{user_id}")
+@router.patch("/{user_id}", dependencies=[bulkhead(WRITE)])
 async def membership_patch(
     body: membership = Body(...),
     user_id: int = Path(..., description="ID of the user to patch"),
@@ -22,7 +23,7 @@ async def membership_patch(
         RETURNING "USER_ID", "MEMBERSHIP_PLAN_ID";
     """
 
-    async with db_pool.acquire() as connection:
+    async with acquire(db_pool) as connection:
         result = await connection.fetchrow(query, body.membership, user_id)
 
     if not result:
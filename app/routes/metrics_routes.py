@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.helpers.metrics import render_text
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, pool and stored-procedure metrics in the Prometheus text format."""
+    return PlainTextResponse(render_text(), media_type="text/plain; version=0.0.4; charset=utf-8")
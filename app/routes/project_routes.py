@@ -1,11 +1,13 @@
 
 from fastapi import APIRouter, Depends, Query, HTTPException, Path
 from fastapi.responses import JSONResponse
-from typing import Optional
+from typing import List, Optional
 from asyncpg import Pool
 import logging
 
-from app.database.conection import get_pool
+from app.database.conection import get_pool, get_read_pool
+from app.database.bulkheads import bulkhead, WRITE, LOOKUP, BULK_READ
+from app.helpers.utilities import parse_ids
 from app.schemas.project import (
     ProjectResponse,
     ProjectCreate,
@@ -15,6 +17,8 @@ from app.schemas.project import (
 from app.controllers.project_controller import (
     post_project_controller,
     get_project_controller,
+    get_project_page_controller,
+    get_projects_by_ids_controller,
     patch_project_controller,
     put_project_controller,
     delete_project_controller,
@@ -26,7 +30,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/projects", tags=["projects"]) 
 
 
-@router.post("/", responses={
+@router.post("/", dependencies=[bulkhead(WRITE)], responses={
     201: {"description": "Created", "content": {"application/json": {"example": {"success": True, "data": {"id": 1}}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "required fields missing"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
@@ -75,7 +79,7 @@ async def create_project(project: ProjectCreate, db_pool: Pool = Depends(get_poo
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.get("/", response_model=ProjectResponse)
+@router.get("/", dependencies=[bulkhead(BULK_READ, lookup_param="project_id")], response_model=ProjectResponse)
 async def get_projects(
     project_id: Optional[int] = Query(None),
     name: Optional[str] = Query(None),
@@ -90,7 +94,11 @@ async def get_projects(
     progress_max: Optional[float] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
-    db_pool: Pool = Depends(get_pool),
+    raw: bool = Query(False, description="Return the stored procedure JSON as-is, without decoding and re-encoding it"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass an empty cursor for the first page, then the returned next_cursor. Ignores page"),
+    sort: str = Query("id", description="Keyset pagination order: id, name, date_init, date_end; prefix with - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. PROJECT_ID,NAME,STATUS; the others are not read"),
+    db_pool: Pool = Depends(get_read_pool),
 ):
     filters = {
         "project_id": project_id,
@@ -106,7 +114,9 @@ async def get_projects(
         "progress_max": progress_max,
     }
     try:
-        return await get_project_controller(db_pool, filters, page, limit)
+        if cursor is not None:
+            return await get_project_page_controller(db_pool, filters, cursor, sort, limit, fields)
+        return await get_project_controller(db_pool, filters, page, limit, raw, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -114,7 +124,22 @@ async def get_projects(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.patch("/{project_id}", responses={
+@router.get("/batch", dependencies=[bulkhead(LOOKUP)], responses={
+    200: {
+        "description": "Found projects keyed by ID, and the IDs that do not exist",
+        "content": {"application/json": {"example": {"data": {"1": {"PROJECT_ID": 1}}, "missing": [2]}}}
+    },
+    400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "At most 500 ids per request"}}}}
+})
+async def get_projects_batch(
+    ids: List[str] = Query(..., description="IDs to fetch, repeated (ids=1&ids=2) or comma-separated (ids=1,2); at most 500"),
+    db_pool: Pool = Depends(get_read_pool)
+):
+    """Fetch several projects by ID with a single query."""
+    return await get_projects_by_ids_controller(db_pool, parse_ids(ids))
+
+
+@router.patch("/{project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Patched", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "Provide at least one field to update"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Project not found"}}}},
@@ -179,7 +204,7 @@ async def patch_project(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.put("/{project_id}", responses={
+@router.put("/{project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Updated", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "All fields are required"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Project not found"}}}},
@@ -236,7 +261,7 @@ async def put_project(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.delete("/{project_id}", responses={
+@router.delete("/{project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Deleted", "content": {"application/json": {"example": {"success": True}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Project not found"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
@@ -8,19 +8,23 @@ import logging
 from app.schemas.sprint import SprintResponse, SprintCreate, SprintPatchRequest, SprintPutRequest
 from app.controllers.sprint_controller import (
     get_sprint_controller,
+    get_sprint_page_controller,
+    get_sprints_by_ids_controller,
     post_sprint_controller,
     patch_sprint_controller,
     put_sprint_controller,
     delete_sprint_controller,
 )
-from app.database.conection import get_pool
+from app.database.conection import get_pool, get_read_pool
+from app.database.bulkheads import bulkhead, WRITE, LOOKUP, BULK_READ
+from app.helpers.utilities import parse_ids
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/sprints", tags=["sprints"])
 
 
-@router.get("/", response_model=SprintResponse)
+@router.get("/", dependencies=[bulkhead(BULK_READ, lookup_param="sprint_id")], response_model=SprintResponse)
 async def list_sprints(
     sprint_id: int = Query(None),
     name: str = Query(None),
@@ -31,24 +35,43 @@ async def list_sprints(
     date_end_end: str = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
-    db_pool: Pool = Depends(get_pool),
+    raw: bool = Query(False, description="Return the stored procedure JSON as-is, without decoding and re-encoding it"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination: pass an empty cursor for the first page, then the returned next_cursor. Ignores page"),
+    sort: str = Query("id", description="Keyset pagination order: id, name, date_init, date_end; prefix with - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. SPRINT_ID,NAME,DATE_END; the others are not read"),
+    db_pool: Pool = Depends(get_read_pool),
 ):
+    filters = {
+        "sprint_id": sprint_id,
+        "name": name,
+        "description": description,
+        "date_init_start": date_init_start,
+        "date_init_end": date_init_end,
+        "date_end_start": date_end_start,
+        "date_end_end": date_end_end,
+    }
+    if cursor is not None:
+        return await get_sprint_page_controller(db_pool, filters, cursor, sort, limit, fields)
     # Delegate to controller which handles DB errors and returns the proper dict
-    return await get_sprint_controller(
-        db_pool,
-        sprint_id,
-        name,
-        description,
-        date_init_start,
-        date_init_end,
-        date_end_start,
-        date_end_end,
-        page,
-        limit,
-    )
-
-
-@router.post("/", responses={
+    return await get_sprint_controller(db_pool, filters, page, limit, raw, fields)
+
+
+@router.get("/batch", dependencies=[bulkhead(LOOKUP)], responses={
+    200: {
+        "description": "Found sprints keyed by ID, and the IDs that do not exist",
+        "content": {"application/json": {"example": {"data": {"1": {"SPRINT_ID": 1}}, "missing": [2]}}}
+    },
+    400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "At most 500 ids per request"}}}}
+})
+async def get_sprints_batch(
+    ids: List[str] = Query(..., description="IDs to fetch, repeated (ids=1&ids=2) or comma-separated (ids=1,2); at most 500"),
+    db_pool: Pool = Depends(get_read_pool)
+):
+    """Fetch several sprints by ID with a single query."""
+    return await get_sprints_by_ids_controller(db_pool, parse_ids(ids))
+
+
+@router.post("/", dependencies=[bulkhead(WRITE)], responses={
     201: {"description": "Created", "content": {"application/json": {"example": {"success": True, "data": {"id": 1}}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "name, description, date_init and date_end are required"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
@@ -82,7 +105,7 @@ async def create_sprint(sprint: SprintCreate, db_pool: Pool = Depends(get_pool))
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.patch("/{sprint_id}", responses={
+@router.patch("/{sprint_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Patched", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "Provide at least one field to update"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Sprint not found"}}}},
@@ -128,7 +151,7 @@ async def patch_sprint(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.put("/{sprint_id}", responses={
+@router.put("/{sprint_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Updated", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "All fields are required"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Sprint not found"}}}},
@@ -170,7 +193,7 @@ async def put_sprint(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.delete("/{sprint_id}", responses={
+@router.delete("/{sprint_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Deleted", "content": {"application/json": {"example": {"success": True}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "Sprint not found"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
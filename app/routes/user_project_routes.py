@@ -7,7 +7,8 @@ from app.controllers.user_project_controller import (
     put_user_project_controller,
     delete_user_project_controller,
 )
-from app.database.conection import get_pool
+from app.database.conection import get_pool, get_read_pool
+from app.database.bulkheads import bulkhead, WRITE, BULK_READ
 from decimal import Decimal
 from typing import Optional
 from fastapi.responses import JSONResponse
@@ -24,7 +25,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/user-projects", tags=["user-projects"])
 
 
-@router.post("/", responses={
+@router.post("/", dependencies=[bulkhead(WRITE)], responses={
     201: {"description": "Created", "content": {"application/json": {"example": {"success": True, "data": {"id": 1}}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "required fields missing"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
@@ -56,7 +57,7 @@ async def create_user_project(user_project: UserProjectCreate, db_pool: Pool = D
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.get("/")
+@router.get("/", dependencies=[bulkhead(BULK_READ, lookup_param="user_project_id")])
 async def get_user_projects(
     user_project_id: Optional[int] = Query(None),
     user_id_fk: Optional[int] = Query(None),
@@ -64,10 +65,18 @@ async def get_user_projects(
     productivity: Optional[Decimal] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
-    db_pool: Pool = Depends(get_pool),
+    raw: bool = Query(False, description="Return the stored procedure JSON as-is, without decoding and re-encoding it"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. USER_PROJECT_ID,USER_ID_FK; the others are not read"),
+    db_pool: Pool = Depends(get_read_pool),
 ):
+    filters = {
+        "user_project_id": user_project_id,
+        "user_id_fk": user_id_fk,
+        "rol_proyect": rol_proyect,
+        "productivity": productivity,
+    }
     try:
-        return await get_user_project_controller(db_pool, user_project_id, user_id_fk, rol_proyect, productivity, page, limit)
+        return await get_user_project_controller(db_pool, filters, page, limit, raw, fields)
     except HTTPException:
         raise
     except Exception as e:
@@ -75,7 +84,7 @@ async def get_user_projects(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.patch("/{user_project_id}", responses={
+@router.patch("/{user_project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Patched", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "Provide at least one field to update"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "User project not found"}}}},
@@ -117,7 +126,7 @@ async def patch_user_project(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.put("/{user_project_id}", responses={
+@router.put("/{user_project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Updated", "content": {"application/json": {"example": {"success": True}}}},
     400: {"description": "Bad Request", "content": {"application/json": {"example": {"detail": "All fields are required"}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "User project not found"}}}},
@@ -156,7 +165,7 @@ async def put_user_project(
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
-@router.delete("/{user_project_id}", responses={
+@router.delete("/{user_project_id}", dependencies=[bulkhead(WRITE)], responses={
     200: {"description": "Deleted", "content": {"application/json": {"example": {"success": True}}}},
     404: {"description": "Not Found", "content": {"application/json": {"example": {"detail": "User project not found"}}}},
     500: {"description": "Internal Server Error", "content": {"application/json": {"example": {"detail": "Internal Server Error"}}}},
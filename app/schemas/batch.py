@@ -0,0 +1,14 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class BatchSubRequest(BaseModel):
+    # Echoed back with the response so clients can match results
+    id: Optional[str] = None
+    method: str = "GET"
+    # Path and query string, e.g. "/issues/?limit=5&fields=ISSUE_ID,SUMMARY"
+    url: str
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
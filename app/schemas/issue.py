@@ -48,6 +48,12 @@ class IssuePatchRequest(IssueBase):
     pass
 
 
+class IssueBulkPatchRequest(BaseModel):
+    """Schema for bulk partial update: the changes, and the IDs of the issues to change (or use the GET /issues filters)."""
+    ids: Optional[List[int]] = None
+    changes: IssuePatchRequest
+
+
 class IssuePutRequest(BaseModel):
     """Schema for full replacement (PUT). All required fields must be provided."""
     summary: str
@@ -74,4 +80,5 @@ class IssueResponse(BaseModel):
     Issues: List[Dict[str, Any]]
     page: int
     currentLimit: int
-    totalData: int
\ No newline at end of file
+    totalData: int
+    totalExact: bool = True
\ No newline at end of file
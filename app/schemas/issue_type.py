@@ -19,3 +19,4 @@ class IssueTypeResponse(BaseModel):
     page: int
     currentLimit: int
     totalData: int
+    totalExact: bool = True
@@ -47,4 +47,5 @@ class ProjectResponse(BaseModel):
     data: List[Dict[str, Any]]
     page: int
     currentLimit: int
-    totalData: int
\ No newline at end of file
+    totalData: int
+    totalExact: bool = True
\ No newline at end of file
@@ -22,6 +22,7 @@ class SprintResponse(BaseModel):
     page: int
     currentLimit: int
     totalData: int
+    totalExact: bool = True
 
     def get_validated_sprints(self) -> List[Sprint]:
         validated: List[Sprint] = []
@@ -26,4 +26,5 @@ class UserProjectResponse(BaseModel):
     data: List[Dict[str, Any]]
     page: int
     currentLimit: int
-    totalData: int
\ No newline at end of file
+    totalData: int
+    totalExact: bool = True
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Per-request overhead of the auth/CORS middleware, before and after the pure ASGI rewrite.
+
+Drives three in-process apps with the same authenticated GET, straight
+through the ASGI interface so no network or HTTP client time is measured:
+
+- no middleware (baseline)
+- the previous app.middleware("http") implementation (BaseHTTPMiddleware)
+- RequestValidationMiddleware (plain ASGI)
+
+The token is verified once up front, so both middleware variants hit the
+verified-token cache and the difference is the middleware machinery itself.
+
+Run from the repository root:
+
+    python -m benchmarks.middleware_overhead [requests]
+"""
+import asyncio
+import sys
+import time
+from fastapi import FastAPI, Request
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.middlewares.RequestValidationMiddleware import (
+    API_URL_HTTP, API_URL_HTTPS, CLIENT_URL, CORS_HEADERS, JWT_SECRET,
+    RequestValidationMiddleware, verify_token,
+)
+
+
+async def legacy_dispatch(request: Request, call_next):
+    """The success path of the former request_validation_middleware function."""
+    path = request.url.path
+    if path.startswith("/docs") or path.startswith("/openapi") or path.startswith("/index.html") or path.startswith("/health"):
+        return await call_next(request)
+    cors_headers = dict(CORS_HEADERS)
+    origin = request.headers.get("origin", "")
+    if origin and origin not in [CLIENT_URL, API_URL_HTTP, API_URL_HTTPS]:
+        raise RuntimeError("benchmark request was rejected")
+    token = request.headers.get("Authorization").replace("Bearer ", "").strip()
+    verify_token(token)
+    response = await call_next(request)
+    for k, v in cors_headers.items():
+        if k not in response.headers:
+            response.headers[k] = v
+    return response
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if variant == "before":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_dispatch)
+    elif variant == "after":
+        app.add_middleware(RequestValidationMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, token: str) -> float:
+    """Returns the mean microseconds per request."""
+    headers = [
+        (b"host", b"localhost:8000"),
+        (b"origin", CLIENT_URL.encode()),
+        (b"authorization", b"Bearer " + token.encode()),
+    ]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError("unexpected status %s" % message["status"])
+
+    async def one():
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+            "root_path": "", "query_string": b"", "headers": headers,
+            "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+        }
+        await app(scope, receive, send)
+
+    for _ in range(min(1000, requests)):
+        await one()
+    started = time.perf_counter()
+    for _ in range(requests):
+        await one()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests: int) -> None:
+    token = jwt.encode({"sub": "1", "exp": int(time.time()) + 3600}, JWT_SECRET, algorithm="HS256")
+    verify_token(token)
+    results = {}
+    for variant in ("baseline", "before", "after"):
+        results[variant] = await measure(build_app(variant), requests, token)
+    baseline = results["baseline"]
+    print("%-10s %12s %12s" % ("variant", "us/request", "overhead"))
+    for variant, value in results.items():
+        print("%-10s %12.1f %12.1f" % (variant, value, value - baseline))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from config.database import _env_float, _env_int
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    """JWT verification cache and CORS preflight caching."""
+    # Seconds browsers may reuse a preflight answer before asking again
+    cors_max_age: int = 600
+    # Verified tokens kept in memory, and the longest a token is trusted without re-verifying it
+    jwt_cache_size: int = 10000
+    jwt_cache_max_ttl: float = 300.0
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.cors_max_age < 0:
+            raise ValueError("CORS_MAX_AGE must be >= 0")
+        if self.jwt_cache_size < 0:
+            raise ValueError("JWT_CACHE_SIZE must be >= 0")
+        if self.jwt_cache_max_ttl < 0:
+            raise ValueError("JWT_CACHE_MAX_TTL must be >= 0")
+
+
+def load_auth_settings() -> AuthSettings:
+    """Builds the auth settings from environment variables and validates them."""
+    settings = AuthSettings(
+        cors_max_age=_env_int("CORS_MAX_AGE", AuthSettings.cors_max_age),
+        jwt_cache_size=_env_int("JWT_CACHE_SIZE", AuthSettings.jwt_cache_size),
+        jwt_cache_max_ttl=_env_float("JWT_CACHE_MAX_TTL", AuthSettings.jwt_cache_max_ttl),
+    )
+    settings.validate()
+    return settings
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from config.database import _env_int
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """Limits of POST /batch/."""
+    # Sub-requests accepted per batch, and how many of them run at the same time
+    max_requests: int = 20
+    concurrency: int = 4
+    # Largest body a single sub-request may produce, since it is buffered in memory
+    max_response_bytes: int = 8 * 1024 * 1024
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.max_requests < 1:
+            raise ValueError("BATCH_MAX_REQUESTS must be >= 1")
+        if self.concurrency < 1:
+            raise ValueError("BATCH_CONCURRENCY must be >= 1")
+        if self.max_response_bytes < 1:
+            raise ValueError("BATCH_MAX_RESPONSE_BYTES must be >= 1")
+
+
+def load_batch_settings() -> BatchSettings:
+    """Builds the batch limits from environment variables and validates them."""
+    settings = BatchSettings(
+        max_requests=_env_int("BATCH_MAX_REQUESTS", BatchSettings.max_requests),
+        concurrency=_env_int("BATCH_CONCURRENCY", BatchSettings.concurrency),
+        max_response_bytes=_env_int("BATCH_MAX_RESPONSE_BYTES", BatchSettings.max_response_bytes),
+    )
+    settings.validate()
+    return settings
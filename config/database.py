@@ -0,0 +1,310 @@
+import re
+from dataclasses import dataclass
+from os import getenv
+from typing import Optional, Tuple
+
+
+# Postgres units accepted for the time and memory session settings
+_DURATION = re.compile(r"\d+\s*(us|ms|s|min|h|d)?")
+_MEMORY = re.compile(r"\d+\s*(B|kB|MB|GB|TB)?")
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = getenv(name)
+    if value is None or value == "":
+        return default
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{name} must be a boolean, got {value!r}")
+
+
+def _env_str(name: str, default: Optional[str]) -> Optional[str]:
+    value = getenv(name)
+    if value is None or value == "":
+        return default
+    return value
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool sizing and per-connection session settings."""
+    # Kept open while idle; the rest are opened on demand up to max_size
+    min_size: int = 2
+    max_size: int = 10
+    acquire_timeout: float = 10.0
+    statement_cache_size: int = 100
+    max_inactive_connection_lifetime: float = 300.0
+    command_timeout: Optional[float] = 60.0
+    statement_timeout: Optional[str] = "30s"
+    work_mem: Optional[str] = None
+    application_name: Optional[str] = "glob-data-application"
+    warm_size: Optional[int] = None
+    queue_depth: int = 100
+    retry_after: int = 1
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.min_size < 0:
+            raise ValueError("DB_POOL_MIN_SIZE must be >= 0")
+        if self.max_size < 1:
+            raise ValueError("DB_POOL_MAX_SIZE must be >= 1")
+        if self.min_size > self.max_size:
+            raise ValueError("DB_POOL_MIN_SIZE must not be greater than DB_POOL_MAX_SIZE")
+        if self.acquire_timeout <= 0:
+            raise ValueError("DB_POOL_ACQUIRE_TIMEOUT must be greater than 0")
+        if self.statement_cache_size < 0:
+            raise ValueError("DB_STATEMENT_CACHE_SIZE must be >= 0")
+        if self.max_inactive_connection_lifetime < 0:
+            raise ValueError("DB_POOL_MAX_INACTIVE_LIFETIME must be >= 0")
+        if self.command_timeout is not None and self.command_timeout <= 0:
+            raise ValueError("DB_COMMAND_TIMEOUT must be greater than 0")
+        if self.warm_size is not None and not 0 <= self.warm_size <= self.max_size:
+            raise ValueError("DB_POOL_WARM_SIZE must be between 0 and DB_POOL_MAX_SIZE")
+        if self.queue_depth < 0:
+            raise ValueError("DB_POOL_QUEUE_DEPTH must be >= 0")
+        if self.retry_after < 0:
+            raise ValueError("DB_POOL_RETRY_AFTER must be >= 0")
+        # Checked here, since Postgres would only reject them when the first connection opens
+        if self.statement_timeout is not None and not _DURATION.fullmatch(self.statement_timeout):
+            raise ValueError(f"DB_STATEMENT_TIMEOUT must look like '30s' or '500ms', got {self.statement_timeout!r}")
+        if self.work_mem is not None and not _MEMORY.fullmatch(self.work_mem):
+            raise ValueError(f"DB_WORK_MEM must look like '64MB' or '4096kB', got {self.work_mem!r}")
+        if self.application_name is not None and not (
+            len(self.application_name) < 64 and self.application_name.isascii() and self.application_name.isprintable()
+        ):
+            raise ValueError("DB_APPLICATION_NAME must be printable ASCII, shorter than 64 characters")
+
+    def effective_warm_size(self) -> int:
+        """Number of connections opened and prepared before the service reports ready."""
+        return self.min_size if self.warm_size is None else self.warm_size
+
+    def session_settings(self) -> dict:
+        """Returns the Postgres session GUCs applied once to every new connection."""
+        settings = {
+            "statement_timeout": self.statement_timeout,
+            "work_mem": self.work_mem,
+            "application_name": self.application_name,
+        }
+        return {name: value for name, value in settings.items() if value is not None}
+
+
+def load_pool_settings() -> PoolSettings:
+    """Builds the pool settings from environment variables and validates them."""
+    settings = PoolSettings(
+        min_size=_env_int("DB_POOL_MIN_SIZE", PoolSettings.min_size),
+        max_size=_env_int("DB_POOL_MAX_SIZE", PoolSettings.max_size),
+        acquire_timeout=_env_float("DB_POOL_ACQUIRE_TIMEOUT", PoolSettings.acquire_timeout),
+        statement_cache_size=_env_int("DB_STATEMENT_CACHE_SIZE", PoolSettings.statement_cache_size),
+        max_inactive_connection_lifetime=_env_float(
+            "DB_POOL_MAX_INACTIVE_LIFETIME", PoolSettings.max_inactive_connection_lifetime
+        ),
+        command_timeout=_env_float("DB_COMMAND_TIMEOUT", PoolSettings.command_timeout),
+        statement_timeout=_env_str("DB_STATEMENT_TIMEOUT", PoolSettings.statement_timeout),
+        work_mem=_env_str("DB_WORK_MEM", PoolSettings.work_mem),
+        application_name=_env_str("DB_APPLICATION_NAME", PoolSettings.application_name),
+        warm_size=_env_int("DB_POOL_WARM_SIZE", None),
+        queue_depth=_env_int("DB_POOL_QUEUE_DEPTH", PoolSettings.queue_depth),
+        retry_after=_env_int("DB_POOL_RETRY_AFTER", PoolSettings.retry_after),
+    )
+    settings.validate()
+    return settings
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    """Read replicas used for the GET_* stored procedures."""
+    addresses: Tuple[Tuple[str, int], ...] = ()
+    health_check_interval: float = 5.0
+    health_check_timeout: float = 2.0
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.health_check_interval <= 0:
+            raise ValueError("DB_REPLICA_HEALTHCHECK_INTERVAL must be greater than 0")
+        if self.health_check_timeout <= 0:
+            raise ValueError("DB_REPLICA_HEALTHCHECK_TIMEOUT must be greater than 0")
+
+
+def _parse_addresses(value: Optional[str], default_port: int) -> Tuple[Tuple[str, int], ...]:
+    addresses = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, port = item.rpartition(":")
+        if sep and port.isdigit():
+            addresses.append((host, int(port)))
+        else:
+            addresses.append((item, default_port))
+    return tuple(addresses)
+
+
+def load_replica_settings() -> ReplicaSettings:
+    """Builds the replica settings from POSTGRES_REPLICA_HOSTS ("host[:port],...")."""
+    settings = ReplicaSettings(
+        addresses=_parse_addresses(getenv("POSTGRES_REPLICA_HOSTS"), _env_int("POSTGRES_PORT", 5432)),
+        health_check_interval=_env_float("DB_REPLICA_HEALTHCHECK_INTERVAL", ReplicaSettings.health_check_interval),
+        health_check_timeout=_env_float("DB_REPLICA_HEALTHCHECK_TIMEOUT", ReplicaSettings.health_check_timeout),
+    )
+    settings.validate()
+    return settings
+
+
+@dataclass(frozen=True)
+class BulkheadSettings:
+    """Concurrent DB call caps per priority class."""
+    write_limit: int
+    lookup_limit: int
+    bulk_read_limit: int
+    queue_depth: int
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        for name, value in (
+            ("DB_BULKHEAD_WRITE", self.write_limit),
+            ("DB_BULKHEAD_LOOKUP", self.lookup_limit),
+            ("DB_BULKHEAD_BULK_READ", self.bulk_read_limit),
+        ):
+            if value < 1:
+                raise ValueError(f"{name} must be >= 1")
+        if self.queue_depth < 0:
+            raise ValueError("DB_BULKHEAD_QUEUE_DEPTH must be >= 0")
+
+
+def load_bulkhead_settings(pool: PoolSettings) -> BulkheadSettings:
+    """Builds the bulkhead caps; by default bulk reads may use half of the pool."""
+    settings = BulkheadSettings(
+        write_limit=_env_int("DB_BULKHEAD_WRITE", pool.max_size),
+        lookup_limit=_env_int("DB_BULKHEAD_LOOKUP", pool.max_size),
+        bulk_read_limit=_env_int("DB_BULKHEAD_BULK_READ", max(1, pool.max_size // 2)),
+        queue_depth=_env_int("DB_BULKHEAD_QUEUE_DEPTH", pool.queue_depth),
+    )
+    settings.validate()
+    return settings
+
+
+@dataclass(frozen=True)
+class AutoscaleSettings:
+    """Bounds and thresholds of the pool autoscaler."""
+    enabled: bool
+    min_limit: int
+    max_limit: int
+    interval: float = 5.0
+    grow_wait: float = 0.05
+    shrink_utilization: float = 0.5
+    shrink_windows: int = 3
+    step: int = 2
+    workers: int = 1
+    max_connections: Optional[int] = None
+
+    def validate(self, pool: PoolSettings) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError("DB_POOL_AUTOSCALE_MIN must be between 1 and DB_POOL_AUTOSCALE_MAX")
+        if self.max_limit > pool.max_size:
+            raise ValueError("DB_POOL_AUTOSCALE_MAX must not be greater than DB_POOL_MAX_SIZE")
+        if self.interval <= 0:
+            raise ValueError("DB_POOL_AUTOSCALE_INTERVAL must be greater than 0")
+        if self.grow_wait < 0:
+            raise ValueError("DB_POOL_AUTOSCALE_GROW_WAIT must be >= 0")
+        if not 0 < self.shrink_utilization < 1:
+            raise ValueError("DB_POOL_AUTOSCALE_SHRINK_UTILIZATION must be between 0 and 1")
+        if self.shrink_windows < 1:
+            raise ValueError("DB_POOL_AUTOSCALE_SHRINK_WINDOWS must be >= 1")
+        if self.step < 1:
+            raise ValueError("DB_POOL_AUTOSCALE_STEP must be >= 1")
+        if self.workers < 1:
+            raise ValueError("DB_POOL_WORKERS must be >= 1")
+        if self.max_connections is not None and self.max_connections < self.workers:
+            raise ValueError("DB_MAX_CONNECTIONS must allow at least one connection per worker")
+
+
+def load_autoscale_settings(pool: PoolSettings) -> AutoscaleSettings:
+    """Builds the autoscaler settings; by default it moves between DB_POOL_MIN_SIZE and DB_POOL_MAX_SIZE."""
+    settings = AutoscaleSettings(
+        enabled=_env_bool("DB_POOL_AUTOSCALE", False),
+        min_limit=_env_int("DB_POOL_AUTOSCALE_MIN", max(1, pool.min_size)),
+        max_limit=_env_int("DB_POOL_AUTOSCALE_MAX", pool.max_size),
+        interval=_env_float("DB_POOL_AUTOSCALE_INTERVAL", AutoscaleSettings.interval),
+        grow_wait=_env_float("DB_POOL_AUTOSCALE_GROW_WAIT", AutoscaleSettings.grow_wait),
+        shrink_utilization=_env_float(
+            "DB_POOL_AUTOSCALE_SHRINK_UTILIZATION", AutoscaleSettings.shrink_utilization
+        ),
+        shrink_windows=_env_int("DB_POOL_AUTOSCALE_SHRINK_WINDOWS", AutoscaleSettings.shrink_windows),
+        step=_env_int("DB_POOL_AUTOSCALE_STEP", AutoscaleSettings.step),
+        workers=_env_int("DB_POOL_WORKERS", _env_int("WEB_CONCURRENCY", AutoscaleSettings.workers)),
+        max_connections=_env_int("DB_MAX_CONNECTIONS", None),
+    )
+    settings.validate(pool)
+    return settings
+
+
+@dataclass(frozen=True)
+class CountSettings:
+    """How list endpoints compute totalData."""
+    exact_threshold: int = 10000
+    cache_ttl: float = 10.0
+    cache_size: int = 1024
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.exact_threshold < 0:
+            raise ValueError("DB_COUNT_EXACT_THRESHOLD must be >= 0")
+        if self.cache_ttl < 0:
+            raise ValueError("DB_COUNT_CACHE_TTL must be >= 0")
+        if self.cache_size < 1:
+            raise ValueError("DB_COUNT_CACHE_SIZE must be >= 1")
+
+
+def load_count_settings() -> CountSettings:
+    """Builds the totalData settings from the environment."""
+    settings = CountSettings(
+        exact_threshold=_env_int("DB_COUNT_EXACT_THRESHOLD", CountSettings.exact_threshold),
+        cache_ttl=_env_float("DB_COUNT_CACHE_TTL", CountSettings.cache_ttl),
+        cache_size=_env_int("DB_COUNT_CACHE_SIZE", CountSettings.cache_size),
+    )
+    settings.validate()
+    return settings
+
+
+@dataclass(frozen=True)
+class SnapshotSettings:
+    """In-memory copies of small tables served without a query."""
+    # Seconds a snapshot is served before it is read again, for writes made by other workers; 0 never expires it
+    issue_type_ttl: float = 60.0
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.issue_type_ttl < 0:
+            raise ValueError("ISSUE_TYPE_SNAPSHOT_TTL must be >= 0")
+
+
+def load_snapshot_settings() -> SnapshotSettings:
+    """Builds the snapshot settings from the environment."""
+    settings = SnapshotSettings(
+        issue_type_ttl=_env_float("ISSUE_TYPE_SNAPSHOT_TTL", SnapshotSettings.issue_type_ttl),
+    )
+    settings.validate()
+    return settings
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from os import getenv
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket: `rate` requests per second on average, bursts of up to `burst`."""
+    rate: float
+    burst: int
+
+
+def _parse_limit(name: str, value: str) -> Optional[RateLimit]:
+    """Parses "rate/burst" (e.g. "20/40"); "off" or "0" disables the limit."""
+    value = value.strip()
+    if value.lower() in ("off", "0"):
+        return None
+    rate, sep, burst = value.partition("/")
+    try:
+        limit = RateLimit(rate=float(rate), burst=int(burst) if sep else max(1, int(float(rate))))
+    except ValueError:
+        raise ValueError(f"{name} must look like 'rate/burst', got {value!r}")
+    if limit.rate <= 0 or limit.burst < 1:
+        raise ValueError(f"{name} needs a rate > 0 and a burst >= 1, got {value!r}")
+    return limit
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """Per-client limits for each route group (the first path segment, e.g. "issues")."""
+    default: Optional[RateLimit] = RateLimit(rate=50.0, burst=100)
+    groups: Dict[str, Optional[RateLimit]] = field(default_factory=dict)
+    max_keys: int = 100000
+
+    def validate(self) -> None:
+        """Raises ValueError if the settings are inconsistent."""
+        if self.max_keys < 1:
+            raise ValueError("RATE_LIMIT_MAX_KEYS must be >= 1")
+
+    def limit_for(self, group: str) -> Optional[RateLimit]:
+        """Returns the limit of `group`, or None when it is not limited."""
+        return self.groups.get(group, self.default)
+
+
+def load_rate_limit_settings() -> RateLimitSettings:
+    """Builds the limits from RATE_LIMIT_DEFAULT and RATE_LIMIT_GROUPS ("group=rate/burst,...")."""
+    default = RateLimitSettings.default
+    value = getenv("RATE_LIMIT_DEFAULT")
+    if value:
+        default = _parse_limit("RATE_LIMIT_DEFAULT", value)
+
+    groups = {}
+    for item in (getenv("RATE_LIMIT_GROUPS") or "").split(","):
+        if not item.strip():
+            continue
+        group, sep, limit = item.partition("=")
+        if not sep:
+            raise ValueError(f"RATE_LIMIT_GROUPS entries must look like 'group=rate/burst', got {item!r}")
+        groups[group.strip().strip("/")] = _parse_limit("RATE_LIMIT_GROUPS", limit)
+
+    max_keys = getenv("RATE_LIMIT_MAX_KEYS")
+    try:
+        max_keys = int(max_keys) if max_keys else RateLimitSettings.max_keys
+    except ValueError:
+        raise ValueError(f"RATE_LIMIT_MAX_KEYS must be an integer, got {max_keys!r}")
+
+    settings = RateLimitSettings(default=default, groups=groups, max_keys=max_keys)
+    settings.validate()
+    return settings
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from contextlib import asynccontextmanager
@@ -7,19 +8,40 @@ from app.routes.issue_type import router as issue_type
 from app.routes.sprint_routes import router as sprint
 from app.routes.project_routes import router as proyect
 from app.routes.user_project_routes import router as proyect_routes
+from app.routes.health_routes import router as health_routes
+from app.routes.metrics_routes import router as metrics_routes
+from app.routes.batch_routes import router as batch_routes
 
 
-from app.middlewares.RequestValidationMiddleware import request_validation_middleware
+from app.middlewares.RequestValidationMiddleware import RequestValidationMiddleware
+from app.middlewares.MetricsMiddleware import MetricsMiddleware
+from app.middlewares.RateLimitMiddleware import RateLimitMiddleware
 
-from app.database.conection import init_pool, close_pool
+from app.database.conection import init_pool, close_pool, monitor_replicas, get_pool_settings
+from app.database.autoscaler import autoscale_pools, check_connection_budget
+from app.database.warmup import warm_up
+from config.database import load_autoscale_settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Code that runs on startup
     await init_pool()
+    autoscale_settings = load_autoscale_settings(get_pool_settings())
+    try:
+        await check_connection_budget(autoscale_settings, get_pool_settings().max_size)
+    except ValueError:
+        await close_pool()
+        raise
+    replica_monitor = asyncio.create_task(monitor_replicas())
+    autoscaler = asyncio.create_task(autoscale_pools(autoscale_settings))
+    # Warm up in the background so /health/ready can answer while it runs
+    warmup = asyncio.create_task(warm_up())
     try:
         yield
     finally:
+        warmup.cancel()
+        autoscaler.cancel()
+        replica_monitor.cancel()
         # Ensure the DB pool is closed on shutdown
         await close_pool()
 
@@ -53,8 +75,12 @@ def custom_openapi():
 # Override the default OpenAPI generator so Swagger UI supports Bearer JWT
 app.openapi = custom_openapi
 
-# Add middleware
-app.middleware("http")(request_validation_middleware)
+# Add middleware (the last one added runs first)
+# Inside the JWT check so clients are limited by their verified subject
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(RequestValidationMiddleware)
+# Added last so it is outermost and also measures requests rejected by the JWT check
+app.add_middleware(MetricsMiddleware)
 
 # Mount routers
 app.include_router(issue_router)
@@ -62,4 +88,7 @@ app.include_router(issue_type)
 app.include_router(sprint)
 app.include_router(proyect)
 app.include_router(proyect_routes)
-app.include_router(membership_routes)
\ No newline at end of file
+app.include_router(membership_routes)
+app.include_router(health_routes)
+app.include_router(metrics_routes)
+app.include_router(batch_routes)
\ No newline at end of file
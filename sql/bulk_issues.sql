@@ -0,0 +1,190 @@
+-- Set-based wrappers the bulk issue endpoints call instead of one procedure
+-- CALL per issue. They run the per-issue procedures server side, so audit
+-- rows, AUDIT_ID and defaults stay exactly those of POST_ISSUE and
+-- PATCH_ISSUE, and the client makes one round trip per batch. Apply after the
+-- issue procedures.
+
+-- Message of a write procedure result that reports a failure (success false,
+-- status "error"/"fail", or a status_code/code of 400 or more), else NULL
+CREATE OR REPLACE FUNCTION PUBLIC."PROCEDURE_ERROR"(result json) RETURNS text
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN json_typeof(result) IS DISTINCT FROM 'object' THEN NULL
+        WHEN result->>'success' = 'false'
+            OR lower(result->>'status') IN ('error', 'fail')
+            OR CASE WHEN json_typeof(coalesce(result->'status_code', result->'code')) = 'number'
+                THEN coalesce(result->>'status_code', result->>'code')::numeric >= 400 ELSE false END
+        THEN coalesce(result->>'message', result->>'detail', result->>'error', 'Rejected by the database')
+    END
+$$;
+
+-- Creates one issue per array position through POST_ISSUE. p_row_no numbers
+-- the positions for the result. With p_atomic, the first refused issue rolls
+-- every one back; otherwise each refused issue is rolled back alone.
+-- data is {"created": [{"row": n, "data": <POST_ISSUE result>}], "errors": [{"row": n, "errors": [...]}]}
+CREATE OR REPLACE PROCEDURE PUBLIC."POST_ISSUES"(
+    p_row_no bigint[],
+    p_summary text[],
+    p_description text[],
+    p_resolve_at date[],
+    p_due_date date[],
+    p_votes int[],
+    p_original_estimation int[],
+    p_custom_start_date date[],
+    p_story_point_estimate int[],
+    p_parent_summary int[],
+    p_issue_type int[],
+    p_project_id int[],
+    p_user_assigned int[],
+    p_user_creator int[],
+    p_user_informator int[],
+    p_sprint_id int[],
+    p_status int[],
+    p_atomic boolean,
+    INOUT data json
+)
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+    current_row bigint;
+    result json;
+    failure text;
+    created_rows bigint[] := '{}';
+    created_data json[] := '{}';
+    error_rows bigint[] := '{}';
+    error_messages text[] := '{}';
+BEGIN
+    IF p_atomic THEN
+        -- One subtransaction for the whole batch
+        BEGIN
+            -- unnest reads the arrays in one pass instead of subscripting them per issue
+            FOR r IN SELECT * FROM unnest(
+                p_row_no, p_summary, p_description, p_resolve_at, p_due_date, p_votes, p_original_estimation,
+                p_custom_start_date, p_story_point_estimate, p_parent_summary, p_issue_type, p_project_id,
+                p_user_assigned, p_user_creator, p_user_informator, p_sprint_id, p_status
+            ) AS u(
+                row_no, summary, description, resolve_at, due_date, votes, original_estimation,
+                custom_start_date, story_point_estimate, parent_summary, issue_type, project_id,
+                user_assigned, user_creator, user_informator, sprint_id, status
+            ) LOOP
+                current_row := r.row_no;
+                result := NULL;
+                CALL PUBLIC."POST_ISSUE"(
+                    r.summary, r.description, r.resolve_at, r.due_date, r.votes, r.original_estimation,
+                    r.custom_start_date, r.story_point_estimate, r.parent_summary, r.issue_type, r.project_id,
+                    r.user_assigned, r.user_creator, r.user_informator, r.sprint_id, r.status, result
+                );
+                failure := PUBLIC."PROCEDURE_ERROR"(result);
+                IF failure IS NOT NULL THEN
+                    RAISE EXCEPTION USING MESSAGE = failure;
+                END IF;
+                created_rows := created_rows || r.row_no;
+                created_data := created_data || result;
+            END LOOP;
+        EXCEPTION WHEN data_exception OR integrity_constraint_violation OR raise_exception THEN
+            created_rows := '{}';
+            created_data := '{}';
+            error_rows := ARRAY[current_row];
+            error_messages := ARRAY[SQLERRM];
+        END;
+    ELSE
+        FOR r IN SELECT * FROM unnest(
+            p_row_no, p_summary, p_description, p_resolve_at, p_due_date, p_votes, p_original_estimation,
+            p_custom_start_date, p_story_point_estimate, p_parent_summary, p_issue_type, p_project_id,
+            p_user_assigned, p_user_creator, p_user_informator, p_sprint_id, p_status
+        ) AS u(
+            row_no, summary, description, resolve_at, due_date, votes, original_estimation,
+            custom_start_date, story_point_estimate, parent_summary, issue_type, project_id,
+            user_assigned, user_creator, user_informator, sprint_id, status
+        ) LOOP
+            -- One subtransaction per issue, so a refused one is undone alone
+            BEGIN
+                current_row := r.row_no;
+                result := NULL;
+                CALL PUBLIC."POST_ISSUE"(
+                    r.summary, r.description, r.resolve_at, r.due_date, r.votes, r.original_estimation,
+                    r.custom_start_date, r.story_point_estimate, r.parent_summary, r.issue_type, r.project_id,
+                    r.user_assigned, r.user_creator, r.user_informator, r.sprint_id, r.status, result
+                );
+                failure := PUBLIC."PROCEDURE_ERROR"(result);
+                IF failure IS NOT NULL THEN
+                    RAISE EXCEPTION USING MESSAGE = failure;
+                END IF;
+                created_rows := created_rows || r.row_no;
+                created_data := created_data || result;
+            EXCEPTION WHEN data_exception OR integrity_constraint_violation OR raise_exception THEN
+                error_rows := error_rows || current_row;
+                error_messages := error_messages || SQLERRM;
+            END;
+        END LOOP;
+    END IF;
+
+    data := json_build_object(
+        'created', (SELECT coalesce(json_agg(json_build_object('row', c.n, 'data', c.d) ORDER BY c.n), '[]')
+                    FROM unnest(created_rows, created_data) AS c(n, d)),
+        'errors', (SELECT coalesce(json_agg(json_build_object('row', e.n, 'errors', json_build_array(e.m)) ORDER BY e.n), '[]')
+                   FROM unnest(error_rows, error_messages) AS e(n, m))
+    );
+END
+$$;
+
+-- Applies the same change to every issue in p_ids through PATCH_ISSUE. The
+-- arguments after p_ids are PATCH_ISSUE's, after the issue ID. Each issue
+-- runs in its own subtransaction, so a refused one is undone alone.
+-- data is {"updated": n, "refused": [{"id": n, "errors": [...]}]}
+CREATE OR REPLACE PROCEDURE PUBLIC."PATCH_ISSUES"(
+    p_ids int[],
+    p_summary text,
+    p_description text,
+    p_audit_id int,
+    p_resolve_at date,
+    p_due_date date,
+    p_votes int,
+    p_original_estimation int,
+    p_custom_start_date date,
+    p_story_point_estimate int,
+    p_parent_summary int,
+    p_issue_type int,
+    p_project_id int,
+    p_user_assigned int,
+    p_user_creator int,
+    p_user_informator int,
+    p_sprint_id int,
+    p_status int,
+    INOUT data json
+)
+LANGUAGE plpgsql AS $$
+DECLARE
+    issue_id int;
+    result json;
+    failure text;
+    updated bigint := 0;
+    refused_ids int[] := '{}';
+    refused_messages text[] := '{}';
+BEGIN
+    FOREACH issue_id IN ARRAY coalesce(p_ids, '{}') LOOP
+        BEGIN
+            result := NULL;
+            CALL PUBLIC."PATCH_ISSUE"(
+                result, issue_id, p_summary, p_description, p_audit_id, p_resolve_at, p_due_date, p_votes,
+                p_original_estimation, p_custom_start_date, p_story_point_estimate, p_parent_summary, p_issue_type,
+                p_project_id, p_user_assigned, p_user_creator, p_user_informator, p_sprint_id, p_status
+            );
+            failure := PUBLIC."PROCEDURE_ERROR"(result);
+            IF failure IS NOT NULL THEN
+                RAISE EXCEPTION USING MESSAGE = failure;
+            END IF;
+            updated := updated + 1;
+        EXCEPTION WHEN data_exception OR integrity_constraint_violation OR raise_exception THEN
+            refused_ids := refused_ids || issue_id;
+            refused_messages := refused_messages || SQLERRM;
+        END;
+    END LOOP;
+
+    data := json_build_object(
+        'updated', updated,
+        'refused', (SELECT coalesce(json_agg(json_build_object('id', r.id, 'errors', json_build_array(r.m)) ORDER BY r.id), '[]')
+                    FROM unnest(refused_ids, refused_messages) AS r(id, m))
+    );
+END
+$$;
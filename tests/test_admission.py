@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from app.database.admission import AdmissionGate, PoolOverloadedError
+
+
+def _gate(limit=1, queue_depth=1, deadline=1.0) -> AdmissionGate:
+    return AdmissionGate("test", limit=limit, queue_depth=queue_depth, deadline=deadline, retry_after=2)
+
+
+def test_admits_up_to_the_limit_without_waiting():
+    async def scenario():
+        gate = _gate(limit=2)
+        await gate.enter()
+        await gate.enter()
+        return gate
+
+    gate = asyncio.run(scenario())
+    assert gate.in_use == 2
+    assert gate.admitted == 2
+    assert gate.waited == 0
+    assert gate.peak_in_use == 2
+
+
+def test_rejects_at_once_when_the_queue_is_full():
+    async def scenario():
+        gate = _gate(limit=1, queue_depth=1)
+        await gate.enter()
+        queued = asyncio.ensure_future(gate.enter())
+        await asyncio.sleep(0)
+        with pytest.raises(PoolOverloadedError) as rejected:
+            await gate.enter()
+        gate.leave()
+        await queued
+        return gate, rejected.value
+
+    gate, error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "2"}
+    assert gate.rejected_queue_full == 1
+    assert gate.in_use == 1
+
+
+def test_rejects_a_waiter_after_the_deadline():
+    async def scenario():
+        gate = _gate(limit=1, queue_depth=5, deadline=0.01)
+        await gate.enter()
+        with pytest.raises(PoolOverloadedError):
+            await gate.enter()
+        return gate
+
+    gate = asyncio.run(scenario())
+    assert gate.rejected_timeout == 1
+    assert gate.waiting == 0
+    assert gate.in_use == 1
+
+
+def test_hands_slots_over_in_fifo_order():
+    async def scenario():
+        gate = _gate(limit=1, queue_depth=3)
+        order = []
+
+        async def worker(name):
+            await gate.enter()
+            order.append(name)
+
+        await gate.enter()
+        tasks = [asyncio.ensure_future(worker(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        for _ in tasks:
+            gate.leave()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return gate, order
+
+    gate, order = asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    assert gate.in_use == 1
+    assert gate.waited == 3
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        gate = _gate(limit=1, queue_depth=2)
+        await gate.enter()
+        queued = asyncio.ensure_future(gate.enter())
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        gate.leave()
+        return gate
+
+    gate = asyncio.run(scenario())
+    assert gate.waiting == 0
+    assert gate.in_use == 0
+
+
+def test_resize_admits_waiters_and_drains_on_shrink():
+    async def scenario():
+        gate = _gate(limit=1, queue_depth=2)
+        await gate.enter()
+        queued = asyncio.ensure_future(gate.enter())
+        await asyncio.sleep(0)
+        gate.resize(2)
+        await queued
+        grown = gate.in_use
+
+        gate.resize(1)
+        # Slots above the new limit are retired, not handed to the next waiter
+        waiter = asyncio.ensure_future(gate.enter())
+        await asyncio.sleep(0)
+        gate.leave()
+        await asyncio.sleep(0)
+        retired = not waiter.done()
+        gate.leave()
+        await waiter
+        return gate, grown, retired
+
+    gate, grown, retired = asyncio.run(scenario())
+    assert grown == 2
+    assert retired
+    assert gate.in_use == 1
+    assert gate.limit == 1
@@ -0,0 +1,95 @@
+from app.database.admission import AdmissionGate
+from app.database.autoscaler import _next_limit, _PoolState
+from config.database import AutoscaleSettings
+
+SETTINGS = AutoscaleSettings(
+    enabled=True, min_limit=2, max_limit=10, grow_wait=0.05, shrink_utilization=0.5, shrink_windows=3, step=2
+)
+
+
+def _pool(limit=6, ceiling=10):
+    gate = AdmissionGate("test", limit=limit, queue_depth=10, deadline=1.0, retry_after=1)
+    state = _PoolState(gate)
+    state.ceiling = ceiling
+    return gate, state
+
+
+def _window(gate, admitted=0, wait_time=0.0, rejected=0, peak=0):
+    gate.admitted += admitted
+    gate.wait_time += wait_time
+    gate.rejected_timeout += rejected
+    gate.peak_in_use = peak
+
+
+def test_grows_when_callers_waited_too_long():
+    gate, state = _pool()
+    _window(gate, admitted=10, wait_time=1.0, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 8
+
+
+def test_grows_on_rejections():
+    gate, state = _pool()
+    _window(gate, admitted=1, rejected=1, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 8
+
+
+def test_short_waits_keep_the_limit():
+    gate, state = _pool()
+    _window(gate, admitted=10, wait_time=0.1, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 6
+    assert state.calm_windows == 0
+
+
+def test_never_grows_past_the_ceiling_or_max_limit():
+    gate, state = _pool(limit=6, ceiling=7)
+    _window(gate, rejected=3, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 7
+
+    gate, state = _pool(limit=10, ceiling=50)
+    _window(gate, rejected=3, peak=10)
+    assert _next_limit(gate, state, SETTINGS) == 10
+
+
+def test_shrinks_only_after_consecutive_calm_windows():
+    gate, state = _pool()
+    limits = []
+    for _ in range(3):
+        _window(gate, admitted=5, peak=1)
+        limits.append(_next_limit(gate, state, SETTINGS))
+    assert limits == [6, 6, 4]
+    assert state.calm_windows == 0
+
+
+def test_a_busy_window_resets_the_calm_streak():
+    gate, state = _pool()
+    _window(gate, admitted=5, peak=1)
+    _next_limit(gate, state, SETTINGS)
+    _window(gate, admitted=5, peak=5)
+    _next_limit(gate, state, SETTINGS)
+    assert state.calm_windows == 0
+    for _ in range(2):
+        _window(gate, admitted=5, peak=1)
+        assert _next_limit(gate, state, SETTINGS) == 6
+
+
+def test_shrink_stops_at_min_limit_and_peak():
+    gate, state = _pool(limit=3)
+    for _ in range(3):
+        _window(gate, peak=0)
+        limit = _next_limit(gate, state, SETTINGS)
+    assert limit == 2
+
+    gate, state = _pool(limit=10)
+    for _ in range(3):
+        _window(gate, peak=4)
+        limit = _next_limit(gate, state, SETTINGS)
+    assert limit == 8
+
+
+def test_only_counts_what_happened_since_the_last_window():
+    gate, state = _pool()
+    _window(gate, admitted=10, wait_time=5.0, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 8
+    gate.limit = 8
+    _window(gate, admitted=10, wait_time=0.0, peak=6)
+    assert _next_limit(gate, state, SETTINGS) == 8
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from app.controllers import batch_controller
+from app.routes.batch_routes import router as batch_router
+from config.batch import BatchSettings
+
+app = FastAPI()
+app.include_router(batch_router)
+
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int, size: int = 0):
+    return {"item": item_id, "padding": "x" * size}
+
+
+@app.get("/text")
+async def get_text():
+    return PlainTextResponse("plain")
+
+
+@app.post("/items")
+async def post_item():
+    return {"created": True}
+
+
+@app.get("/boom")
+async def boom():
+    raise RuntimeError("broken route")
+
+
+@pytest.fixture
+def client():
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def run(client, *requests):
+    return client.post("/batch/", json={"requests": [dict(zip(("id", "url", "method"), r)) for r in requests]})
+
+
+def test_keeps_the_order_and_ids_of_the_requests(client):
+    response = run(client, ("b", "/items/2"), ("a", "/items/1?size=3"), ("t", "/text"))
+    assert response.status_code == 200
+    assert response.json() == {"responses": [
+        {"id": "b", "status": 200, "body": {"item": 2, "padding": ""}},
+        {"id": "a", "status": 200, "body": {"item": 1, "padding": "xxx"}},
+        {"id": "t", "status": 200, "body": "plain"},
+    ]}
+
+
+def test_reports_routing_errors_per_request(client):
+    response = run(client, ("missing", "/nowhere"), ("method", "/items"), ("bad", "/items/x"), ("ok", "/items/1"))
+    assert [(r["id"], r["status"]) for r in response.json()["responses"]] == [
+        ("missing", 404), ("method", 405), ("bad", 422), ("ok", 200)
+    ]
+    assert response.json()["responses"][0]["body"] == {"detail": "Not Found"}
+
+
+def test_a_failing_request_only_fails_its_own_entry(client):
+    response = run(client, ("boom", "/boom"), ("ok", "/items/1"))
+    assert response.status_code == 200
+    assert response.json()["responses"] == [
+        {"id": "boom", "status": 500, "body": {"detail": "Internal Server Error"}},
+        {"id": "ok", "status": 200, "body": {"item": 1, "padding": ""}},
+    ]
+
+
+def test_rejects_more_than_batch_max_requests(client, monkeypatch):
+    monkeypatch.setattr(batch_controller, "_settings", BatchSettings(max_requests=2))
+    response = run(client, *((str(i), "/items/%d" % i) for i in range(3)))
+    assert response.status_code == 400
+    assert response.json() == {"detail": "At most 2 requests per batch"}
+
+
+def test_a_response_over_batch_max_response_bytes_gets_413(client, monkeypatch):
+    monkeypatch.setattr(batch_controller, "_settings", BatchSettings(max_response_bytes=100))
+    response = run(client, ("big", "/items/1?size=200"), ("small", "/items/2"))
+    assert [(r["id"], r["status"]) for r in response.json()["responses"]] == [("big", 413), ("small", 200)]
+    assert "larger than 100 bytes" in response.json()["responses"][0]["body"]["detail"]
+
+
+@pytest.mark.parametrize("request_, detail", [
+    (("p", "/items", "POST"), "requests[0]: only GET sub-requests are allowed"),
+    (("abs", "http://example.com/items/1"), "requests[0]: url must be a path such as /issues/?limit=5"),
+    (("net", "//example.com/items/1"), "requests[0]: url must be a path such as /issues/?limit=5"),
+])
+def test_rejects_non_get_and_absolute_urls(client, request_, detail):
+    response = run(client, request_)
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
@@ -0,0 +1,84 @@
+import pytest
+from app.database.bulk_import import ImportColumn, ImportSpec, _checks, bulk_reference_query, staged_arrays_query
+from app.helpers.utilities import procedure_error
+
+SPEC = ImportSpec(
+    columns=(
+        ImportColumn("name", '"NAME"', required=True),
+        ImportColumn("size", '"SIZE"', "int"),
+        ImportColumn("made_on", '"MADE_ON"', "date"),
+        ImportColumn("owner", '"OWNER_ID"', "int", references=('PUBLIC."USER"', '"USER_ID"')),
+    ),
+)
+
+
+def test_select_columns_keeps_the_header_order():
+    assert [c.name for c in SPEC.select_columns(["size", "name"])] == ["size", "name"]
+
+
+@pytest.mark.parametrize("names, message", [
+    (["name", "colour"], "Unknown columns: colour"),
+    (["name", "name"], "Repeated columns in header"),
+    (["size"], "Missing required columns: name"),
+])
+def test_select_columns_rejects_bad_headers(names, message):
+    with pytest.raises(ValueError, match=message):
+        SPEC.select_columns(names)
+
+
+def test_required_text_is_checked_as_sent():
+    assert _checks(SPEC.columns[0]) == ["CASE WHEN s.name IS NULL THEN 'name is required' END"]
+
+
+def test_int_treats_blank_as_missing():
+    assert _checks(SPEC.columns[1]) == [
+        "CASE WHEN NULLIF(btrim(s.size), '') !~ '^[+-]?[0-9]{1,9}$' THEN 'size must be an integer' END"
+    ]
+
+
+def test_date_checks_the_format_before_casting_the_parts():
+    (check,) = _checks(SPEC.columns[2])
+    value = "NULLIF(btrim(s.made_on), '')"
+    assert check.startswith("CASE WHEN %s IS NULL THEN NULL WHEN %s !~ " % (value, value))
+    assert check.index("!~") < check.index("::int")
+    assert check.endswith("THEN 'made_on must be a YYYY-MM-DD date' END")
+
+
+def test_reference_is_only_looked_up_for_valid_integers():
+    int_check, reference = _checks(SPEC.columns[3])
+    value = "NULLIF(btrim(s.owner), '')"
+    assert reference == (
+        "CASE WHEN %s IS NULL OR %s !~ '^[+-]?[0-9]{1,9}$' THEN NULL"
+        " WHEN NOT EXISTS (SELECT 1 FROM PUBLIC.\"USER\" r WHERE r.\"USER_ID\" = %s::int) THEN 'owner does not exist' END"
+        % (value, value, value)
+    )
+
+
+def test_staged_arrays_query_fills_absent_fields_with_typed_nulls():
+    query = staged_arrays_query(SPEC, SPEC.select_columns(["made_on", "name"]))
+    assert query == (
+        "SELECT array_agg(s.row_no ORDER BY s.row_no) AS row_no, array_agg(s.name ORDER BY s.row_no),"
+        " array_agg(NULL::int ORDER BY s.row_no), array_agg(NULLIF(btrim(s.made_on), '')::date ORDER BY s.row_no),"
+        " array_agg(NULL::int ORDER BY s.row_no) FROM (SELECT * FROM import_staging"
+        " WHERE row_no > $1 AND row_no <> ALL($2::bigint[]) ORDER BY row_no LIMIT $3) s"
+    )
+
+
+def test_bulk_reference_query_numbers_rows_from_one_and_skips_nulls():
+    owner = SPEC.columns[3]
+    assert bulk_reference_query([owner]) == (
+        "SELECT row_no, errors FROM (SELECT i.row_no, array_remove(ARRAY["
+        "CASE WHEN i.owner IS NULL THEN NULL"
+        " WHEN NOT EXISTS (SELECT 1 FROM PUBLIC.\"USER\" r WHERE r.\"USER_ID\" = i.owner) THEN 'owner does not exist' END"
+        "]::text[], NULL) AS errors FROM unnest($1::int[]) WITH ORDINALITY AS i(owner, row_no)) c"
+        " WHERE cardinality(errors) > 0 ORDER BY row_no"
+    )
+
+
+def test_procedure_error():
+    assert procedure_error({"success": True, "data": {"ISSUE_ID": 1}}) is None
+    assert procedure_error({"status_code": 201}) is None
+    assert procedure_error(None) is None
+    assert procedure_error({"success": False, "message": "no"}) == "no"
+    assert procedure_error({"status": "FAIL", "detail": "bad"}) == "bad"
+    assert procedure_error({"code": 409}) == "Rejected by the database"
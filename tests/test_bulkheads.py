@@ -0,0 +1,107 @@
+import asyncio
+from contextlib import asynccontextmanager
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.database import bulkheads, conection
+from app.database.admission import AdmissionGate
+from app.database.bulkheads import BULK_READ, LOOKUP, WRITE, bulkhead, configure_bulkheads, current_bulkhead
+from app.database.conection import acquire
+from config.database import PoolSettings
+
+
+class StubPool:
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        yield "connection"
+
+
+POOL = StubPool()
+app = FastAPI()
+release = {}
+
+
+@app.get("/items/", dependencies=[bulkhead(BULK_READ, lookup_param="item_id")])
+async def list_items(hold: bool = False):
+    async with acquire(POOL):
+        if hold:
+            await release["event"].wait()
+        return {"bulkhead": current_bulkhead().name}
+
+
+@app.post("/items/", dependencies=[bulkhead(WRITE)])
+async def post_item():
+    async with acquire(POOL):
+        return {"bulkhead": current_bulkhead().name}
+
+
+@app.get("/plain")
+async def plain():
+    return {"bulkhead": current_bulkhead()}
+
+
+def gate(name, limit):
+    return AdmissionGate(name, limit=limit, queue_depth=0, deadline=1.0, retry_after=3)
+
+
+@pytest.fixture
+def gates(monkeypatch):
+    configured = {WRITE: gate(WRITE, 1), LOOKUP: gate(LOOKUP, 1), BULK_READ: gate(BULK_READ, 1)}
+    monkeypatch.setattr(bulkheads, "_bulkheads", configured)
+    monkeypatch.setattr(conection, "_gates", {POOL: gate("primary", 10)})
+    return configured
+
+
+def run(scenario):
+    async def with_client():
+        release["event"] = asyncio.Event()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client)
+    return asyncio.run(with_client())
+
+
+@pytest.mark.parametrize("method, url, expected", [
+    ("GET", "/items/", BULK_READ),
+    ("GET", "/items/?item_id=3", LOOKUP),
+    ("GET", "/items/?item_id=", LOOKUP),
+    ("GET", "/items/?other=3", BULK_READ),
+    ("POST", "/items/", WRITE),
+    ("GET", "/plain", None),
+])
+def test_routes_declare_their_priority_class(gates, method, url, expected):
+    async def scenario(client):
+        return await client.request(method, url)
+
+    assert run(scenario).json() == {"bulkhead": expected}
+
+
+def test_a_saturated_class_gets_503_while_the_others_get_through(gates):
+    async def scenario(client):
+        held = asyncio.create_task(client.get("/items/", params={"hold": "true"}))
+        while gates[BULK_READ].in_use == 0:
+            await asyncio.sleep(0.001)
+        rejected = await client.get("/items/")
+        lookup = await client.get("/items/", params={"item_id": 1})
+        write = await client.post("/items/")
+        release["event"].set()
+        return rejected, lookup, write, await held
+
+    rejected, lookup, write, held = run(scenario)
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "3"
+    assert (lookup.json(), write.json(), held.json()) == (
+        {"bulkhead": LOOKUP}, {"bulkhead": WRITE}, {"bulkhead": BULK_READ}
+    )
+    assert gates[BULK_READ].rejected_queue_full == 1
+    assert [g.in_use for g in gates.values()] == [0, 0, 0]
+
+
+def test_bulk_reads_get_half_of_the_pool_by_default(monkeypatch):
+    for name in ("DB_BULKHEAD_WRITE", "DB_BULKHEAD_LOOKUP", "DB_BULKHEAD_BULK_READ", "DB_BULKHEAD_QUEUE_DEPTH"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(bulkheads, "_bulkheads", {})
+    configure_bulkheads(PoolSettings(max_size=10, queue_depth=7))
+    assert {name: (g.limit, g.queue_depth) for name, g in bulkheads._bulkheads.items()} == {
+        WRITE: (10, 7), LOOKUP: (10, 7), BULK_READ: (5, 7)
+    }
@@ -0,0 +1,203 @@
+"""
+totalData is counted with the *_SPEC filters (count_query) while the pages
+come from the GET_* procedures. These tests run every filter of each spec,
+with values taken from existing rows, through both and check that they
+select the same rows.
+
+Pages with `fields` come from page_query, which orders by the spec key,
+while the others come from the procedures. The order tests walk the same
+pages both ways and check that they hold the same keys in the same order.
+
+All of them need a database that has the procedures, set up with the
+POSTGRES_* variables, and are skipped otherwise.
+"""
+import asyncio
+import os
+import orjson
+from decimal import Decimal
+import pytest
+from app.database.conection import acquire, close_pool, get_pool, init_pool
+from app.database.query_builder import EntitySpec, count_query
+from app.repository.issue_repository import ISSUE_SPEC, IssueRepository
+from app.repository.project_repository import PROJECT_SPEC, ProjectRepository
+from app.repository.sprint_repository import SPRINT_SPEC, SprintRepository
+from app.repository.user_project import USER_PROJECT_SPEC, UserProjectRepository
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("POSTGRES_HOST"), reason="needs a database with the GET_* procedures (POSTGRES_* variables)"
+)
+
+# Rows per procedure page, and the largest filtered set compared row by row
+PAGE = 500
+MAX_ROWS = 5000
+# Existing rows whose values are used as filter values
+SAMPLES = 3
+# Rows per page, and pages compared, by the order tests
+ORDER_PAGE = 50
+ORDER_PAGES = 3
+
+
+async def _procedure_keys(spec: EntitySpec, fetch_page, filters: dict) -> list:
+    keys = []
+    page = 1
+    while True:
+        rows = await fetch_page(filters, page)
+        keys.extend(row[spec.key.strip('"')] for row in rows)
+        if len(rows) < PAGE:
+            return keys
+        page += 1
+
+
+async def _sql_keys(conn, spec: EntitySpec, filters: dict) -> tuple:
+    query, args = count_query(spec, filters)
+    count = await conn.fetchval(query, *args)
+    if count > MAX_ROWS:
+        return count, None
+    query = query.replace("count(*)", spec.key, 1)
+    return count, {row[0] for row in await conn.fetch(query, *args)}
+
+
+def _filter_value(spec: EntitySpec, name: str, row: dict):
+    """The value of filter `name` that `row` satisfies, as the API would receive it."""
+    flt = spec.filters[name]
+    value = row.get(flt.column.strip('"'))
+    if value is None or flt.op == "any":
+        return None
+    if flt.op == "contains":
+        text = str(value)
+        # A case-swapped inner substring, so the match must be case-insensitive and unanchored
+        return text[1:4].swapcase() if len(text) > 4 else text.swapcase()
+    if "numeric" in flt.cast:
+        return float(value)
+    if isinstance(value, float) and flt.op == "=":
+        return Decimal(str(value))
+    return value
+
+
+def _check(spec: EntitySpec, fetch_page):
+    async def scenario():
+        pool = await init_pool()
+        try:
+            async with acquire(pool) as conn:
+                samples = [
+                    dict(row[0]) for row in await conn.fetch(
+                        "SELECT row_to_json(t) FROM %s t ORDER BY %s LIMIT %d" % (spec.table, spec.key, SAMPLES)
+                    )
+                ]
+            if not samples:
+                pytest.skip("%s has no rows" % spec.table)
+            mismatches = []
+            compared = 0
+            for row in samples:
+                for name in spec.filters:
+                    value = _filter_value(spec, name, row)
+                    if value is None:
+                        continue
+                    filters = {name: value}
+                    async with acquire(pool) as conn:
+                        count, expected = await _sql_keys(conn, spec, filters)
+                    if expected is None:
+                        continue
+                    keys = await _procedure_keys(spec, fetch_page, filters)
+                    compared += 1
+                    if len(keys) != len(set(keys)) or set(keys) != expected or count != len(expected):
+                        mismatches.append((filters, sorted(expected)[:10], sorted(keys)[:10]))
+            return compared, mismatches
+        finally:
+            await close_pool()
+
+    compared, mismatches = asyncio.run(scenario())
+    assert compared
+    assert not mismatches, "count_query and the procedure disagree: %r" % mismatches
+
+
+def test_issue_filters_match_get_issue():
+    async def fetch_page(filters, page):
+        return await IssueRepository(get_pool()).get_issues(**filters, page=page, limit=PAGE)
+    _check(ISSUE_SPEC, fetch_page)
+
+
+def test_project_filters_match_get_project():
+    async def fetch_page(filters, page):
+        return (await ProjectRepository(get_pool()).get_project(**filters, page=page, limit=PAGE))["data"]
+    _check(PROJECT_SPEC, fetch_page)
+
+
+def test_sprint_filters_match_get_sprint():
+    async def fetch_page(filters, page):
+        return (await SprintRepository(get_pool()).get_sprint(**filters, page=page, limit=PAGE))["data"]
+    _check(SPRINT_SPEC, fetch_page)
+
+
+def test_user_project_filters_match_get_user_project():
+    async def fetch_page(filters, page):
+        return await UserProjectRepository(get_pool()).get_user_project(**filters, page=page, limit=PAGE)
+    _check(USER_PROJECT_SPEC, fetch_page)
+
+
+
+def _check_order(spec: EntitySpec, fetch_page, fetch_fields):
+    key = spec.key.strip('"')
+
+    async def scenario():
+        pool = await init_pool()
+        try:
+            async with acquire(pool) as conn:
+                sample = await conn.fetchval("SELECT row_to_json(t) FROM %s t ORDER BY %s LIMIT 1" % (spec.table, spec.key))
+            if sample is None:
+                pytest.skip("%s has no rows" % spec.table)
+            filter_sets = [{}] + [
+                {name: value} for name in spec.filters
+                if (value := _filter_value(spec, name, dict(sample))) is not None
+            ]
+            mismatches = []
+            for filters in filter_sets:
+                for page in range(1, ORDER_PAGES + 1):
+                    procedure = [row[key] for row in await fetch_page(filters, page)]
+                    projected = [row[key] for row in orjson.loads(await fetch_fields(filters, (key,), page))]
+                    if procedure != projected:
+                        mismatches.append((filters, page, procedure[:10], projected[:10]))
+                    if len(procedure) < ORDER_PAGE:
+                        break
+            return mismatches
+        finally:
+            await close_pool()
+
+    mismatches = asyncio.run(scenario())
+    assert not mismatches, "page_query and the procedure order pages differently: %r" % mismatches
+
+
+def test_issue_pages_with_fields_keep_the_get_issue_order():
+    async def fetch_page(filters, page):
+        return await IssueRepository(get_pool()).get_issues(**filters, page=page, limit=ORDER_PAGE)
+
+    async def fetch_fields(filters, fields, page):
+        return await IssueRepository(get_pool()).get_issues_fields(filters, fields, page, ORDER_PAGE)
+    _check_order(ISSUE_SPEC, fetch_page, fetch_fields)
+
+
+def test_project_pages_with_fields_keep_the_get_project_order():
+    async def fetch_page(filters, page):
+        return (await ProjectRepository(get_pool()).get_project(**filters, page=page, limit=ORDER_PAGE))["data"]
+
+    async def fetch_fields(filters, fields, page):
+        return await ProjectRepository(get_pool()).get_projects_fields(filters, fields, page, ORDER_PAGE)
+    _check_order(PROJECT_SPEC, fetch_page, fetch_fields)
+
+
+def test_sprint_pages_with_fields_keep_the_get_sprint_order():
+    async def fetch_page(filters, page):
+        return (await SprintRepository(get_pool()).get_sprint(**filters, page=page, limit=ORDER_PAGE))["data"]
+
+    async def fetch_fields(filters, fields, page):
+        return await SprintRepository(get_pool()).get_sprints_fields(filters, fields, page, ORDER_PAGE)
+    _check_order(SPRINT_SPEC, fetch_page, fetch_fields)
+
+
+def test_user_project_pages_with_fields_keep_the_get_user_project_order():
+    async def fetch_page(filters, page):
+        return await UserProjectRepository(get_pool()).get_user_project(**filters, page=page, limit=ORDER_PAGE)
+
+    async def fetch_fields(filters, fields, page):
+        return await UserProjectRepository(get_pool()).get_user_projects_fields(filters, fields, page, ORDER_PAGE)
+    _check_order(USER_PROJECT_SPEC, fetch_page, fetch_fields)
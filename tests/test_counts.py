@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from app.database.counts import RowCounts
+from app.repository.issue_repository import ISSUE_SPEC
+from config.database import CountSettings
+
+
+def counts_with(compute):
+    counts = RowCounts(CountSettings(cache_ttl=10))
+    counts._compute = compute
+    return counts
+
+
+def test_concurrent_counts_for_the_same_filters_share_one_query():
+    calls = []
+
+    async def compute(pool, name, spec, values):
+        calls.append(values)
+        await asyncio.sleep(0)
+        return 42, True
+
+    async def scenario():
+        counts = counts_with(compute)
+        results = await asyncio.gather(*(counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {"status": 1}) for _ in range(3)))
+        assert results == [(42, True)] * 3
+        assert await counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {"status": 1}) == (42, True)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_a_cancelled_owner_does_not_cancel_the_waiters():
+    started = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def compute(pool, name, spec, values):
+            started.append(values)
+            await gate.wait()
+            return 7, True
+
+        counts = counts_with(compute)
+        owner = asyncio.create_task(counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {"status": 1}))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {"status": 1}))
+        await asyncio.sleep(0)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        # The waiter started a count of its own
+        await asyncio.sleep(0)
+        assert len(started) == 2
+        gate.set()
+        assert await waiter == (7, True)
+        assert counts._inflight == {}
+
+    asyncio.run(scenario())
+
+
+def test_a_failed_count_is_raised_to_every_waiter_and_not_cached():
+    calls = []
+
+    async def compute(pool, name, spec, values):
+        calls.append(values)
+        await asyncio.sleep(0)
+        raise ConnectionError("down")
+
+    async def scenario():
+        counts = counts_with(compute)
+        results = await asyncio.gather(
+            *(counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {}) for _ in range(2)), return_exceptions=True
+        )
+        assert [type(r) for r in results] == [ConnectionError, ConnectionError]
+        with pytest.raises(ConnectionError):
+            await counts.count("pool", "GET_ISSUES", ISSUE_SPEC, {})
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
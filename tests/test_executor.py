@@ -0,0 +1,168 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import pytest
+from app.database import executor
+from app.database.admission import PoolOverloadedError
+
+
+class Recorder:
+    """Stands in for a histogram or counter, keeping the labels of each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def observe(self, value, *labels):
+        self.calls.append(labels)
+
+    def inc(self, *labels, amount=1):
+        self.calls.append(labels)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    async def fetch(self, n):
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.raw = []
+
+    def take_decode_stats(self):
+        return 0.001, 10
+
+    @contextmanager
+    def raw_json(self, raw):
+        self.raw.append(raw)
+        yield
+
+    async def _run(self, query, *args):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    fetchrow = fetch = _run
+
+    async def cursor(self, query, *args):
+        if self.error is not None:
+            raise self.error
+        return FakeCursor(self.result)
+
+    @asynccontextmanager
+    async def transaction(self, readonly=False):
+        yield
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    recorders = {name: Recorder() for name in ("POOL_WAIT", "EXECUTION", "DECODE", "RESULT_BYTES", "ERRORS")}
+    for name, recorder in recorders.items():
+        monkeypatch.setattr(executor, name, recorder)
+    return recorders
+
+
+def use_connection(monkeypatch, conn=None, error=None):
+    @asynccontextmanager
+    async def acquire(pool):
+        if error is not None:
+            raise error
+        yield conn
+
+    monkeypatch.setattr(executor, "acquire", acquire)
+
+
+def assert_recorded(metrics, name, errors=()):
+    timings = ("POOL_WAIT", "EXECUTION", "DECODE", "RESULT_BYTES")
+    expected = [] if errors else [(name,)]
+    assert {m: metrics[m].calls for m in timings} == {m: expected for m in timings}
+    assert metrics["ERRORS"].calls == list(errors)
+
+
+def test_call_procedure_records_its_metrics_under_the_procedure_name(monkeypatch, metrics):
+    conn = FakeConnection({"data": {"ok": True}})
+    use_connection(monkeypatch, conn)
+    result = asyncio.run(executor.call_procedure("pool", 'CALL PUBLIC."GET_SPRINT"($1, NULL)', 1, raw=True))
+    assert result == {"ok": True}
+    assert conn.raw == [True]
+    assert_recorded(metrics, "GET_SPRINT")
+
+
+def test_call_procedure_counts_the_error_type(monkeypatch, metrics):
+    use_connection(monkeypatch, FakeConnection(error=ValueError("bad")))
+    with pytest.raises(ValueError):
+        asyncio.run(executor.call_procedure("pool", 'CALL PUBLIC."GET_SPRINT"($1, NULL)', 1))
+    assert_recorded(metrics, "GET_SPRINT", errors=[("GET_SPRINT", "ValueError")])
+
+
+def test_an_overloaded_pool_is_counted_without_timings(monkeypatch, metrics):
+    use_connection(monkeypatch, error=PoolOverloadedError(1))
+    with pytest.raises(PoolOverloadedError):
+        asyncio.run(executor.fetch_rows("pool", "ISSUE_KEYSET", "SELECT 1"))
+    assert_recorded(metrics, "ISSUE_KEYSET", errors=[("ISSUE_KEYSET", "PoolOverloadedError")])
+
+
+def test_fetch_rows_records_its_metrics_under_the_given_name(monkeypatch, metrics):
+    use_connection(monkeypatch, FakeConnection([1, 2]))
+    assert asyncio.run(executor.fetch_rows("pool", "ISSUE_KEYSET", "SELECT 1")) == [1, 2]
+    assert_recorded(metrics, "ISSUE_KEYSET")
+
+
+def test_fetch_rows_counts_the_error_type(monkeypatch, metrics):
+    use_connection(monkeypatch, FakeConnection(error=KeyError("x")))
+    with pytest.raises(KeyError):
+        asyncio.run(executor.fetch_rows("pool", "ISSUE_KEYSET", "SELECT 1"))
+    assert_recorded(metrics, "ISSUE_KEYSET", errors=[("ISSUE_KEYSET", "KeyError")])
+
+
+def collect(iterator):
+    async def scenario():
+        return [batch async for batch in iterator]
+    return asyncio.run(scenario())
+
+
+def test_stream_rows_records_its_metrics_once_for_every_batch(monkeypatch, metrics):
+    use_connection(monkeypatch, FakeConnection([1, 2, 3, 4, 5]))
+    assert collect(executor.stream_rows("pool", "ISSUE_EXPORT", "SELECT 1", batch_size=2)) == [[1, 2], [3, 4], [5]]
+    assert_recorded(metrics, "ISSUE_EXPORT")
+
+
+def test_stream_rows_counts_the_error_type(monkeypatch, metrics):
+    use_connection(monkeypatch, FakeConnection(error=ConnectionError("lost")))
+    with pytest.raises(ConnectionError):
+        collect(executor.stream_rows("pool", "ISSUE_EXPORT", "SELECT 1"))
+    # The connection was acquired before the cursor failed
+    assert metrics["POOL_WAIT"].calls == [("ISSUE_EXPORT",)]
+    assert metrics["EXECUTION"].calls == metrics["DECODE"].calls == metrics["RESULT_BYTES"].calls == []
+    assert metrics["ERRORS"].calls == [("ISSUE_EXPORT", "ConnectionError")]
+
+
+def test_transaction_records_the_block_as_one_call(monkeypatch, metrics):
+    conn = FakeConnection([1])
+
+    async def scenario():
+        async with executor.transaction("pool", "ISSUE_IMPORT") as held:
+            assert held is conn
+            await held.fetch("SELECT 1")
+            await held.fetch("SELECT 2")
+
+    use_connection(monkeypatch, conn)
+    asyncio.run(scenario())
+    assert_recorded(metrics, "ISSUE_IMPORT")
+
+
+def test_transaction_counts_an_error_raised_in_the_block(monkeypatch, metrics):
+    async def scenario():
+        async with executor.transaction("pool", "ISSUE_IMPORT"):
+            raise LookupError("rolled back")
+
+    use_connection(monkeypatch, FakeConnection())
+    with pytest.raises(LookupError):
+        asyncio.run(scenario())
+    assert metrics["POOL_WAIT"].calls == [("ISSUE_IMPORT",)]
+    assert metrics["EXECUTION"].calls == metrics["DECODE"].calls == metrics["RESULT_BYTES"].calls == []
+    assert metrics["ERRORS"].calls == [("ISSUE_IMPORT", "LookupError")]
@@ -0,0 +1,21 @@
+import pytest
+from fastapi import HTTPException
+from app.controllers.issue_controller import _parse_expand, _select_fields
+
+
+def test_parse_expand_keeps_known_relations_once_in_order():
+    assert _parse_expand(None) == []
+    assert _parse_expand("sprint, issue_type,sprint,") == ["sprint", "issue_type"]
+
+
+def test_parse_expand_rejects_unknown_relations():
+    with pytest.raises(HTTPException) as error:
+        _parse_expand("sprint,user")
+    assert error.value.status_code == 400
+    assert "issue_type, project, sprint" in error.value.detail
+
+
+def test_select_fields_adds_the_fields_expanded_relations_are_found_through():
+    assert _select_fields(None, ["sprint"]) is None
+    assert _select_fields("summary", []) == ("SUMMARY",)
+    assert _select_fields("summary,SPRINT_ID_FK", ["sprint", "project"]) == ("SUMMARY", "SPRINT_ID_FK", "PROJECT_ID_FK")
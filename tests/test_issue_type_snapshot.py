@@ -0,0 +1,104 @@
+import asyncio
+import orjson
+import pytest
+from app.controllers import issue_type_controller
+from app.repository import issue_type
+from app.repository.issue_type import IssueTypeSnapshot, IssueTypeSnapshots
+
+ROWS = [
+    {"ISSUE_TYPE_ID": 1, "STATUS": 1, "PRIORITY": 2},
+    {"ISSUE_TYPE_ID": 2, "STATUS": 2, "PRIORITY": 2},
+    {"ISSUE_TYPE_ID": 3, "STATUS": 1, "PRIORITY": 1},
+    {"ISSUE_TYPE_ID": 4, "STATUS": 1, "PRIORITY": 2},
+]
+
+
+def test_select_intersects_the_filter_indexes_in_id_order():
+    snapshot = IssueTypeSnapshot.build(ROWS)
+    assert snapshot.select({}) == (0, 1, 2, 3)
+    assert snapshot.select({"status": 1, "priority": None}) == (0, 2, 3)
+    assert snapshot.select({"status": 1, "priority": 2}) == (0, 3)
+    assert snapshot.select({"issue_type_id": 9}) == ()
+
+
+def test_page_returns_the_encoded_rows_and_the_total():
+    snapshot = IssueTypeSnapshot.build(ROWS)
+    data, total = snapshot.page({"status": 1}, None, 2, 2)
+    assert orjson.loads(data) == [ROWS[3]]
+    assert total == 3
+    assert snapshot.page({"status": 5}, None, 1, 10) == (b"[]", 0)
+
+
+def test_page_projects_fields():
+    data, _ = IssueTypeSnapshot.build(ROWS).page({"priority": 1}, ("PRIORITY",), 1, 10)
+    assert orjson.loads(data) == [{"PRIORITY": 1}]
+
+
+def test_snapshot_rows_are_read_only():
+    snapshot = IssueTypeSnapshot.build([dict(row) for row in ROWS])
+    with pytest.raises(TypeError):
+        snapshot.rows[0]["STATUS"] = 9
+
+
+def test_snapshots_load_once_until_the_ttl_expires(monkeypatch):
+    loads = []
+
+    async def fetch_rows(pool, name, query):
+        loads.append(pool)
+        return [{"data": row} for row in ROWS]
+
+    monkeypatch.setattr(issue_type, "fetch_rows", fetch_rows)
+    now = [100.0]
+    monkeypatch.setattr(issue_type, "monotonic", lambda: now[0])
+
+    async def scenario():
+        snapshots = IssueTypeSnapshots(ttl=60)
+        first = await snapshots.get("primary")
+        assert await snapshots.get("primary") is first
+        now[0] += 61
+        assert await snapshots.get("primary") is not first
+        await snapshots.reload("primary")
+
+    asyncio.run(scenario())
+    assert loads == ["primary"] * 3
+
+
+def test_failed_reload_makes_the_next_read_load_again(monkeypatch):
+    async def failing(pool, name, query):
+        raise ConnectionError("down")
+
+    async def scenario():
+        snapshots = IssueTypeSnapshots(ttl=0)
+        monkeypatch.setattr(issue_type, "fetch_rows", failing)
+        await snapshots.reload("primary")
+        assert snapshots._snapshot is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("result, reloaded", [
+    ({"success": True, "data": {"ISSUE_TYPE_ID": 5}}, True),
+    ({"success": False, "message": "priority does not exist"}, False),
+    ({"status_code": 404, "message": "Not found"}, False),
+])
+def test_controllers_reload_only_after_a_successful_write(monkeypatch, result, reloaded):
+    reloads = []
+
+    async def write(self, *args):
+        return result
+
+    async def reload(self):
+        reloads.append(True)
+
+    for name in ("post_issue_type", "patch_issue_type", "put_issue_type", "delete_issue_type"):
+        monkeypatch.setattr(issue_type.IssueTypeRepository, name, write)
+    monkeypatch.setattr(issue_type.IssueTypeRepository, "reload_issue_types", reload)
+
+    async def scenario():
+        assert await issue_type_controller.post_issue_type_controller("primary", 1, 2) == result
+        assert await issue_type_controller.patch_issue_type_controller("primary", 5, priority=2) == result
+        assert await issue_type_controller.put_issue_type_controller("primary", 5, 1, 2) == result
+        assert await issue_type_controller.delete_issue_type_controller("primary", 5) == result
+
+    asyncio.run(scenario())
+    assert len(reloads) == (4 if reloaded else 0)
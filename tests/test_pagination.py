@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+from app.helpers.pagination import decode_cursor, encode_cursor, keyset_page, page_total
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("-due_date", "2025-01-31", 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "-due_date") == ("2025-01-31", 42)
+
+
+def test_cursor_keeps_null_sort_values_and_text_keys():
+    assert decode_cursor(encode_cursor("id", None, "abc"), "id") == (None, "abc")
+
+
+def test_empty_cursor_is_the_first_page():
+    assert decode_cursor("", "id") is None
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "e30", encode_cursor("id", 1, 2)[:-3]])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "id")
+    assert error.value.status_code == 400
+
+
+def test_cursor_issued_for_another_sort_is_a_400():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor("votes", "3", 7), "-votes")
+    assert error.value.status_code == 400
+    assert "different sort" in error.value.detail
+
+
+def test_keyset_page_trims_the_extra_row_and_points_after_the_last_kept_one():
+    rows = [{"sort_value": str(i), "cursor_key": i} for i in range(4)]
+    page, cursor = keyset_page(rows, "votes", 3)
+    assert page == rows[:3]
+    assert decode_cursor(cursor, "votes") == ("2", 2)
+
+
+def test_keyset_page_without_extra_row_is_the_last_page():
+    rows = [{"sort_value": "1", "cursor_key": 1}]
+    assert keyset_page(rows, "id", 3) == (rows, None)
+
+
+def test_page_total():
+    assert page_total(3, 10, [{}] * 4) == 24
+    assert page_total(1, 10, [{}] * 10) is None
+    assert page_total(2, 10, []) is None
+    assert page_total(1, 10, b"[]") is None
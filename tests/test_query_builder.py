@@ -0,0 +1,142 @@
+import pytest
+from app.database.query_builder import (
+    EntitySpec, Filter, Relation, SortKey, batch_query, count_query, estimate_query, export_query, keyset_query, included_query,
+    locked_chunk_query, page_query, parse_sort
+)
+
+SPEC = EntitySpec(
+    table='PUBLIC."WIDGET"',
+    key='"WIDGET_ID"',
+    filters={
+        "name": Filter('"NAME"', "contains"),
+        "size": Filter('"SIZE"'),
+        "size_min": Filter('"SIZE"', ">="),
+        "made_on": Filter('"MADE_ON"', cast="::text::date"),
+        "ids": Filter('"WIDGET_ID"', "any", "::int[]"),
+    },
+    sort_keys={
+        "id": SortKey('"WIDGET_ID"'),
+        "made_on": SortKey('"MADE_ON"', "::date"),
+    },
+    columns=("WIDGET_ID", "NAME", "SIZE", "MADE_ON"),
+)
+
+
+def test_filter_conditions():
+    assert Filter('"NAME"', "contains").condition("$1") == "\"NAME\" ILIKE '%' || $1 || '%'"
+    assert Filter('"ID"', "any", "::int[]").condition("$2") == '"ID" = ANY($2::int[])'
+    assert Filter('"DAY"', "<=", "::text::date").condition("$3") == '"DAY" <= $3::text::date'
+
+
+def test_where_skips_none_and_numbers_placeholders_after_existing_args():
+    args = ["already there"]
+    conditions = SPEC.where({"name": "bolt", "size": None, "size_min": 3}, args)
+    assert conditions == ["\"NAME\" ILIKE '%' || $2 || '%'", '"SIZE" >= $3']
+    assert args == ["already there", "bolt", 3]
+
+
+def test_parse_sort():
+    assert parse_sort(SPEC, "id") == ("id", SPEC.sort_keys["id"], False)
+    assert parse_sort(SPEC, "-made_on") == ("made_on", SPEC.sort_keys["made_on"], True)
+    with pytest.raises(ValueError):
+        parse_sort(SPEC, "size")
+
+
+def test_keyset_query_first_page_by_key():
+    query, args = keyset_query(SPEC, {"size": 2}, "id", None, 10)
+    assert query == (
+        'SELECT "WIDGET_ID"::text AS sort_value, "WIDGET_ID" AS cursor_key, row_to_json(t) AS data'
+        ' FROM PUBLIC."WIDGET" t WHERE "SIZE" = $1 ORDER BY "WIDGET_ID" LIMIT $2'
+    )
+    assert args == [2, 11]
+
+
+def test_keyset_query_by_key_descending_continues_below_the_cursor():
+    query, args = keyset_query(SPEC, {}, "-id", ("7", 7), 5)
+    assert ' WHERE "WIDGET_ID" < $1 ORDER BY "WIDGET_ID" DESC LIMIT $2' in query
+    assert args == [7, 6]
+
+
+def test_keyset_query_by_other_column_breaks_ties_on_the_key():
+    query, args = keyset_query(SPEC, {"name": "x"}, "made_on", ("2025-01-31", 9), 3)
+    assert '("MADE_ON", "WIDGET_ID") > ($2::text::date, $3)' in query
+    assert query.endswith('ORDER BY "MADE_ON", "WIDGET_ID" LIMIT $4')
+    assert args == ["x", "2025-01-31", 9, 4]
+
+
+def test_count_query():
+    assert count_query(SPEC, {}) == ('SELECT count(*) FROM PUBLIC."WIDGET" t', [])
+    query, args = count_query(SPEC, {"size": 3, "made_on": "2025-01-31", "name": None})
+    assert query == 'SELECT count(*) FROM PUBLIC."WIDGET" t WHERE "SIZE" = $1 AND "MADE_ON" = $2::text::date'
+    assert args == [3, "2025-01-31"]
+
+
+def test_estimate_query_explains_the_same_filters():
+    query, args = estimate_query(SPEC, {"size": 3})
+    assert query == 'EXPLAIN (FORMAT JSON) SELECT 1 FROM PUBLIC."WIDGET" t WHERE "SIZE" = $1'
+    assert args == [3]
+
+
+def test_export_query_streams_every_matching_row_in_key_order():
+    query, args = export_query(SPEC, {"ids": [1, 2]})
+    assert query == (
+        'SELECT row_to_json(t) AS data FROM PUBLIC."WIDGET" t WHERE "WIDGET_ID" = ANY($1::int[]) ORDER BY "WIDGET_ID"'
+    )
+    assert args == [[1, 2]]
+    assert export_query(SPEC, {})[0] == 'SELECT row_to_json(t) AS data FROM PUBLIC."WIDGET" t ORDER BY "WIDGET_ID"'
+
+
+def test_locked_chunk_query_locks_the_first_chunk_in_key_order():
+    query, args = locked_chunk_query(SPEC, {"size": 3}, None, 500)
+    assert query == 'SELECT "WIDGET_ID" FROM PUBLIC."WIDGET" t WHERE "SIZE" = $1 ORDER BY "WIDGET_ID" LIMIT $2 FOR UPDATE'
+    assert args == [3, 500]
+
+
+def test_locked_chunk_query_continues_after_the_last_key():
+    query, args = locked_chunk_query(SPEC, {"ids": [4, 9]}, 4, 2)
+    assert ' WHERE "WIDGET_ID" = ANY($1::int[]) AND "WIDGET_ID" > $2 ORDER BY "WIDGET_ID" LIMIT $3 FOR UPDATE' in query
+    assert args == [[4, 9], 4, 2]
+
+
+def test_batch_query_selects_the_rows_of_an_id_array_with_their_key():
+    assert batch_query(SPEC) == (
+        'SELECT "WIDGET_ID" AS key, row_to_json(t) AS data FROM PUBLIC."WIDGET" t WHERE "WIDGET_ID" = ANY($1::int[])'
+    )
+
+
+def test_included_query_takes_one_key_array_per_relation():
+    query = included_query({
+        "maker": Relation("MAKER_ID", 'PUBLIC."MAKER"', '"MAKER_ID"'),
+        "shop": Relation("SHOP_ID", 'PUBLIC."SHOP"', '"SHOP_ID"'),
+    })
+    assert query == (
+        "SELECT json_build_object("
+        "'maker', (SELECT coalesce(json_object_agg(r.\"MAKER_ID\", row_to_json(r)), '{}'::json)"
+        " FROM PUBLIC.\"MAKER\" r WHERE r.\"MAKER_ID\" = ANY($1::int[])), "
+        "'shop', (SELECT coalesce(json_object_agg(r.\"SHOP_ID\", row_to_json(r)), '{}'::json)"
+        " FROM PUBLIC.\"SHOP\" r WHERE r.\"SHOP_ID\" = ANY($2::int[]))"
+        ") AS included"
+    )
+
+
+def test_parse_fields_matches_case_insensitively_and_drops_repeats():
+    assert SPEC.parse_fields("name, widget_id,NAME,") == ("NAME", "WIDGET_ID")
+    with pytest.raises(ValueError, match="WIDGET_ID, NAME, SIZE, MADE_ON"):
+        SPEC.parse_fields("name,colour")
+    with pytest.raises(ValueError, match="at least one"):
+        SPEC.parse_fields(" , ")
+
+
+def test_projection():
+    assert SPEC.projection(None) == "row_to_json(t)"
+    assert SPEC.projection(("NAME", "SIZE"), "w") == "json_build_object('NAME', w.\"NAME\", 'SIZE', w.\"SIZE\")"
+
+
+def test_page_query_selects_only_the_fields_and_the_key():
+    query, args = page_query(SPEC, {"size": 3}, ("NAME",), 3, 20)
+    assert query == (
+        "SELECT coalesce(json_agg(json_build_object('NAME', t.\"NAME\") ORDER BY t.\"WIDGET_ID\"), '[]'::json) AS data"
+        ' FROM (SELECT "NAME", "WIDGET_ID" FROM PUBLIC."WIDGET" t WHERE "SIZE" = $1 ORDER BY "WIDGET_ID" LIMIT $2 OFFSET $3) t'
+    )
+    assert args == [3, 20, 40]
+    assert 'SELECT "WIDGET_ID" FROM PUBLIC."WIDGET" t ORDER BY' in page_query(SPEC, {}, ("WIDGET_ID",), 1, 5)[0]
@@ -0,0 +1,83 @@
+import pytest
+from app.middlewares import RateLimitMiddleware as rate_limit
+from app.middlewares.RateLimitMiddleware import RateLimitMiddleware, TokenBuckets
+from config.rate_limit import RateLimit, RateLimitSettings, _parse_limit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit, "monotonic", lambda: now[0])
+    return now
+
+
+def test_allows_a_burst_then_reports_the_wait(clock):
+    buckets = TokenBuckets(max_keys=10)
+    assert [buckets.take("a", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("a", rate=2, burst=3) == pytest.approx(0.5)
+
+
+def test_refills_at_the_rate_up_to_the_burst(clock):
+    buckets = TokenBuckets(max_keys=10)
+    for _ in range(3):
+        buckets.take("a", rate=2, burst=3)
+    clock[0] += 0.5
+    assert buckets.take("a", rate=2, burst=3) == 0
+    assert buckets.take("a", rate=2, burst=3) > 0
+    # A long pause never banks more than the burst
+    clock[0] += 100
+    assert [buckets.take("a", rate=2, burst=3) for _ in range(4)][-1] > 0
+
+
+def test_keys_have_separate_buckets(clock):
+    buckets = TokenBuckets(max_keys=10)
+    assert buckets.take("a", rate=1, burst=1) == 0
+    assert buckets.take("a", rate=1, burst=1) > 0
+    assert buckets.take("b", rate=1, burst=1) == 0
+
+
+def test_drops_the_least_recently_used_key_beyond_max_keys(clock):
+    buckets = TokenBuckets(max_keys=2)
+    buckets.take("a", rate=1, burst=1)
+    buckets.take("b", rate=1, burst=1)
+    buckets.take("a", rate=1, burst=1)
+    buckets.take("c", rate=1, burst=1)
+    assert len(buckets) == 2
+    # "b" was dropped, so it starts again with a full bucket
+    assert buckets.take("b", rate=1, burst=1) == 0
+
+
+def test_evicts_buckets_that_refilled_completely(clock):
+    buckets = TokenBuckets(max_keys=10)
+    buckets.take("a", rate=1, burst=2)
+    buckets.take("b", rate=1, burst=2)
+    clock[0] += 2
+    buckets.take("c", rate=1, burst=2)
+    assert len(buckets) == 1
+
+
+def _scope(path, sub="7", method="GET"):
+    return {"type": "http", "path": path, "method": method, "client": ("10.0.0.1", 1), "state": {"jwt_claims": {"sub": sub}}}
+
+
+def test_wait_for_charges_the_route_group_of_the_client(clock):
+    limiter = RateLimitMiddleware(None, RateLimitSettings(default=RateLimit(rate=1, burst=2), groups={"sprints": None}))
+    assert [limiter.wait_for(_scope("/issues/batch")) for _ in range(3)] == [0, 0, pytest.approx(1)]
+    assert limiter.wait_for(_scope("/issues/", sub="8")) == 0
+    assert limiter.wait_for(_scope("/projects/")) == 0
+
+
+def test_wait_for_never_limits_public_paths_options_or_unlimited_groups(clock):
+    limiter = RateLimitMiddleware(None, RateLimitSettings(default=RateLimit(rate=1, burst=1), groups={"sprints": None}))
+    for scope in (_scope("/health/live"), _scope("/docs"), _scope("/issues/", method="OPTIONS"), _scope("/sprints/")):
+        assert [limiter.wait_for(scope) for _ in range(3)] == [0, 0, 0]
+
+
+def test_parse_limit():
+    assert _parse_limit("X", "20/40") == RateLimit(rate=20.0, burst=40)
+    assert _parse_limit("X", "5") == RateLimit(rate=5.0, burst=5)
+    assert _parse_limit("X", "0.5") == RateLimit(rate=0.5, burst=1)
+    assert _parse_limit("X", "off") is None
+    for value in ("fast", "0/1", "1/0"):
+        with pytest.raises(ValueError):
+            _parse_limit("X", value)
@@ -0,0 +1,56 @@
+import pytest
+from app.database import conection
+from app.database.conection import _Replica, get_read_pool
+
+
+class StubPool:
+    def __init__(self, name, size, idle):
+        self.name = name
+        self.size = size
+        self.idle = idle
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.idle
+
+
+def replica(pool, healthy=True):
+    r = _Replica(("replica-" + pool.name, 5432))
+    r.pool = pool
+    r.healthy = healthy
+    return r
+
+
+@pytest.fixture
+def primary(monkeypatch):
+    pool = StubPool("primary", 10, 10)
+    monkeypatch.setattr(conection, "_pool", pool)
+    monkeypatch.setattr(conection, "_replica_cursor", 0)
+    return pool
+
+
+def test_picks_the_replica_with_the_fewest_connections_in_use(monkeypatch, primary):
+    a, b, c = StubPool("a", 10, 2), StubPool("b", 10, 9), StubPool("c", 4, 1)
+    monkeypatch.setattr(conection, "_replicas", [replica(a), replica(b), replica(c)])
+    assert [get_read_pool() for _ in range(3)] == [b, b, b]
+
+
+def test_rotates_between_equally_busy_replicas(monkeypatch, primary):
+    a, b, c = StubPool("a", 5, 3), StubPool("b", 5, 3), StubPool("c", 8, 6)
+    monkeypatch.setattr(conection, "_replicas", [replica(a), replica(b), replica(c)])
+    assert [get_read_pool() for _ in range(4)] == [a, b, c, a]
+
+
+def test_skips_unhealthy_replicas(monkeypatch, primary):
+    a, b = StubPool("a", 10, 10), StubPool("b", 10, 0)
+    monkeypatch.setattr(conection, "_replicas", [replica(a, healthy=False), replica(b)])
+    assert [get_read_pool() for _ in range(2)] == [b, b]
+
+
+def test_falls_back_to_the_primary_without_a_healthy_replica(monkeypatch, primary):
+    monkeypatch.setattr(conection, "_replicas", [replica(StubPool("a", 1, 1), healthy=False)])
+    assert get_read_pool() is primary
+    monkeypatch.setattr(conection, "_replicas", [])
+    assert get_read_pool() is primary
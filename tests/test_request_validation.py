@@ -0,0 +1,181 @@
+import asyncio
+import time
+import pytest
+from jose import jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.middlewares import RequestValidationMiddleware as validation
+from app.middlewares.RequestValidationMiddleware import RequestValidationMiddleware, VerifiedTokenCache
+
+
+async def claims(request: Request) -> JSONResponse:
+    return JSONResponse(dict(request.state.jwt_claims), headers={"Access-Control-Allow-Origin": "https://route.example"})
+
+
+async def stream(request: Request) -> StreamingResponse:
+    async def chunks():
+        yield b"first,"
+        yield b"second"
+    return StreamingResponse(chunks(), media_type="text/csv")
+
+
+async def public(request: Request) -> JSONResponse:
+    return JSONResponse({"ok": True})
+
+
+app = Starlette(routes=[
+    Route("/claims", claims),
+    Route("/stream", stream),
+    Route("/health/live", public),
+    Route("/metrics", public),
+    Route("/docs", public),
+])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(validation, "_token_cache", VerifiedTokenCache(maxsize=10, max_ttl=60))
+    return TestClient(RequestValidationMiddleware(app))
+
+
+def bearer(secret: str = validation.JWT_SECRET, **claims) -> dict:
+    token = jwt.encode({"sub": "7", "exp": int(time.time()) + 60, **claims}, secret, algorithm="HS256")
+    return {"Authorization": "Bearer " + token}
+
+
+@pytest.mark.parametrize("path", ["/health/live", "/metrics", "/docs"])
+def test_public_paths_skip_the_token_check(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert "access-control-allow-methods" not in response.headers
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer not-a-jwt"}, bearer(secret="not-the-secret")])
+def test_rejects_a_missing_or_bad_token(client, headers):
+    response = client.get("/claims", headers=headers)
+    assert response.status_code == 401
+    assert response.json() == {"Title": "Unauthorized", "StatusCode": 401}
+    assert response.headers["access-control-allow-origin"] == validation.CLIENT_URL
+
+
+def test_rejects_a_foreign_origin_before_the_token(client):
+    response = client.get("/claims", headers={**bearer(), "Origin": "https://evil.example"})
+    assert response.status_code == 403
+    assert response.json() == {"Title": "Forbidden", "StatusCode": 403}
+
+
+def test_passes_the_claims_to_the_route(client):
+    response = client.get("/claims", headers={**bearer(role="admin"), "Origin": validation.CLIENT_URL})
+    assert response.status_code == 200
+    assert response.json()["sub"] == "7"
+    assert response.json()["role"] == "admin"
+
+
+def test_routes_cannot_change_the_cached_claims(client):  # client: isolates the token cache
+    seen = []
+
+    async def tamper(request: Request) -> JSONResponse:
+        seen.append(request.state.jwt_claims)
+        with pytest.raises(TypeError):
+            request.state.jwt_claims["role"] = "admin"
+        return JSONResponse({})
+
+    tampering = Starlette(routes=[Route("/tamper", tamper)])
+    tampering_client = TestClient(RequestValidationMiddleware(tampering))
+    headers = bearer()
+    tampering_client.get("/tamper", headers=headers)
+    tampering_client.get("/tamper", headers=headers)
+    assert len(seen) == 2
+    assert "role" not in seen[1]
+
+
+def test_merges_cors_headers_without_overwriting_the_route_ones(client):
+    response = client.get("/claims", headers=bearer())
+    assert response.headers.get_list("access-control-allow-origin") == ["https://route.example"]
+    assert response.headers["access-control-allow-methods"] == validation.CORS_HEADERS["Access-Control-Allow-Methods"]
+    assert response.headers["access-control-allow-headers"] == validation.CORS_HEADERS["Access-Control-Allow-Headers"]
+
+
+def test_streaming_responses_pass_through(monkeypatch):
+    monkeypatch.setattr(validation, "_token_cache", VerifiedTokenCache(maxsize=10, max_ttl=60))
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "root_path": "", "query_string": b"",
+        "scheme": "http", "server": ("testserver", 80), "client": ("testclient", 50000), "http_version": "1.1",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in bearer().items()],
+    }
+    sent = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(RequestValidationMiddleware(app)(scope, receive, send))
+    # Each chunk reaches the server as its own message, as the route sent it
+    assert [m.get("body") for m in sent[1:] if m.get("body")] == [b"first,", b"second"]
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-type"].startswith(b"text/csv")
+    assert headers[b"access-control-allow-origin"] == validation.CLIENT_URL.encode()
+
+
+@pytest.mark.parametrize("origin, method, headers, allowed", [
+    ("", "", "", True),
+    (validation.CLIENT_URL, "PATCH", "Content-Type, authorization", True),
+    ("https://evil.example", "GET", "", False),
+    (validation.CLIENT_URL, "TRACE", "", False),
+    (validation.CLIENT_URL, "GET", "Authorization,X-Custom", False),
+])
+def test_preflight_allowed(origin, method, headers, allowed):
+    assert validation._preflight_allowed(origin, method, headers) is allowed
+
+
+def test_preflight_answers_an_allowed_request_with_max_age(client):
+    response = client.options("/claims", headers={
+        "Origin": validation.CLIENT_URL,
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "authorization,content-type",
+    })
+    assert response.status_code == 200
+    assert response.headers["access-control-max-age"] == str(validation._settings.cors_max_age)
+    assert response.headers["access-control-allow-origin"] == validation.CLIENT_URL
+
+
+@pytest.mark.parametrize("headers", [
+    {"Origin": "https://evil.example", "Access-Control-Request-Method": "GET"},
+    {"Origin": validation.CLIENT_URL, "Access-Control-Request-Method": "TRACE"},
+    {"Origin": validation.CLIENT_URL, "Access-Control-Request-Method": "GET", "Access-Control-Request-Headers": "x-custom"},
+])
+def test_preflight_forbids_a_bad_origin_method_or_header(client, headers):
+    response = client.options("/claims", headers=headers)
+    assert response.status_code == 403
+    assert "access-control-max-age" not in response.headers
+
+
+def test_outer_middlewares_cannot_change_the_prebuilt_preflight():
+    before = (dict(validation._PREFLIGHT_OK[0]), list(validation._PREFLIGHT_OK[0]["headers"]), dict(validation._PREFLIGHT_OK[1]))
+
+    def outer(inner):
+        async def wrapped(scope, receive, send):
+            async def editing_send(message):
+                if message["type"] == "http.response.start":
+                    message["headers"].append((b"x-outer", b"1"))
+                    message["status"] = 204
+                else:
+                    message["body"] = b""
+                await send(message)
+            await inner(scope, receive, editing_send)
+        return wrapped
+
+    client = TestClient(outer(RequestValidationMiddleware(app)))
+    for _ in range(2):
+        response = client.options("/claims", headers={"Origin": validation.CLIENT_URL})
+        assert response.headers.get_list("x-outer") == ["1"]
+    assert (dict(validation._PREFLIGHT_OK[0]), validation._PREFLIGHT_OK[0]["headers"], dict(validation._PREFLIGHT_OK[1])) == before
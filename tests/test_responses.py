@@ -0,0 +1,23 @@
+import orjson
+from app.helpers.responses import keyed_json_response, raw_json_response
+
+
+def test_keyed_json_response_splices_rows_in_order():
+    response = keyed_json_response("Issues", [(7, b'{"ID":7}'), (2, b'{"ID":2}')], [9])
+    assert response.body == b'{"Issues":{"7":{"ID":7},"2":{"ID":2}},"missing":[9]}'
+    assert list(orjson.loads(response.body)["Issues"]) == ["7", "2"]
+    assert response.media_type == "application/json"
+
+
+def test_raw_json_response_splices_included_only_when_given():
+    plain = raw_json_response("Issues", b'[{"ID":1}]', 1, 10, total=1)
+    assert b"included" not in plain.body
+    response = raw_json_response("Issues", b'[{"ID":1}]', 1, 10, included=b'{"sprint":{"3":{"ID":3}}}')
+    assert orjson.loads(response.body) == {
+        "Issues": [{"ID": 1}],
+        "page": 1,
+        "currentLimit": 10,
+        "totalData": None,
+        "totalExact": False,
+        "included": {"sprint": {"3": {"ID": 3}}},
+    }
@@ -0,0 +1,124 @@
+import pytest
+from config.auth import AuthSettings, load_auth_settings
+from config.batch import BatchSettings, load_batch_settings
+from config.database import PoolSettings, SnapshotSettings, load_pool_settings, load_snapshot_settings
+
+POOL_VARIABLES = (
+    "DB_POOL_MIN_SIZE", "DB_POOL_MAX_SIZE", "DB_POOL_ACQUIRE_TIMEOUT", "DB_STATEMENT_CACHE_SIZE",
+    "DB_POOL_MAX_INACTIVE_LIFETIME", "DB_COMMAND_TIMEOUT", "DB_STATEMENT_TIMEOUT", "DB_WORK_MEM",
+    "DB_APPLICATION_NAME", "DB_POOL_WARM_SIZE", "DB_POOL_QUEUE_DEPTH", "DB_POOL_RETRY_AFTER",
+)
+
+
+@pytest.fixture
+def pool_env(monkeypatch):
+    for name in POOL_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def test_pool_settings_default_when_unset(pool_env):
+    assert load_pool_settings() == PoolSettings()
+
+
+def test_pool_settings_read_the_environment(pool_env):
+    for name, value in {
+        "DB_POOL_MIN_SIZE": "0", "DB_POOL_MAX_SIZE": "4", "DB_POOL_ACQUIRE_TIMEOUT": "2.5",
+        "DB_STATEMENT_CACHE_SIZE": "0", "DB_POOL_MAX_INACTIVE_LIFETIME": "0", "DB_COMMAND_TIMEOUT": "15",
+        "DB_STATEMENT_TIMEOUT": "500ms", "DB_WORK_MEM": "64MB", "DB_APPLICATION_NAME": "worker-1",
+        "DB_POOL_WARM_SIZE": "2", "DB_POOL_QUEUE_DEPTH": "0", "DB_POOL_RETRY_AFTER": "3",
+    }.items():
+        pool_env.setenv(name, value)
+    settings = load_pool_settings()
+    assert settings == PoolSettings(
+        min_size=0, max_size=4, acquire_timeout=2.5, statement_cache_size=0, max_inactive_connection_lifetime=0,
+        command_timeout=15, statement_timeout="500ms", work_mem="64MB", application_name="worker-1",
+        warm_size=2, queue_depth=0, retry_after=3,
+    )
+    assert settings.effective_warm_size() == 2
+    assert settings.session_settings() == {
+        "statement_timeout": "500ms", "work_mem": "64MB", "application_name": "worker-1"
+    }
+
+
+def test_pool_settings_leave_unset_session_settings_to_the_server():
+    settings = PoolSettings(statement_timeout=None, application_name=None)
+    assert settings.session_settings() == {}
+    assert settings.effective_warm_size() == settings.min_size
+
+
+@pytest.mark.parametrize("variables, message", [
+    ({"DB_POOL_MIN_SIZE": "5", "DB_POOL_MAX_SIZE": "4"}, "DB_POOL_MIN_SIZE must not be greater than DB_POOL_MAX_SIZE"),
+    ({"DB_POOL_MAX_SIZE": "0"}, "DB_POOL_MAX_SIZE must be >= 1"),
+    ({"DB_POOL_ACQUIRE_TIMEOUT": "0"}, "DB_POOL_ACQUIRE_TIMEOUT must be greater than 0"),
+    ({"DB_POOL_ACQUIRE_TIMEOUT": "-1"}, "DB_POOL_ACQUIRE_TIMEOUT must be greater than 0"),
+    ({"DB_COMMAND_TIMEOUT": "0"}, "DB_COMMAND_TIMEOUT must be greater than 0"),
+    ({"DB_POOL_WARM_SIZE": "11"}, "DB_POOL_WARM_SIZE must be between 0 and DB_POOL_MAX_SIZE"),
+    ({"DB_POOL_MAX_SIZE": "ten"}, "DB_POOL_MAX_SIZE must be an integer"),
+    ({"DB_POOL_ACQUIRE_TIMEOUT": "soon"}, "DB_POOL_ACQUIRE_TIMEOUT must be a number"),
+    ({"DB_STATEMENT_TIMEOUT": "30 seconds"}, "DB_STATEMENT_TIMEOUT must look like"),
+    ({"DB_STATEMENT_TIMEOUT": "30s; SET ROLE admin"}, "DB_STATEMENT_TIMEOUT must look like"),
+    ({"DB_WORK_MEM": "64mb"}, "DB_WORK_MEM must look like"),
+    ({"DB_APPLICATION_NAME": "x" * 64}, "DB_APPLICATION_NAME must be printable ASCII"),
+    ({"DB_APPLICATION_NAME": "caf\u00e9"}, "DB_APPLICATION_NAME must be printable ASCII"),
+])
+def test_pool_settings_reject_inconsistent_values(pool_env, variables, message):
+    for name, value in variables.items():
+        pool_env.setenv(name, value)
+    with pytest.raises(ValueError, match=message):
+        load_pool_settings()
+
+
+def test_auth_settings_read_the_environment(monkeypatch):
+    monkeypatch.setenv("CORS_MAX_AGE", "60")
+    monkeypatch.setenv("JWT_CACHE_SIZE", "0")
+    monkeypatch.setenv("JWT_CACHE_MAX_TTL", "2.5")
+    assert load_auth_settings() == AuthSettings(cors_max_age=60, jwt_cache_size=0, jwt_cache_max_ttl=2.5)
+
+
+def test_auth_settings_default_when_unset(monkeypatch):
+    for name in ("CORS_MAX_AGE", "JWT_CACHE_SIZE", "JWT_CACHE_MAX_TTL"):
+        monkeypatch.delenv(name, raising=False)
+    assert load_auth_settings() == AuthSettings()
+
+
+@pytest.mark.parametrize("name, value, message", [
+    ("CORS_MAX_AGE", "-1", "CORS_MAX_AGE must be >= 0"),
+    ("JWT_CACHE_SIZE", "-5", "JWT_CACHE_SIZE must be >= 0"),
+    ("JWT_CACHE_MAX_TTL", "-0.5", "JWT_CACHE_MAX_TTL must be >= 0"),
+    ("JWT_CACHE_SIZE", "many", "JWT_CACHE_SIZE must be an integer"),
+])
+def test_auth_settings_reject_bad_values(monkeypatch, name, value, message):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=message):
+        load_auth_settings()
+
+
+def test_batch_settings_read_the_environment(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_REQUESTS", "5")
+    monkeypatch.setenv("BATCH_CONCURRENCY", "2")
+    monkeypatch.setenv("BATCH_MAX_RESPONSE_BYTES", "1024")
+    assert load_batch_settings() == BatchSettings(max_requests=5, concurrency=2, max_response_bytes=1024)
+
+
+@pytest.mark.parametrize("name, value, message", [
+    ("BATCH_MAX_REQUESTS", "0", "BATCH_MAX_REQUESTS must be >= 1"),
+    ("BATCH_CONCURRENCY", "0", "BATCH_CONCURRENCY must be >= 1"),
+    ("BATCH_MAX_RESPONSE_BYTES", "-1", "BATCH_MAX_RESPONSE_BYTES must be >= 1"),
+    ("BATCH_CONCURRENCY", "four", "BATCH_CONCURRENCY must be an integer"),
+])
+def test_batch_settings_reject_bad_values(monkeypatch, name, value, message):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=message):
+        load_batch_settings()
+
+
+def test_snapshot_settings_read_the_environment(monkeypatch):
+    monkeypatch.setenv("ISSUE_TYPE_SNAPSHOT_TTL", "0")
+    assert load_snapshot_settings() == SnapshotSettings(issue_type_ttl=0)
+
+
+def test_snapshot_settings_reject_a_negative_ttl(monkeypatch):
+    monkeypatch.setenv("ISSUE_TYPE_SNAPSHOT_TTL", "-1")
+    with pytest.raises(ValueError, match="ISSUE_TYPE_SNAPSHOT_TTL must be >= 0"):
+        load_snapshot_settings()
@@ -0,0 +1,69 @@
+import time
+import pytest
+from jose import jwt
+from jose.exceptions import JWTError
+from app.middlewares import RequestValidationMiddleware as validation
+from app.middlewares.RequestValidationMiddleware import VerifiedTokenCache
+
+
+def test_returns_cached_claims_and_counts_hits():
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=60)
+    assert cache.get(b"a") is None
+    cache.put(b"a", {"sub": "1"})
+    assert cache.get(b"a") == {"sub": "1"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_the_least_recently_used_token():
+    cache = VerifiedTokenCache(maxsize=2, max_ttl=60)
+    cache.put(b"a", {"sub": "a"})
+    cache.put(b"b", {"sub": "b"})
+    cache.get(b"a")
+    cache.put(b"c", {"sub": "c"})
+    assert len(cache) == 2
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == {"sub": "a"}
+
+
+def test_entry_expires_at_the_token_exp():
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=60)
+    cache.put(b"a", {"sub": "1", "exp": time.time() - 1})
+    assert cache.get(b"a") is None
+    assert len(cache) == 0
+
+
+def test_entry_expires_after_max_ttl_even_if_exp_is_later():
+    cache = VerifiedTokenCache(maxsize=10, max_ttl=0)
+    cache.put(b"a", {"sub": "1", "exp": time.time() + 3600})
+    assert cache.get(b"a") is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = VerifiedTokenCache(maxsize=0, max_ttl=60)
+    cache.put(b"a", {"sub": "1"})
+    assert len(cache) == 0
+
+
+def test_verify_token_checks_the_signature_once(monkeypatch):
+    monkeypatch.setattr(validation, "_token_cache", VerifiedTokenCache(maxsize=10, max_ttl=60))
+    decode = jwt.decode
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(validation.jwt, "decode", counting_decode)
+    token = jwt.encode({"sub": "7", "exp": int(time.time()) + 60}, validation.JWT_SECRET, algorithm="HS256")
+    assert validation.verify_token(token)["sub"] == "7"
+    assert validation.verify_token(token)["sub"] == "7"
+    assert len(calls) == 1
+
+
+def test_verify_token_never_caches_a_rejected_token(monkeypatch):
+    monkeypatch.setattr(validation, "_token_cache", VerifiedTokenCache(maxsize=10, max_ttl=60))
+    token = jwt.encode({"sub": "7"}, "not-the-secret", algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            validation.verify_token(token)
+    assert len(validation._token_cache) == 0
@@ -0,0 +1,24 @@
+import pytest
+from fastapi import HTTPException
+from app.helpers.utilities import parse_fields, parse_ids
+from app.repository.issue_repository import ISSUE_SPEC
+
+
+def test_parse_ids_accepts_repeated_and_comma_separated_ids():
+    assert parse_ids(["3,1", " 2 ", "3", ","]) == [3, 1, 2]
+
+
+@pytest.mark.parametrize("values", [[], [" , "], ["1,x"], ["1,2,3"]])
+def test_parse_ids_rejects_empty_malformed_or_too_many(values):
+    with pytest.raises(HTTPException) as error:
+        parse_ids(values, max_ids=2)
+    assert error.value.status_code == 400
+
+
+def test_parse_fields_treats_blank_as_every_field_and_unknown_as_a_400():
+    assert parse_fields(ISSUE_SPEC, None) is None
+    assert parse_fields(ISSUE_SPEC, "  ") is None
+    assert parse_fields(ISSUE_SPEC, "summary") == ("SUMMARY",)
+    with pytest.raises(HTTPException) as error:
+        parse_fields(ISSUE_SPEC, "password")
+    assert error.value.status_code == 400